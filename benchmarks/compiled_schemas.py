@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Compare how many documents a second can be validated with jsonschema and with compiled schemas.
+
+Half the documents answer every question in each schema plausibly, and half are variations of them with some
+answers removed or replaced with answers of the wrong type. The plausible answers are valid for the Digital
+Outcomes and Specialists schemas, but fail one or two followups in the G-Cloud ones.
+
+Usage:
+    compiled_schemas.py [--documents=<documents>]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import time
+
+from docopt import docopt
+from jsonschema import Draft7Validator
+from schema_generator.compiler import compile_schema, load_compiled_schema
+from schema_generator.validation import generate_schema, get_schemas
+
+
+BENCHMARK_SCHEMAS = [
+    ('services', 'g-cloud-12', 'cloud-software'),
+    ('services', 'g-cloud-13', 'cloud-hosting'),
+    ('services', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+    ('briefs', 'digital-outcomes-and-specialists-5', 'digital-outcomes'),
+    ('brief-responses', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+]
+
+WRONG_ANSWERS = [None, 1, "", ["An answer"], {}]
+
+
+def _answer(schema):
+    if 'enum' in schema:
+        return schema['enum'][0]
+    if 'oneOf' in schema or 'anyOf' in schema:
+        return _answer((schema.get('oneOf') or schema.get('anyOf'))[-1])
+    schema_type = schema.get('type', 'array' if 'items' in schema else 'string')
+    if schema_type == 'array':
+        return [_answer(schema.get('items', {}))]
+    if schema_type == 'object':
+        return {key: _answer(subschema) for key, subschema in schema.get('properties', {}).items()}
+    if schema_type in ('integer', 'number'):
+        return schema.get('minimum', 1)
+    if schema_type == 'boolean':
+        return True
+    if '\\d' in schema.get('pattern', ''):
+        return "10.00"
+    return "An answer"
+
+
+def documents(schema, count):
+    document = {key: _answer(subschema) for key, subschema in schema['properties'].items()}
+    # answer questions with followups so the followups aren't needed (and leave the followups out, even when
+    # they have followups themselves)
+    no_followups = [
+        subschema['oneOf'][0]['properties'] for subschema in schema.get('allOf', []) if 'oneOf' in subschema
+    ]
+    for properties in no_followups:
+        document.update((key, _answer(value)) for key, value in properties.items() if value != {'type': 'null'})
+    for properties in no_followups:
+        for key in [key for key, value in properties.items() if value == {'type': 'null'}]:
+            document.pop(key, None)
+    keys = sorted(document)
+    for k in range(count):
+        varied_document = dict(document)
+        for j, key in enumerate(keys[k % 10::10]):
+            if j % 2:
+                del varied_document[key]
+            else:
+                varied_document[key] = WRONG_ANSWERS[(j + k) % len(WRONG_ANSWERS)]
+        yield varied_document if k % 2 else document
+
+
+def _documents_per_second(validate, docs):
+    start = time.perf_counter()
+    for doc in docs:
+        validate(doc)
+    return len(docs) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    count = int(arguments['--documents'] or 200)
+    schema_names = {
+        (schema_type, framework_slug, lot_slug): schema_name
+        for schema_type, schema_list in get_schemas().items()
+        for schema_name, framework_slug, lot_slug in schema_list
+    }
+
+    print("{:<70} {:>8} {:>12} {:>12} {:>12} {:>12}".format(
+        "schema", "invalid", "is_valid", "compiled", "iter_errors", "compiled"
+    ))
+    for key in BENCHMARK_SCHEMAS:
+        schema = generate_schema(key[0], schema_names[key], *key[1:])
+        validator = Draft7Validator(schema)
+        compiled = load_compiled_schema(compile_schema(schema))
+        docs = list(documents(schema, count))
+
+        print("{:<70} {:>8} {:>12.0f} {:>12.0f} {:>12.0f} {:>12.0f}".format(
+            schema_names[key],
+            sum(not compiled.is_valid(doc) for doc in docs),
+            _documents_per_second(validator.is_valid, docs),
+            _documents_per_second(compiled.is_valid, docs),
+            _documents_per_second(lambda doc: list(validator.iter_errors(doc)), docs),
+            _documents_per_second(lambda doc: list(compiled.iter_errors(doc)), docs),
+        ))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Time validating documents against schemas with oneOf followups and with the equivalent if/else followups.
+
+For each schema, two documents are validated: one answering every question with a followup in a way that
+needs the followup (and answering the followup), and one answering them in a way that doesn't.
+
+Usage:
+    followup_conditionals.py [--repeat=<repeat>]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import timeit
+
+from docopt import docopt
+from jsonschema import Draft7Validator
+from schema_generator.validation import generate_schema, get_schemas
+
+
+BENCHMARK_SCHEMAS = [
+    ('services', 'g-cloud-12', 'cloud-software'),
+    ('services', 'g-cloud-13', 'cloud-hosting'),
+    ('brief-responses', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+]
+
+
+def _followups(schema):
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            if key == 'allOf':
+                for subschema in value:
+                    if list(subschema) == ['oneOf']:
+                        yield subschema['oneOf']
+            yield from _followups(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from _followups(value)
+
+
+def _answer(question_schema):
+    if 'enum' in question_schema:
+        return question_schema['enum'][0]
+    if 'not' in question_schema:
+        return []
+    return question_schema['items']['enum'][:1]
+
+
+def documents(schema):
+    with_followups, without_followups = {}, {}
+    for no_followup, followup in _followups(schema):
+        question_id = next(key for key in followup['properties'])
+        without_followups[question_id] = _answer(no_followup['properties'][question_id])
+        with_followups[question_id] = _answer(followup['properties'][question_id])
+        if not isinstance(with_followups[question_id], list) or with_followups[question_id]:
+            with_followups.update((field, "An answer") for field in followup.get('required', ()))
+
+    return [with_followups, without_followups]
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    repeat = int(arguments['--repeat'] or 20)
+    schema_names = {
+        (schema_type, framework_slug, lot_slug): schema_name
+        for schema_type, schema_list in get_schemas().items()
+        for schema_name, framework_slug, lot_slug in schema_list
+    }
+
+    print("{:<70} {:>10} {:>10} {:>10}".format("schema", "followups", "oneOf (s)", "if (s)"))
+    for key in BENCHMARK_SCHEMAS:
+        one_of_schema = generate_schema(key[0], schema_names[key], *key[1:])
+        conditional_schema = generate_schema(key[0], schema_names[key], *key[1:], conditionals=True)
+        one_of_validator = Draft7Validator(one_of_schema)
+        conditional_validator = Draft7Validator(conditional_schema)
+        docs = documents(one_of_schema)
+
+        for doc in docs:
+            assert one_of_validator.is_valid(doc) == conditional_validator.is_valid(doc)
+
+        def validate(validator):
+            for doc in docs:
+                list(validator.iter_errors(doc))
+
+        one_of_time = timeit.timeit(lambda: validate(one_of_validator), number=repeat) / repeat
+        conditional_time = timeit.timeit(lambda: validate(conditional_validator), number=repeat) / repeat
+        print("{:<70} {:>10} {:>10.5f} {:>10.5f}".format(
+            schema_names[key], len(list(_followups(one_of_schema))), one_of_time, conditional_time
+        ))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Compare word limit and price patterns with the equivalent custom format checks on long and pathological input.
+
+Usage:
+    format_checkers.py [--length=<length>] [--repeat=<repeat>]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import re
+import timeit
+
+from docopt import docopt
+from schema_generator.formats import get_format_check
+from schema_generator.validation import WORD_LIMIT_PATTERN, pattern_format, price_string
+
+
+def inputs(length):
+    return [
+        ("words over the limit", "word " * (length // 5)),
+        ("one long word", "a" * length + " "),
+        ("whitespace heavy", " \t" * (length // 2) + "a"),
+        ("long word then spaces", "a" * (length // 2) + " " * (length // 2)),
+        ("many words, trailing space", "a " * (length // 2)),
+        ("long price", "1" * length),
+        ("price with long decimal part", "1." + "1" * length),
+    ]
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    length = int(arguments['--length'] or 100000)
+    repeat = int(arguments['--repeat'] or 10)
+
+    patterns = [
+        WORD_LIMIT_PATTERN % 199,
+        r"^$|(" + WORD_LIMIT_PATTERN % 199 + ")",
+        price_string(False)['pattern'],
+        price_string(True, True)['pattern'],
+    ]
+
+    print("{:<35} {:<22} {:>12} {:>12}".format("input", "format", "pattern (s)", "format (s)"))
+    for pattern in patterns:
+        format_name = pattern_format(pattern)
+        compiled_pattern = re.compile(pattern)
+        check = get_format_check(format_name)
+        for name, value in inputs(length):
+            assert bool(compiled_pattern.search(value)) == check(value)
+            pattern_time = timeit.timeit(lambda: compiled_pattern.search(value), number=repeat) / repeat
+            format_time = timeit.timeit(lambda: check(value), number=repeat) / repeat
+            print("{:<35} {:<22} {:>12.6f} {:>12.6f}".format(name, format_name, pattern_time, format_time))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Compare merging question schemas into a validation schema by copying (`merge_schemas`) and in place
+(`merge_schemas_into`), timing it and measuring the peak memory it allocates.
+
+The question schemas are built beforehand from the G-Cloud and Digital Outcomes and Specialists manifests
+with the most questions and followups, so only the merging is measured. To show how each approach grows with
+the number of questions, the questions are also merged repeated 4 and 16 times.
+
+Usage:
+    schema_assembly.py [--repeat=<repeat>]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import copy
+import time
+import tracemalloc
+
+from docopt import docopt
+from schema_generator.validation import (
+    build_question_properties,
+    drop_non_schema_questions,
+    empty_schema,
+    get_schemas,
+    load_questions,
+    merge_schemas,
+    merge_schemas_into,
+)
+
+
+BENCHMARK_SCHEMAS = [
+    ('services', 'g-cloud-13', 'cloud-software'),
+    ('services', 'g-cloud-13', 'cloud-hosting'),
+    ('services', 'digital-outcomes-and-specialists-4', 'digital-specialists'),
+]
+
+
+def question_schemas(questions):
+    schemas = []
+    for question in questions.values():
+        property_schema = build_question_properties(question)
+        if isinstance(property_schema, tuple):
+            schemas.append(property_schema)
+        else:
+            schemas.append((property_schema, {'required': question.required_form_fields}))
+
+    return schemas
+
+
+def merge_by_copying(schema, schemas):
+    for property_schema, schema_addition in schemas:
+        schema['properties'].update(property_schema)
+        schema = merge_schemas(schema, schema_addition)
+    return schema
+
+
+def merge_in_place(schema, schemas):
+    for property_schema, schema_addition in schemas:
+        schema['properties'].update(property_schema)
+        merge_schemas_into(schema, schema_addition)
+    return schema
+
+
+def measure(merge, schemas, repeat):
+    # merging in place uses up the question schemas, so every run gets its own copy of each one
+    copies = [[copy.deepcopy(question_schema) for question_schema in schemas] for _ in range(repeat + 1)]
+
+    start = time.perf_counter()
+    for schemas_copy in copies[1:]:
+        merge(empty_schema("Benchmark"), schemas_copy)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    merge(empty_schema("Benchmark"), copies[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    repeat = int(arguments['--repeat'] or 20)
+    schema_names = {
+        (schema_type, framework_slug, lot_slug): schema_name
+        for schema_type, schema_list in get_schemas().items()
+        for schema_name, framework_slug, lot_slug in schema_list
+    }
+
+    print("{:<66} {:>6} {:>12} {:>12} {:>12} {:>12}".format(
+        "schema", "x", "copy (ms)", "copy (KB)", "inplace (ms)", "inplace (KB)"
+    ))
+    for key in BENCHMARK_SCHEMAS:
+        questions = load_questions(*key)
+        drop_non_schema_questions(questions)
+        schemas = question_schemas(questions)
+        assert merge_by_copying(empty_schema("Benchmark"), copy.deepcopy(schemas)) == \
+            merge_in_place(empty_schema("Benchmark"), copy.deepcopy(schemas))
+
+        for times in (1, 4, 16):
+            copy_time, copy_peak = measure(merge_by_copying, schemas * times, repeat)
+            in_place_time, in_place_peak = measure(merge_in_place, schemas * times, repeat)
+            print("{:<66} {:>6} {:>12.3f} {:>12.1f} {:>12.3f} {:>12.1f}".format(
+                schema_names[key], times, copy_time * 1000, copy_peak / 1024, in_place_time * 1000, in_place_peak / 1024
+            ))
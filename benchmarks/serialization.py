@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Compare the output formats for generated artifacts: how long it takes to write them, how big they are,
+and how long they take to load again, the way the API loads its schemas and mappings when it starts.
+
+The artifacts are the validation schemas for the live frameworks, plus the G-Cloud 13 services and
+Digital Outcomes and Specialists 5 briefs search mappings and the G-Cloud 13 assessment schema. Gzipped
+files are loaded through `gzip.open`.
+
+Usage:
+    serialization.py [--repeat=<repeat>]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+
+from docopt import docopt
+from schema_generator import assessment, serialization
+from schema_generator.search import generate_search_mapping
+from schema_generator.validation import generate_schema, get_schemas
+
+
+SEARCH_MAPPINGS = [('g-cloud-13', 'services'), ('digital-outcomes-and-specialists-5', 'briefs')]
+ASSESSMENT_FRAMEWORKS = ['g-cloud-13']
+
+OUTPUT_MODES = [
+    ('pretty', False),
+    ('minified', False),
+    ('pretty', True),
+    ('minified', True),
+]
+
+
+def _artifacts():
+    artifacts = []
+    for schema_type, schemas in get_schemas('live').items():
+        for schema in schemas:
+            artifacts.append((generate_schema(schema_type, *schema), True))
+
+    for framework_slug, doc_type in SEARCH_MAPPINGS:
+        mapping = io.StringIO()
+        generate_search_mapping(framework_slug, doc_type, mapping, doc_type)
+        artifacts.append((json.loads(mapping.getvalue()), False))
+
+    for framework_slug in ASSESSMENT_FRAMEWORKS:
+        artifacts.append((assessment.generate_schema(framework_slug, "declaration", "declaration"), True))
+
+    return artifacts
+
+
+def _load(path, gzipped):
+    if gzipped:
+        with gzip.open(path + serialization.GZIP_SUFFIX, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def benchmark(artifacts, output_format, gzipped, dir_path):
+    paths = [os.path.join(dir_path, '{}.json'.format(i)) for i in range(len(artifacts))]
+
+    start = time.perf_counter()
+    for path, (artifact, sort_keys) in zip(paths, artifacts):
+        serialization.write_json(path, artifact, output_format, sort_keys=sort_keys, gzipped=gzipped)
+    write_time = time.perf_counter() - start
+
+    size = sum(os.path.getsize(path + serialization.GZIP_SUFFIX if gzipped else path) for path in paths)
+
+    start = time.perf_counter()
+    for path in paths:
+        _load(path, gzipped)
+    load_time = time.perf_counter() - start
+
+    return write_time, size, load_time
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    repeat = int(arguments['--repeat'] or 5)
+
+    artifacts = _artifacts()
+    print("{} artifacts, JSON backend for minified output: {}".format(
+        len(artifacts), 'orjson' if serialization.orjson else 'json'
+    ))
+    print("{:<18} {:>10} {:>12} {:>10}".format("format", "write (s)", "size (KiB)", "load (s)"))
+    for output_format, gzipped in OUTPUT_MODES:
+        with tempfile.TemporaryDirectory() as dir_path:
+            results = [benchmark(artifacts, output_format, gzipped, dir_path) for _ in range(repeat)]
+
+        print("{:<18} {:>10.3f} {:>12.1f} {:>10.3f}".format(
+            output_format + (" + gzip" if gzipped else ""),
+            min(write_time for write_time, _, _ in results),
+            results[0][1] / 1024,
+            min(load_time for _, _, load_time in results),
+        ))
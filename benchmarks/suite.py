@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""Time each phase of generating validation, search and assessment artifacts for every framework in
+`frameworks/`, and optionally compare the results with a saved baseline.
+
+Phases:
+
+* load_questions - reading and filtering each schema's manifest, with nothing cached beforehand
+* manifest.filter - filtering already loaded manifests for each lot
+* build_schema_properties - building each schema's properties from its (already loaded) questions, starting
+  with an empty question fragment cache
+* merge_schemas - merging question schemas into each validation schema, the way `generate_schema` does
+* generate_search_mapping - generating every search mapping
+* assessment.generate_schema - generating every declaration assessment schema
+
+Each phase is run --repeat times and the fastest wall and CPU times are kept. Peak memory is what the phase
+allocates in Python (measured with `tracemalloc`), in a separate run so tracing doesn't slow the timed ones.
+
+Results are written as JSON to --output. With --baseline, results are compared against a results file
+from an earlier run, and the benchmark fails (exiting with status 1) if any time or peak memory is more
+than --threshold percent higher than in the baseline.
+
+Usage:
+    suite.py [--repeat=<repeat>] [--output=<results_file>] [--baseline=<baseline_file>] [--threshold=<percent>]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import copy
+import gc
+import io
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+from docopt import docopt
+from schema_generator import assessment
+from schema_generator.search import generate_search_mapping
+from schema_generator.validation import (
+    FRAMEWORKS_PATH,
+    MANIFESTS,
+    build_question_properties,
+    build_schema_properties,
+    clear_content_cache,
+    clear_fragment_cache,
+    drop_non_schema_questions,
+    empty_schema,
+    get_manifest,
+    get_schemas,
+    load_questions,
+    merge_schemas_into,
+)
+
+
+METRICS = ('wall_seconds', 'cpu_seconds', 'peak_memory_bytes')
+DEFAULT_THRESHOLD = 20
+
+
+def _all_schemas():
+    return [
+        (schema_type, schema_name, framework_slug, lot_slug)
+        for schema_type, schema_list in get_schemas().items()
+        for schema_name, framework_slug, lot_slug in schema_list
+    ]
+
+
+def _framework_files(subdirectory):
+    return [
+        (framework_slug, filename)
+        for framework_slug in sorted(os.listdir(FRAMEWORKS_PATH))
+        if os.path.isdir(os.path.join(FRAMEWORKS_PATH, framework_slug, subdirectory))
+        for filename in sorted(os.listdir(os.path.join(FRAMEWORKS_PATH, framework_slug, subdirectory)))
+    ]
+
+
+def _loaded_questions():
+    questions = []
+    for schema_type, schema_name, framework_slug, lot_slug in _all_schemas():
+        schema_questions = load_questions(schema_type, framework_slug, lot_slug)
+        drop_non_schema_questions(schema_questions)
+        questions.append((schema_name, schema_questions))
+
+    return questions
+
+
+def setup_load_questions():
+    clear_content_cache()
+    return _all_schemas()
+
+
+def run_load_questions(schemas):
+    for schema_type, _, framework_slug, lot_slug in schemas:
+        load_questions(schema_type, framework_slug, lot_slug)
+
+
+def setup_manifest_filter():
+    return [
+        (
+            get_manifest(framework_slug, MANIFESTS[schema_type]['question_set'], MANIFESTS[schema_type]['manifest']),
+            lot_slug,
+        )
+        for schema_type, _, framework_slug, lot_slug in _all_schemas()
+    ]
+
+
+def run_manifest_filter(manifests):
+    for manifest, lot_slug in manifests:
+        manifest.filter({'lot': lot_slug}, dynamic=False)
+
+
+def setup_build_schema_properties():
+    questions = _loaded_questions()
+    clear_fragment_cache()
+    return questions
+
+
+def run_build_schema_properties(questions):
+    for schema_name, schema_questions in questions:
+        build_schema_properties(empty_schema(schema_name), schema_questions)
+
+
+def setup_merge_schemas():
+    # merging uses up the question schemas, so each run gets its own
+    schemas = []
+    for schema_name, schema_questions in _loaded_questions():
+        question_schemas = []
+        for question in schema_questions.values():
+            property_schema = build_question_properties(question)
+            if isinstance(property_schema, tuple):
+                question_schemas.append(property_schema)
+            else:
+                question_schemas.append((property_schema, {'required': question.required_form_fields}))
+        schemas.append((schema_name, copy.deepcopy(question_schemas)))
+
+    return schemas
+
+
+def run_merge_schemas(schemas):
+    for schema_name, question_schemas in schemas:
+        schema = empty_schema(schema_name)
+        for property_schema, schema_addition in question_schemas:
+            schema['properties'].update(property_schema)
+            merge_schemas_into(schema, schema_addition)
+
+
+def setup_generate_search_mapping():
+    return [
+        (framework_slug, os.path.splitext(filename)[0])
+        for framework_slug, filename in _framework_files('search_mappings')
+    ]
+
+
+def run_generate_search_mapping(mappings):
+    for framework_slug, doc_type in mappings:
+        generate_search_mapping(framework_slug, doc_type, io.StringIO(), doc_type)
+
+
+def setup_assessment_generate_schema():
+    return _framework_files('assessment')
+
+
+def run_assessment_generate_schema(assessments):
+    for framework_slug, manifest_name in assessments:
+        assessment.generate_schema(framework_slug, manifest_name, manifest_name)
+
+
+PHASES = [
+    ('load_questions', setup_load_questions, run_load_questions),
+    ('manifest.filter', setup_manifest_filter, run_manifest_filter),
+    ('build_schema_properties', setup_build_schema_properties, run_build_schema_properties),
+    ('merge_schemas', setup_merge_schemas, run_merge_schemas),
+    ('generate_search_mapping', setup_generate_search_mapping, run_generate_search_mapping),
+    ('assessment.generate_schema', setup_assessment_generate_schema, run_assessment_generate_schema),
+]
+
+
+def measure(setup, run, repeat):
+    wall_times, cpu_times = [], []
+    for _ in range(repeat):
+        data = setup()
+        gc.collect()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        run(data)
+        wall_times.append(time.perf_counter() - wall_start)
+        cpu_times.append(time.process_time() - cpu_start)
+
+    data = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(data)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'items': len(data),
+        'wall_seconds': min(wall_times),
+        'cpu_seconds': min(cpu_times),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns a list of (phase, metric, baseline value, value) for every metric of every phase that is more than
+    `threshold` percent higher than in the `baseline` results. Phases which aren't in the baseline are skipped.
+    """
+    regressions = []
+    for phase, phase_results in results['phases'].items():
+        baseline_results = baseline['phases'].get(phase)
+        if not baseline_results:
+            continue
+
+        for metric in METRICS:
+            if phase_results[metric] > baseline_results[metric] * (1 + threshold / 100):
+                regressions.append((phase, metric, baseline_results[metric], phase_results[metric]))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    repeat = int(arguments['--repeat'] or 3)
+    threshold = float(arguments['--threshold'] or DEFAULT_THRESHOLD)
+
+    results = {'python': platform.python_version(), 'repeat': repeat, 'phases': {}}
+    print("{:<28} {:>6} {:>10} {:>10} {:>12}".format("phase", "items", "wall (s)", "cpu (s)", "peak (KiB)"))
+    for phase, setup, run in PHASES:
+        phase_results = results['phases'][phase] = measure(setup, run, repeat)
+        print("{:<28} {:>6} {:>10.3f} {:>10.3f} {:>12.1f}".format(
+            phase, phase_results['items'], phase_results['wall_seconds'], phase_results['cpu_seconds'],
+            phase_results['peak_memory_bytes'] / 1024,
+        ))
+
+    if arguments['--output']:
+        with open(arguments['--output'], 'w') as f:
+            json.dump(results, f, sort_keys=True, indent=2, separators=(',', ': '))
+            f.write('\n')
+
+    if arguments['--baseline']:
+        with open(arguments['--baseline']) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, threshold)
+        for phase, metric, baseline_value, value in regressions:
+            print("REGRESSION {} {}: {:.4g} -> {:.4g} ({:+.0f}%)".format(
+                phase, metric, baseline_value, value, (value / baseline_value - 1) * 100
+            ))
+        if regressions:
+            sys.exit("{} regression(s) of more than {:g}% against {}".format(
+                len(regressions), threshold, arguments['--baseline']
+            ))
+        print("No regressions of more than {:g}% against {}".format(threshold, arguments['--baseline']))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""Compare applying a generated search mapping's `_meta` transformations to documents one transformation at a
+time (`apply_transformations`) with applying them compiled (`compile_transformations`).
+
+Synthetic documents are made for the mapping: each field read by a transformation gets a random selection of
+the values its transformations look for, plus a value none of them do. The results of both ways of applying
+the transformations are checked against each other before anything is timed.
+
+With --compact-transformations, the mapping is generated with `append_from_lookup` transformations for
+checkbox trees and derived options, rather than a list of `append_conditionally` ones.
+
+Usage:
+    transformations.py [<framework_slug> <doc_type>] [--documents=<documents>] [--seed=<seed>] [options]
+
+Options:
+    --compact-transformations  Generate the mapping with append_from_lookup transformations
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import copy
+import io
+import json
+import random
+import time
+from collections import defaultdict
+
+from docopt import docopt
+from schema_generator.search import generate_search_mapping
+from schema_generator.transformations import (
+    apply_transformations,
+    compile_transformations,
+    get_mapping_transformations,
+)
+
+
+DEFAULT_DOCUMENTS = 100000
+CHECKED_DOCUMENTS = 1000
+
+
+def _field_values(transformations):
+    field_values = defaultdict(set)
+    for transformation in transformations:
+        for kind, arguments in transformation.items():
+            field_values[arguments['field']].update(arguments.get('any_of', arguments.get('lookup', ())))
+
+    return {field: sorted(values, key=str) for field, values in field_values.items()}
+
+
+def synthetic_documents(transformations, count, rng):
+    field_values = _field_values(transformations)
+    documents = []
+    for i in range(count):
+        document = {'id': str(1000000000000000 + i)}
+        for field, values in field_values.items():
+            if values and rng.random() < 0.7:
+                document[field] = rng.sample(values, min(len(values), rng.randint(1, 5))) + ['unmatched']
+        documents.append(document)
+
+    return documents
+
+
+def _time(function, documents):
+    start = time.perf_counter()
+    for document in documents:
+        function(document)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    framework_slug = arguments['<framework_slug>'] or 'g-cloud-13'
+    doc_type = arguments['<doc_type>'] or 'services'
+    count = int(arguments['--documents'] or DEFAULT_DOCUMENTS)
+
+    mapping = io.StringIO()
+    generate_search_mapping(
+        framework_slug, doc_type, mapping, doc_type,
+        transformation_format='compact' if arguments['--compact-transformations'] else 'legacy',
+    )
+    transformations = get_mapping_transformations(json.loads(mapping.getvalue()))
+
+    start = time.perf_counter()
+    transformer = compile_transformations(transformations)
+    compile_time = time.perf_counter() - start
+
+    documents = synthetic_documents(transformations, count, random.Random(int(arguments['--seed'] or 0)))
+    uncompiled_documents, compiled_documents = copy.deepcopy(documents), documents
+
+    for uncompiled, compiled in zip(uncompiled_documents[:CHECKED_DOCUMENTS], compiled_documents[:CHECKED_DOCUMENTS]):
+        if apply_transformations(copy.deepcopy(uncompiled), transformations) != \
+                transformer.transform(copy.deepcopy(compiled)):
+            sys.exit("Compiled transformations gave a different result for document {}".format(uncompiled['id']))
+
+    print("{} {}: {} transformations in {} stage(s), compiled in {:.2f} ms, {} documents".format(
+        framework_slug, doc_type, len(transformations), len(transformer.stages), compile_time * 1000, count
+    ))
+    uncompiled_time = _time(lambda document: apply_transformations(document, transformations), uncompiled_documents)
+    compiled_time = _time(transformer.transform, compiled_documents)
+
+    print("{:<12} {:>10} {:>14}".format("engine", "time (s)", "documents/s"))
+    for engine, engine_time in (('uncompiled', uncompiled_time), ('compiled', compiled_time)):
+        print("{:<12} {:>10.3f} {:>14.0f}".format(engine, engine_time, count / engine_time))
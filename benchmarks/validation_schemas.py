@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""Time generating every validation schema (see `get_schemas`).
+
+Compares a run which shares loaded content between schemas (the default) with
+one which clears the content cache before each schema, like every schema used
+to load its own content.
+
+Usage:
+    validation_schemas.py [--uncached]
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+import time
+
+from docopt import docopt
+from schema_generator.validation import clear_content_cache, generate_schema, get_schemas
+
+
+def generate_all(uncached=False):
+    clear_content_cache()
+    start = time.perf_counter()
+    for schema_type, schemas in get_schemas().items():
+        for schema in schemas:
+            if uncached:
+                clear_content_cache()
+            generate_schema(schema_type, *schema)
+
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    schema_count = sum(len(schemas) for schemas in get_schemas().values())
+
+    cached = generate_all()
+    print("shared content cache: {} schemas in {:.2f}s".format(schema_count, cached))
+    if arguments['--uncached']:
+        uncached = generate_all(uncached=True)
+        print("content loaded per schema: {} schemas in {:.2f}s ({:.1f}x slower)".format(
+            schema_count, uncached, uncached / cached
+        ))
@@ -0,0 +1,40 @@
+"""
+Processes the lines of JSON lines input (such as exported documents) in chunks, in a pool of worker processes if
+there's more than one job. Lines are read as they're needed and only a few chunks are in progress at once, so
+memory use doesn't grow with the input.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+
+def line_chunks(lines, chunk_size):
+    """Yields lists of up to `chunk_size` (line_number, line) pairs of the non-blank lines of `lines`"""
+    numbered_lines = ((line_number, line) for line_number, line in enumerate(lines, 1) if line.strip())
+    while True:
+        chunk = list(islice(numbered_lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_line_chunks(function, lines, chunk_size, jobs=1, args=()):
+    """
+    Yields `function(*args, chunk)` for each chunk of `lines` (see `line_chunks`), in order. With more than one
+    job, chunks are processed in a pool of worker processes, with at most two chunks per worker queued or in
+    progress at any time.
+    """
+    if jobs <= 1:
+        for chunk in line_chunks(lines, chunk_size):
+            yield function(*args, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = deque()
+        for chunk in line_chunks(lines, chunk_size):
+            futures.append(executor.submit(function, *args, chunk))
+            if len(futures) >= jobs * 2:
+                yield futures.popleft().result()
+
+        while futures:
+            yield futures.popleft().result()
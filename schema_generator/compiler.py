@@ -0,0 +1,437 @@
+"""
+Compiles generated validation schemas into Python modules of straight-line checks, so documents can be
+validated without `jsonschema` interpreting the schema for every document.
+
+Each compiled module has the schema it was compiled from as `SCHEMA`, and:
+
+* `is_valid(instance, format_checker=None)`
+* `iter_errors(instance, format_checker=None)`
+
+which behave like the `Draft7Validator(SCHEMA, format_checker=format_checker)` methods of the same names.
+The checks only decide whether a keyword fails: the errors for a failing keyword are then built by
+`jsonschema` itself, so they are the same errors (messages, paths, context and all) `jsonschema` gives.
+
+Keywords which aren't compiled (anything our schemas don't use, like `const` or `patternProperties`) are
+checked by `jsonschema` on their own, so any draft-07 schema without a `$ref` can be compiled.
+"""
+import json
+import os
+import types
+
+from schema_generator.validation import generate_schema, get_schemas
+
+
+# keywords with no effect on validation by themselves
+ANNOTATION_KEYWORDS = frozenset([
+    '$schema', '$id', '$comment', 'title', 'description', 'default', 'examples', 'definitions', 'then', 'else',
+])
+
+TYPE_CHECKS = {
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'integer': '(isinstance({0}, int) and not isinstance({0}, bool) or isinstance({0}, float) and {0}.is_integer())',
+    'null': '{0} is None',
+    'number': '(isinstance({0}, _Number) and not isinstance({0}, bool))',
+    'object': 'isinstance({0}, dict)',
+    'string': 'isinstance({0}, str)',
+}
+
+MODULE_HEADER = '''"""
+Generated from the {title} validation schema by `schema_generator.compiler`. Do not edit.
+"""
+import re
+from numbers import Number as _Number
+
+from jsonschema import Draft7Validator
+
+
+SCHEMA = {schema!r}
+
+# keywords which are checked by jsonschema together with the keyword they affect
+_COMPANION_KEYWORDS = {{
+    'additionalProperties': ('properties', 'patternProperties'),
+    'additionalItems': ('items',),
+    'if': ('then', 'else'),
+}}
+
+
+# older versions of jsonschema put errors from `then` and `else` under `if` in their schema paths
+_IF_PREFIX = next(
+    Draft7Validator({{'if': {{}}, 'then': {{'type': 'string'}}}}).iter_errors(None)
+).schema_path[0] == 'if'
+
+# keywords whose values are mappings of names to schemas, rather than schemas
+_NAMED_SCHEMAS_KEYWORDS = ('properties', 'patternProperties', 'dependencies', 'definitions')
+
+
+def _node(schema_path):
+    node = SCHEMA
+    for key in schema_path:
+        node = node[key]
+    return node
+
+
+def _with_prefix(error, path, schema_path):
+    if _IF_PREFIX:
+        schema_path = sum((
+            ('if', key) if key in ('then', 'else') and previous_key not in _NAMED_SCHEMAS_KEYWORDS else (key,)
+            for previous_key, key in zip((None,) + schema_path, schema_path)
+        ), ())
+    error.path.extendleft(reversed(path))
+    error.schema_path.extendleft(reversed(schema_path))
+    return error
+
+
+def _keyword_errors(schema_path, keyword, instance, path, format_checker):
+    node = _node(schema_path)
+    keyword_schema = {{
+        key: node[key] for key in (keyword,) + _COMPANION_KEYWORDS.get(keyword, ()) if key in node
+    }}
+    for error in Draft7Validator(keyword_schema, format_checker=format_checker).iter_errors(instance):
+        if error.schema_path[0] == keyword:
+            if error.schema is keyword_schema:
+                error.schema = node
+            yield _with_prefix(error, path, schema_path)
+
+
+def _keyword_is_valid(schema_path, keyword, instance, format_checker):
+    return next(_keyword_errors(schema_path, keyword, instance, (), format_checker), None) is None
+
+
+def _schema_errors(schema_path, instance, path, format_checker):
+    node = _node(schema_path)
+    for error in Draft7Validator(node, format_checker=format_checker).iter_errors(instance):
+        yield _with_prefix(error, path, schema_path)
+
+
+def _has_unique_items(items):
+    if all(isinstance(item, str) for item in items):
+        return len(set(items)) == len(items)
+    return Draft7Validator({{'uniqueItems': True}}).is_valid(items)
+
+'''
+
+
+class CompilationError(Exception):
+    pass
+
+
+def _tuple(items):
+    return '({}{})'.format(', '.join(items), ',' if len(items) == 1 else '')
+
+
+class _ModuleWriter(object):
+    def __init__(self):
+        self.constants = []
+        self.constant_names = {}
+        self.predicates = []
+        self.predicate_names = {}
+        self.variable_count = 0
+
+    def constant(self, prefix, code):
+        if code not in self.constant_names:
+            self.constant_names[code] = '_{}_{}'.format(prefix, len(self.constant_names))
+            self.constants.append('{} = {}'.format(self.constant_names[code], code))
+        return self.constant_names[code]
+
+    def variable(self, prefix):
+        self.variable_count += 1
+        return '{}{}'.format(prefix, self.variable_count)
+
+    def predicate(self, schema, schema_path):
+        """Returns the name of a function returning whether an instance is valid against `schema`"""
+        key = json.dumps(schema, sort_keys=True)
+        if key not in self.predicate_names:
+            name = '_is_valid_{}'.format(len(self.predicate_names))
+            self.predicate_names[key] = name
+            lines = ['def {}(instance, format_checker):'.format(name)]
+            lines += self.checks(schema, 'instance', [], schema_path, 1, errors=False)
+            lines.append('    return True')
+            self.predicates.append('\n'.join(lines))
+        return self.predicate_names[key]
+
+    def checks(self, schema, var, path, schema_path, depth, errors):
+        """
+        Returns lines of code checking the instance in `var` against `schema`, which either yield the
+        errors for each failing keyword (if `errors`) or return False as soon as a keyword fails.
+        """
+        block = _Block(self, schema, var, path, schema_path, depth, errors)
+        if schema is True:
+            return block.lines
+        if not isinstance(schema, dict):
+            if errors:
+                block.line('yield from _schema_errors({!r}, {}, {}, format_checker)'.format(
+                    schema_path, var, _tuple(path)
+                ))
+            else:
+                block.line('return False')
+            return block.lines
+        if '$ref' in schema:
+            raise CompilationError("Can't compile $ref at {}".format('/'.join(map(str, schema_path))))
+
+        for keyword, value in schema.items():
+            if keyword not in ANNOTATION_KEYWORDS:
+                KEYWORD_COMPILERS.get(keyword, _compile_fallback)(block, keyword, value)
+
+        return block.lines
+
+
+class _Block(object):
+    """The checks for one (sub)schema, against the instance in `var`, at `path` in the document"""
+
+    def __init__(self, writer, schema, var, path, schema_path, depth, errors):
+        self.writer = writer
+        self.schema = schema
+        self.var = var
+        self.path = path
+        self.schema_path = schema_path
+        self.depth = depth
+        self.errors = errors
+        self.lines = []
+
+    def line(self, code, depth=0):
+        self.lines.append('    ' * (self.depth + depth) + code)
+
+    def fail(self, keyword, condition):
+        self.line('if {}:'.format(condition))
+        if self.errors:
+            self.line('yield from _keyword_errors({!r}, {!r}, {}, {}, format_checker)'.format(
+                self.schema_path, keyword, self.var, _tuple(self.path)
+            ), 1)
+        else:
+            self.line('return False', 1)
+
+    def fallback(self, keyword):
+        if self.errors:
+            self.line('yield from _keyword_errors({!r}, {!r}, {}, {}, format_checker)'.format(
+                self.schema_path, keyword, self.var, _tuple(self.path)
+            ))
+        else:
+            self.fail(keyword, 'not _keyword_is_valid({!r}, {!r}, {}, format_checker)'.format(
+                self.schema_path, keyword, self.var
+            ))
+
+    def descend(self, subschema, var, path, schema_path, depth):
+        self.lines.extend(
+            self.writer.checks(subschema, var, path, self.schema_path + schema_path, self.depth + depth, self.errors)
+        )
+
+    def predicate_call(self, subschema, schema_path):
+        return '{}({}, format_checker)'.format(
+            self.writer.predicate(subschema, self.schema_path + schema_path), self.var
+        )
+
+
+def _compile_fallback(block, keyword, value):
+    block.fallback(keyword)
+
+
+def _compile_type(block, keyword, value):
+    type_names = [value] if isinstance(value, str) else value
+    if not all(type_name in TYPE_CHECKS for type_name in type_names):
+        return block.fallback(keyword)
+    block.fail(keyword, 'not ({})'.format(' or '.join(TYPE_CHECKS[name].format(block.var) for name in type_names)))
+
+
+def _compile_enum(block, keyword, value):
+    if all(isinstance(option, str) for option in value):
+        options = block.writer.constant('ENUM', 'frozenset({!r})'.format(sorted(set(value))))
+        block.fail(keyword, 'not (isinstance({0}, str) and {0} in {1})'.format(block.var, options))
+    elif all(isinstance(option, bool) for option in value):
+        block.fail(keyword, 'not ({})'.format(' or '.join('{} is {!r}'.format(block.var, option) for option in value)))
+    else:
+        block.fallback(keyword)
+
+
+def _compile_required(block, keyword, value):
+    if value:
+        block.fail(keyword, 'isinstance({0}, dict) and ({1})'.format(
+            block.var, ' or '.join('{!r} not in {}'.format(name, block.var) for name in value)
+        ))
+
+
+def _compile_length(block, keyword, value):
+    type_check = TYPE_CHECKS['string' if keyword.endswith('Length') else 'array'].format(block.var)
+    operator = '<' if keyword.startswith('min') else '>'
+    block.fail(keyword, '{} and len({}) {} {!r}'.format(type_check, block.var, operator, value))
+
+
+def _compile_unique_items(block, keyword, value):
+    if value:
+        block.fail(keyword, 'isinstance({0}, list) and not _has_unique_items({0})'.format(block.var))
+
+
+def _compile_pattern(block, keyword, value):
+    pattern = block.writer.constant('PATTERN', 're.compile({!r})'.format(value))
+    block.fail(keyword, 'isinstance({0}, str) and not {1}.search({0})'.format(block.var, pattern))
+
+
+def _compile_format(block, keyword, value):
+    block.fail(keyword, 'format_checker is not None and not format_checker.conforms({}, {!r})'.format(block.var, value))
+
+
+def _compile_limit(block, keyword, value):
+    operator = {'minimum': '<', 'maximum': '>', 'exclusiveMinimum': '<=', 'exclusiveMaximum': '>='}[keyword]
+    block.fail(keyword, '{} and {} {} {!r}'.format(TYPE_CHECKS['number'].format(block.var), block.var, operator, value))
+
+
+def _compile_additional_properties(block, keyword, value):
+    if value is True:
+        return
+    if value is not False or 'patternProperties' in block.schema:
+        return block.fallback(keyword)
+    properties = block.writer.constant(
+        'PROPERTIES', 'frozenset({!r})'.format(sorted(block.schema.get('properties', {})))
+    )
+    block.fail(keyword, 'isinstance({0}, dict) and not {1}.issuperset({0})'.format(block.var, properties))
+
+
+def _compile_dependencies(block, keyword, value):
+    if not all(isinstance(dependency, list) for dependency in value.values()):
+        return block.fallback(keyword)
+    conditions = [
+        '({!r} in {} and ({}))'.format(name, block.var, ' or '.join(
+            '{!r} not in {}'.format(dependency_name, block.var) for dependency_name in dependency
+        ))
+        for name, dependency in value.items() if dependency
+    ]
+    if conditions:
+        block.fail(keyword, 'isinstance({}, dict) and ({})'.format(block.var, ' or '.join(conditions)))
+
+
+def _compile_properties(block, keyword, value):
+    # jsonschema versions disagree on the paths of errors from `False` subschemas, so leave them to it
+    if False in value.values():
+        return block.fallback(keyword)
+    block.line('if isinstance({}, dict):'.format(block.var))
+    for name, subschema in value.items():
+        var = block.writer.variable('v')
+        block.line('if {!r} in {}:'.format(name, block.var), 1)
+        block.line('{} = {}[{!r}]'.format(var, block.var, name), 2)
+        block.descend(subschema, var, block.path + [repr(name)], ('properties', name), 2)
+    block.line('pass', 1)
+
+
+def _compile_items(block, keyword, value):
+    # including tuple `items`, and `False` (whose errors have different paths between versions)
+    if not isinstance(value, dict):
+        return block.fallback(keyword)
+    index, var = block.writer.variable('i'), block.writer.variable('v')
+    block.line('if isinstance({}, list):'.format(block.var))
+    block.line('for {}, {} in enumerate({}):'.format(index, var, block.var), 1)
+    block.descend(value, var, block.path + [index], ('items',), 2)
+    block.line('pass', 2)
+
+
+def _compile_all_of(block, keyword, value):
+    if False in value:
+        return block.fallback(keyword)
+    for i, subschema in enumerate(value):
+        block.descend(subschema, block.var, block.path, ('allOf', i), 0)
+
+
+def _compile_any_of(block, keyword, value):
+    calls = [block.predicate_call(subschema, (keyword, i)) for i, subschema in enumerate(value)]
+    block.fail(keyword, 'not ({})'.format(' or '.join(calls)))
+
+
+def _compile_one_of(block, keyword, value):
+    calls = [block.predicate_call(subschema, (keyword, i)) for i, subschema in enumerate(value)]
+    block.fail(keyword, '({}) != 1'.format(' + '.join(calls)))
+
+
+def _compile_not(block, keyword, value):
+    block.fail(keyword, block.predicate_call(value, (keyword,)))
+
+
+def _compile_if(block, keyword, value):
+    then_schema, else_schema = block.schema.get('then', True), block.schema.get('else', True)
+    if then_schema is True and else_schema is True:
+        return
+    if then_schema is False or else_schema is False:
+        return block.fallback(keyword)
+    block.line('if {}:'.format(block.predicate_call(value, ('if',))))
+    block.descend(then_schema, block.var, block.path, ('then',), 1)
+    block.line('pass', 1)
+    block.line('else:')
+    block.descend(else_schema, block.var, block.path, ('else',), 1)
+    block.line('pass', 1)
+
+
+KEYWORD_COMPILERS = {
+    'type': _compile_type,
+    'enum': _compile_enum,
+    'required': _compile_required,
+    'minLength': _compile_length,
+    'maxLength': _compile_length,
+    'minItems': _compile_length,
+    'maxItems': _compile_length,
+    'uniqueItems': _compile_unique_items,
+    'pattern': _compile_pattern,
+    'format': _compile_format,
+    'minimum': _compile_limit,
+    'maximum': _compile_limit,
+    'exclusiveMinimum': _compile_limit,
+    'exclusiveMaximum': _compile_limit,
+    'additionalProperties': _compile_additional_properties,
+    'dependencies': _compile_dependencies,
+    'properties': _compile_properties,
+    'items': _compile_items,
+    'allOf': _compile_all_of,
+    'anyOf': _compile_any_of,
+    'oneOf': _compile_one_of,
+    'not': _compile_not,
+    'if': _compile_if,
+}
+
+
+def compile_schema(schema):
+    """Returns the source of a Python module validating documents against `schema`"""
+    writer = _ModuleWriter()
+    iter_errors_lines = writer.checks(schema, 'instance', [], (), 1, errors=True)
+    root_predicate = writer.predicate(schema, ())
+
+    return '\n'.join([
+        MODULE_HEADER.format(title=schema.get('title', 'untitled'), schema=schema),
+    ] + writer.constants + [
+        '\n\n' + predicate for predicate in writer.predicates
+    ] + [
+        '',
+        '',
+        'def is_valid(instance, format_checker=None):',
+        '    return {}(instance, format_checker)'.format(root_predicate),
+        '',
+        '',
+        'def iter_errors(instance, format_checker=None):',
+    ] + iter_errors_lines + [
+        '    yield from ()',
+        '',
+    ])
+
+
+def load_compiled_schema(source, name='compiled_schema'):
+    """Returns a module object for the source returned by `compile_schema`, without writing it to a file"""
+    module = types.ModuleType(name)
+    exec(compile(source, name, 'exec'), module.__dict__)
+    return module
+
+
+def _module_filename(schema_type, framework_slug, lot_slug):
+    return '{}_{}_{}.py'.format(schema_type, framework_slug, lot_slug).replace('-', '_')
+
+
+def generate_compiled_schemas_todir(dir_path, schemas=None, **schema_options):
+    """Writes a compiled module for each schema in `schemas` (every schema, by default), returning the filenames"""
+    if schemas is None:
+        schemas = get_schemas()
+
+    written = []
+    for schema_type, schema_list in schemas.items():
+        for schema_name, framework_slug, lot_slug in schema_list:
+            schema = generate_schema(schema_type, schema_name, framework_slug, lot_slug, **schema_options)
+            filename = _module_filename(schema_type, framework_slug, lot_slug)
+            with open(os.path.join(dir_path, filename), 'w') as f:
+                f.write(compile_schema(schema))
+            written.append(filename)
+
+    return sorted(written)
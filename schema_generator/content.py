@@ -0,0 +1,37 @@
+"""
+Loads the framework content that validation schemas, search mappings and the other artifacts are generated from.
+
+There's a single content loader per content directory in a process, so a question file is only read and parsed
+once however many manifests, frameworks or kinds of artifact it's used by, and each manifest is only loaded once.
+"""
+import os
+from functools import lru_cache
+
+from dmcontent import ContentLoader
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=None)
+def _content_loader(content_path):
+    return ContentLoader(content_path)
+
+
+@lru_cache(maxsize=None)
+def _get_manifest(framework_slug, question_set, manifest_name, content_path):
+    loader = _content_loader(content_path)
+    loader.load_manifest(framework_slug, question_set, manifest_name)
+
+    return loader.get_manifest(framework_slug, manifest_name)
+
+
+def get_manifest(framework_slug, question_set, manifest_name, content_path=BASE_DIR):
+    # relative and absolute paths to the same content share a loader
+    return _get_manifest(framework_slug, question_set, manifest_name, os.path.abspath(content_path))
+
+
+def clear_content_cache():
+    """Forget all loaded content, so the next manifest loaded re-reads the framework files."""
+    _get_manifest.cache_clear()
+    _content_loader.cache_clear()
@@ -0,0 +1,99 @@
+"""
+Validates stored documents (services, briefs, brief responses...) in bulk against the current validation
+schemas, choosing the schema for each document from its framework and lot.
+
+Documents are read as JSON lines, validated in chunks (in worker processes, if there's more than one job)
+with a compiled validator for each schema (see `schema_generator.compiler`), and the results are yielded in
+input order. Only a few chunks are in progress at once, so memory use doesn't grow with the input.
+"""
+import json
+from functools import lru_cache
+
+from schema_generator.chunks import map_line_chunks
+from schema_generator.compiler import compile_schema, load_compiled_schema
+from schema_generator.documents import API_FIELDS
+from schema_generator.formats import FormatChecker
+from schema_generator.registry import get_schema
+
+
+FRAMEWORK_FIELDS = ('frameworkSlug', 'framework')
+LOT_FIELDS = ('lot', 'lotSlug')
+
+CHUNK_SIZE = 200
+
+_format_checker = FormatChecker()
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_type, framework_slug, lot_slug):
+    """Returns a compiled validator module for the schema, raising ValueError if there isn't one"""
+    return load_compiled_schema(
+        compile_schema(get_schema(schema_type, framework_slug, lot_slug)),
+        '{}_{}_{}'.format(schema_type, framework_slug, lot_slug).replace('-', '_'),
+    )
+
+
+def _first_field(document, fields):
+    # brief responses have their brief's framework and lot
+    for fields_document in (document, document.get('brief')):
+        if isinstance(fields_document, dict):
+            value = next((fields_document[field] for field in fields if fields_document.get(field)), None)
+            if value:
+                return value
+
+
+def validate_document(schema_type, document):
+    """
+    Returns a list of errors for `document`, each a dict with the `path` in the document, the schema
+    `validator` keyword which failed and a `message`. Documents which can't be validated (because they
+    don't have a framework and lot with a schema) get a single error with no path or validator.
+
+    Fields the API adds to documents (see `API_FIELDS`) are left out of validation.
+    """
+    if not isinstance(document, dict):
+        return [{'path': [], 'validator': None, 'message': "Document is not an object"}]
+
+    framework_slug, lot_slug = _first_field(document, FRAMEWORK_FIELDS), _first_field(document, LOT_FIELDS)
+    try:
+        validator = get_validator(schema_type, framework_slug, lot_slug)
+    except ValueError as e:
+        return [{'path': [], 'validator': None, 'message': str(e)}]
+
+    answers = {key: value for key, value in document.items() if key not in API_FIELDS}
+    return [
+        {'path': list(error.path), 'validator': error.validator, 'message': error.message}
+        for error in validator.iter_errors(answers, _format_checker)
+    ]
+
+
+def validate_chunk(schema_type, lines):
+    """
+    Validates a list of (line_number, line) pairs, returning a result dict for each with the `line` number,
+    the document's `id` (if it has one), whether it was `validated` against a schema and its `errors`.
+    """
+    results = []
+    for line_number, line in lines:
+        try:
+            document = json.loads(line)
+        except ValueError as e:
+            document, errors = None, [{'path': [], 'validator': None, 'message': "Invalid JSON: {}".format(e)}]
+        else:
+            errors = validate_document(schema_type, document)
+
+        results.append({
+            'line': line_number,
+            'id': document.get('id') if isinstance(document, dict) else None,
+            'validated': not any(error['validator'] is None for error in errors),
+            'errors': errors,
+        })
+
+    return results
+
+
+def validate_lines(schema_type, lines, jobs=1, chunk_size=CHUNK_SIZE):
+    """
+    Yields the result of validating each non-blank line of `lines` (see `validate_chunk`), in order. With
+    more than one job, chunks are validated in worker processes (see `schema_generator.chunks`).
+    """
+    for results in map_line_chunks(validate_chunk, lines, chunk_size, jobs, (schema_type,)):
+        yield from results
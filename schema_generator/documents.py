@@ -0,0 +1,15 @@
+"""
+The documents (services, briefs, brief responses...) that the API stores and returns, which validation schemas
+and search mappings are generated for.
+"""
+
+
+# fields the API adds to the documents it returns, which aren't answers to questions so aren't validated
+API_FIELDS = frozenset([
+    'id', 'status', 'createdAt', 'updatedAt', 'submittedAt', 'publishedAt', 'withdrawnAt', 'cancelledAt',
+    'unsuccessfulAt', 'awardedAt', 'links', 'supplierId', 'supplierName', 'supplierOrganisationSize',
+    'frameworkSlug', 'frameworkName', 'frameworkFramework', 'frameworkFamily', 'frameworkStatus',
+    'lot', 'lotSlug', 'lotName', 'copiedToFollowingFramework', 'brief', 'briefId', 'users', 'clarificationQuestions',
+    'clarificationQuestionsAreClosed', 'clarificationQuestionsClosedAt', 'clarificationQuestionsPublishedBy',
+    'applicationsClosedAt', 'isACopy', 'awardedBriefResponseId', 'serviceId',
+])
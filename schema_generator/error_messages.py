@@ -0,0 +1,206 @@
+"""
+Lookup tables from validation schema errors to the messages in the questions content, so applications can
+show the right message for a failing answer without loading and rendering the frameworks content.
+
+There's a table for each validation schema, mapping the path of a property in a document and a failing schema
+keyword to the `name` and rendered `message` of the matching validation from the question YAML:
+
+    {
+        "serviceName": {
+            "maxLength": {"message": "...", "name": "under_character_limit"},
+            "pattern": {"message": "...", "name": "under_10_words"},
+            "required": {"message": "...", "name": "answer_required"},
+            ...
+        },
+        "serviceFeatures/*": {...},
+        ...
+    }
+
+Paths are joined with `/`, with `*` for every item of an array. `required` errors are looked up under the path
+of the missing property rather than the object it's missing from, the way the question content treats them.
+Keywords without a matching validation in the content aren't in the table. Messages for the items of dynamic
+lists keep `{{ item }}` where the content refers to the item, for applications to fill in.
+"""
+import os
+
+from schema_generator.serialization import write_json
+from schema_generator.validation import (
+    _schema_id,
+    build_question_properties,
+    drop_non_schema_questions,
+    get_schemas,
+    load_questions,
+    pattern_format,
+)
+
+
+ARRAY_ITEM = '*'
+
+# validation names which can match a failing keyword, in order of preference
+KEYWORD_VALIDATIONS = {
+    'required': ('answer_required',),
+    'minLength': ('answer_required',),
+    'minItems': ('answer_required',),
+    'type': ('not_a_number', 'answer_required'),
+    'enum': ('not_required_value', 'answer_required'),
+    'maxLength': ('under_character_limit',),
+    'maxItems': ('max_items_limit',),
+}
+PRICE_VALIDATIONS = ('not_money_format',)
+FORMAT_VALIDATIONS = ('invalid_format',)
+ASSURANCE_VALIDATIONS = ('assurance_required',)
+
+
+def _word_limit_validations(word_limit):
+    return ('under_{}_words'.format(word_limit), 'under_word_limit')
+
+
+def _format_validations(format_name):
+    """Returns the validation names for a failing `format` (or generated pattern, see `pattern_format`)"""
+    format_name = format_name.replace('empty-or-', '')
+    if format_name.startswith('max-words:'):
+        return _word_limit_validations(format_name[len('max-words:'):])
+    if format_name.startswith('price'):
+        return PRICE_VALIDATIONS
+
+    return FORMAT_VALIDATIONS
+
+
+def _pattern_validations(pattern):
+    format_name = pattern_format(pattern)
+    return _format_validations(format_name) if format_name else FORMAT_VALIDATIONS
+
+
+def keyword_validations(keyword, value):
+    """Returns the names of the validations which can match a failing schema `keyword` with `value`"""
+    if keyword == 'pattern':
+        return _pattern_validations(value)
+    if keyword == 'format':
+        return _format_validations(value)
+
+    return KEYWORD_VALIDATIONS.get(keyword, ())
+
+
+def _field_questions(question):
+    """Returns a dict of each form field of a question to the (possibly nested) question that asks for it"""
+    field_questions = {field: question for field in question.form_fields}
+    if question.type == 'multiquestion' or question._data['type'] == 'dynamic_list':
+        if question._data['type'] == 'dynamic_list':
+            # see `validation._dynamic_list`
+            question = question.filter({"item": "{{ item }}"}, dynamic=False)
+        for nested_question in question.questions:
+            field_questions.update(_field_questions(nested_question))
+
+    return field_questions
+
+
+def _schema_keywords(schema, path, field_questions, question):
+    """
+    Yields (path, question, keyword, value) for each keyword of a property schema, with the question asking for
+    the property at that path
+    """
+    for keyword, value in schema.items():
+        if keyword == 'properties':
+            for name, property_schema in value.items():
+                yield from _schema_keywords(
+                    property_schema, path + (name,), field_questions, field_questions.get(name, question)
+                )
+        elif keyword == 'items':
+            yield from _schema_keywords(value, path + (ARRAY_ITEM,), field_questions, question)
+        elif keyword == 'required':
+            for name in value:
+                yield path + (name,), field_questions.get(name, question), keyword, value
+        else:
+            yield path, question, keyword, value
+
+
+def _matching_validation(question, field, names):
+    validations = question.get('validations') or []
+    for name in names:
+        for validation in validations:
+            if validation['name'] == name and validation.get('field', field) == field:
+                return {'name': name, 'message': str(validation['message'])}
+
+
+def _path_validations(path, question, keyword, value):
+    if path[-1] == 'assurance' and question.get('assuranceApproach'):
+        names = ASSURANCE_VALIDATIONS
+    else:
+        names = keyword_validations(keyword, value)
+
+    field = next((name for name in reversed(path) if name in question.form_fields), question.id)
+    return _matching_validation(question, field, names)
+
+
+def path_key(path):
+    """Returns the lookup table key for a path in a document, like the `path` of a schema validation error"""
+    return '/'.join(ARRAY_ITEM if isinstance(name, int) else name for name in path)
+
+
+def generate_error_messages(schema_type, framework_slug, lot_slug, content_path='./'):
+    """Returns the error message lookup table for a validation schema"""
+    questions = load_questions(schema_type, framework_slug, lot_slug, content_path=content_path)
+    drop_non_schema_questions(questions)
+
+    error_messages = {}
+    for question in questions.values():
+        field_questions = _field_questions(question)
+        properties = build_question_properties(question)
+        if isinstance(properties, tuple):
+            properties = properties[0]
+
+        keywords = _schema_keywords(
+            {'properties': properties, 'required': question.form_fields}, (), field_questions, question
+        )
+        for path, path_question, keyword, value in keywords:
+            validation = _path_validations(path, path_question, keyword, value)
+            if validation:
+                error_messages.setdefault(path_key(path), {})[keyword] = validation
+
+    return error_messages
+
+
+def error_path_key(error):
+    """
+    Returns the lookup table key for a `jsonschema` validation error: the key of its path, or of the path of
+    the missing property for `required` errors
+    """
+    path = list(error.path)
+    if error.validator == 'required':
+        # there's an error for each missing property, which is only named in the message
+        path.extend(name for name in error.validator_value if error.message.startswith(repr(name)))
+
+    return path_key(path[:len(error.path) + 1])
+
+
+def error_message(error_messages, error):
+    """
+    Returns the `{"name": ..., "message": ...}` validation for a `jsonschema` validation error from a lookup
+    table, or None if the content has no message for it.
+    """
+    return error_messages.get(error_path_key(error), {}).get(error.validator)
+
+
+def _table_filename(schema_type, framework_slug, lot_slug):
+    return 'error-messages-{}.json'.format(_schema_id(schema_type, framework_slug, lot_slug))
+
+
+def generate_error_messages_todir(dir_path, schemas=None, output_format='pretty', gzipped=False):
+    """
+    Writes the error message lookup table for each schema to `dir_path`, as
+    `error-messages-<schema_type>-<framework_slug>-<lot_slug>.json`. Returns the list of paths written.
+    """
+    if schemas is None:
+        schemas = get_schemas()
+
+    written = []
+    for schema_type, schema_list in schemas.items():
+        for _, framework_slug, lot_slug in schema_list:
+            file_path = os.path.join(dir_path, _table_filename(schema_type, framework_slug, lot_slug))
+            write_json(
+                file_path, generate_error_messages(schema_type, framework_slug, lot_slug), output_format,
+                gzipped=gzipped,
+            )
+            written.append(file_path)
+
+    return written
@@ -0,0 +1,96 @@
+"""
+Custom JSON schema formats used in place of the word limit and price patterns when validation schemas are
+generated with `formats=True`, and a `jsonschema` format checker which enforces them:
+
+* `max-words:N` - between 1 and N words, with no leading or trailing whitespace
+* `price` - up to 15 digits, optionally followed by up to 5 decimal places
+* `price-2dp` - a positive price, with either no decimal places or exactly 2
+
+Each can be prefixed with `empty-or-` to also accept an empty string.
+
+These accept and reject exactly the same strings as the patterns they replace (including `$` matching just
+before a final newline, and `\\d`/`\\s` matching any unicode digit/whitespace) but run in linear time,
+however long or whitespace-heavy the value is.
+"""
+from functools import lru_cache, partial
+
+import jsonschema
+from jsonschema import FormatError
+
+
+EMPTY_PREFIX = 'empty-or-'
+MAX_WORDS_PREFIX = 'max-words:'
+
+
+def _strip_final_newline(value):
+    # a regex `$` also matches just before a newline at the end of the string
+    return value[:-1] if value.endswith('\n') else value
+
+
+def is_within_word_limit(value, max_words):
+    value = _strip_final_newline(value)
+    if not value or value[0].isspace() or value[-1].isspace():
+        return False
+
+    return len(value.split()) <= max_words
+
+
+def is_price(value):
+    pounds, point, pence = _strip_final_newline(value).partition('.')
+    if not (1 <= len(pounds) <= 15 and pounds.isdecimal()):
+        return False
+
+    return not point or (1 <= len(pence) <= 5 and pence.isdecimal())
+
+
+def is_restricted_price(value):
+    pounds, point, pence = _strip_final_newline(value).partition('.')
+    if point and not (len(pence) == 2 and pence.isdecimal()):
+        return False
+
+    if pounds == '0':
+        return bool(point) and pence != '00'
+
+    return (
+        1 <= len(pounds) <= 15
+        and pounds[0] in '123456789'
+        and (len(pounds) == 1 or pounds[1:].isdecimal())
+    )
+
+
+def _is_empty(value):
+    return _strip_final_newline(value) == ''
+
+
+@lru_cache(maxsize=None)
+def get_format_check(format_name):
+    """Returns a function checking strings against one of our custom formats, or None for any other format."""
+    allow_empty = format_name.startswith(EMPTY_PREFIX)
+    name = format_name[len(EMPTY_PREFIX):] if allow_empty else format_name
+
+    if name == 'price':
+        check = is_price
+    elif name == 'price-2dp':
+        check = is_restricted_price
+    elif name.startswith(MAX_WORDS_PREFIX) and name[len(MAX_WORDS_PREFIX):].isdigit():
+        check = partial(is_within_word_limit, max_words=int(name[len(MAX_WORDS_PREFIX):]))
+    else:
+        return None
+
+    if allow_empty:
+        return lambda value: _is_empty(value) or check(value)
+
+    return check
+
+
+class FormatChecker(jsonschema.FormatChecker):
+    """A `jsonschema.FormatChecker` that also knows about our custom formats."""
+
+    def check(self, instance, format):
+        check = get_format_check(format)
+        if check is None:
+            return super(FormatChecker, self).check(instance, format)
+
+        # like patterns, formats only apply to strings
+        if isinstance(instance, str) and not check(instance):
+            raise FormatError("{!r} is not a {!r}".format(instance, format))
@@ -0,0 +1,197 @@
+"""
+Compares a newly generated search mapping with the one an index was created with, to work out what needs to be
+done to apply it. Each change, and the mapping as a whole, is classified as one of:
+
+* `no-op` - nothing but the mapping's provenance (its version, when and how it was generated) has changed
+* `in-place` - the new mapping and settings can be put to the existing index. This includes added fields and
+  analysis settings (which need the index closing while they're updated); documents indexed before the change
+  will only have values for added fields once they're next indexed
+* `transformation-only` - the `_meta` transformations have changed, so every document needs to be re-fed to the
+  existing index for its transformed values to be right
+* `reindex-required` - an existing field's type or indexing parameters, a static index setting or an analyzer
+  or normalizer definition has changed, so a new index needs to be created and the aliases swapped over
+
+The classification of the mapping is the most disruptive of its changes'.
+"""
+import gzip
+import json
+
+from schema_generator.serialization import GZIP_SUFFIX
+from schema_generator.transformations import get_type_mapping
+
+
+NO_OP = 'no-op'
+IN_PLACE = 'in-place'
+TRANSFORMATION_ONLY = 'transformation-only'
+REINDEX_REQUIRED = 'reindex-required'
+
+# In increasing order of disruption
+CLASSIFICATIONS = (NO_OP, IN_PLACE, TRANSFORMATION_ONLY, REINDEX_REQUIRED)
+
+# Field mapping parameters which can be changed on an existing field with the put mapping API
+UPDATABLE_FIELD_PARAMETERS = frozenset([
+    'copy_to',
+    'dynamic',
+    'eager_global_ordinals',
+    'ignore_above',
+    'ignore_malformed',
+    'meta',
+    'search_analyzer',
+    'search_quote_analyzer',
+])
+
+# Elasticsearch's defaults for field mapping parameters, so setting one explicitly to its default isn't a change
+DEFAULT_FIELD_PARAMETERS = {
+    'doc_values': True,
+    'eager_global_ordinals': False,
+    'index': True,
+    'store': False,
+}
+
+# Index settings (without the `index.` prefix) which can only be set when an index is created
+STATIC_INDEX_SETTINGS = (
+    'codec',
+    'number_of_routing_shards',
+    'number_of_shards',
+    'routing_partition_size',
+    'soft_deletes.',
+    'sort.',
+)
+
+# `_meta` keys written by `generate-search-config.py` which change every time a mapping is generated
+PROVENANCE_META_KEYS = frozenset(['_', 'generated_by', 'generated_time', 'version'])
+
+
+def _change(changes, classification, path, reason):
+    changes.append({'path': path, 'classification': classification, 'reason': reason})
+
+
+def _flatten(settings, prefix=''):
+    flattened = {}
+    for key, value in settings.items():
+        if isinstance(value, dict):
+            flattened.update(_flatten(value, '{}{}.'.format(prefix, key)))
+        else:
+            flattened[prefix + key] = value
+
+    return flattened
+
+
+def _split_settings(settings):
+    """Returns the (analysis settings, other index settings without the `index.` prefix) of a mapping's settings"""
+    settings = {
+        key[len('index.'):] if key.startswith('index.') else key: value
+        for key, value in _flatten(settings).items()
+    }
+    analysis = {}
+    for key, value in settings.items():
+        if key.startswith('analysis.'):
+            kind, name, parameter = key[len('analysis.'):].split('.', 2)
+            analysis.setdefault((kind, name), {})[parameter] = value
+
+    return analysis, {key: value for key, value in settings.items() if not key.startswith('analysis.')}
+
+
+def _compare_settings(old_settings, new_settings, changes):
+    old_analysis, old_index = _split_settings(old_settings)
+    new_analysis, new_index = _split_settings(new_settings)
+
+    for kind, name in sorted(old_analysis.keys() | new_analysis.keys()):
+        path = 'settings.analysis.{}.{}'.format(kind, name)
+        if (kind, name) not in old_analysis:
+            _change(changes, IN_PLACE, path, "added")
+        elif (kind, name) not in new_analysis:
+            _change(changes, IN_PLACE, path, "removed; it stays in the existing index's settings")
+        elif old_analysis[kind, name] != new_analysis[kind, name]:
+            _change(changes, REINDEX_REQUIRED, path, "changed, so existing documents were analysed differently")
+
+    for key in sorted(old_index.keys() | new_index.keys()):
+        if old_index.get(key) != new_index.get(key):
+            if key.startswith(STATIC_INDEX_SETTINGS):
+                _change(changes, REINDEX_REQUIRED, 'settings.index.' + key, "static setting changed")
+            else:
+                _change(changes, IN_PLACE, 'settings.index.' + key, "dynamic setting changed")
+
+
+def _field_type(field):
+    return field.get('type', 'object' if 'properties' in field else None)
+
+
+def _compare_properties(old_properties, new_properties, path, changes):
+    for name in sorted(old_properties.keys() | new_properties.keys()):
+        field_path = '{}.{}'.format(path, name)
+        if name not in old_properties:
+            _change(changes, IN_PLACE, field_path, "added")
+        elif name not in new_properties:
+            _change(changes, IN_PLACE, field_path, "removed; it stays in the existing index's mapping")
+        else:
+            _compare_field(old_properties[name], new_properties[name], field_path, changes)
+
+
+def _compare_field(old_field, new_field, path, changes):
+    if _field_type(old_field) != _field_type(new_field):
+        _change(changes, REINDEX_REQUIRED, path, "type changed from {} to {}".format(
+            _field_type(old_field), _field_type(new_field)
+        ))
+        return
+
+    for parameter in sorted((old_field.keys() | new_field.keys()) - {'type', 'properties', 'fields'}):
+        default = DEFAULT_FIELD_PARAMETERS.get(parameter)
+        if old_field.get(parameter, default) != new_field.get(parameter, default):
+            if parameter in UPDATABLE_FIELD_PARAMETERS:
+                _change(changes, IN_PLACE, path, "{} changed".format(parameter))
+            else:
+                _change(changes, REINDEX_REQUIRED, path, "{} changed".format(parameter))
+
+    _compare_properties(old_field.get('properties', {}), new_field.get('properties', {}), path, changes)
+    _compare_properties(old_field.get('fields', {}), new_field.get('fields', {}), path + '.fields', changes)
+
+
+def _compare_meta(old_meta, new_meta, changes):
+    for key in sorted(old_meta.keys() | new_meta.keys()):
+        if key in PROVENANCE_META_KEYS or old_meta.get(key) == new_meta.get(key):
+            continue
+        if key == 'transformations':
+            _change(changes, TRANSFORMATION_ONLY, 'mappings._meta.transformations', "changed")
+        else:
+            _change(changes, IN_PLACE, 'mappings._meta.' + key, "changed")
+
+
+def compare_mappings(old_mapping, new_mapping):
+    """
+    Returns the classification of the changes from `old_mapping` to `new_mapping` (with or without a mapping
+    type), and the path, classification and reason of each change:
+
+        {"classification": "in-place", "changes": [{"path": "...", "classification": "...", "reason": "..."}]}
+    """
+    changes = []
+    _compare_settings(old_mapping.get('settings', {}), new_mapping.get('settings', {}), changes)
+
+    old_type_mapping, new_type_mapping = get_type_mapping(old_mapping), get_type_mapping(new_mapping)
+    for key in sorted((old_type_mapping.keys() | new_type_mapping.keys()) - {'_meta', 'properties'}):
+        if old_type_mapping.get(key) != new_type_mapping.get(key):
+            _change(
+                changes, IN_PLACE if key == 'dynamic' else REINDEX_REQUIRED, 'mappings.' + key, "changed"
+            )
+    _compare_meta(old_type_mapping.get('_meta', {}), new_type_mapping.get('_meta', {}), changes)
+    _compare_properties(
+        old_type_mapping.get('properties', {}), new_type_mapping.get('properties', {}), 'mappings.properties',
+        changes,
+    )
+
+    return {
+        'classification': max(
+            (change['classification'] for change in changes), key=CLASSIFICATIONS.index, default=NO_OP
+        ),
+        'changes': changes,
+    }
+
+
+def load_mapping(file_path):
+    """Reads a mapping file, which can be gzipped"""
+    if file_path.endswith(GZIP_SUFFIX):
+        with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
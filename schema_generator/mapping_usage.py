@@ -0,0 +1,93 @@
+"""
+Finds the properties of a generated search mapping which no search uses, since every property makes indexes
+bigger and bulk indexing slower.
+
+Each field of a document is used in some of these ways (see `schema_generator.search.get_field_usages`):
+
+* `filter` - it's a question in the `<doc_type>_search_filters` manifest
+* `display` - it's a question in the framework's display manifest for the doc type
+* `download` - it's a question in the `download_results` manifest
+* `api` - it's a field the API adds (like `lot` or `status`, see `documents.API_FIELDS`) or it isn't
+  one of the framework's questions, so the Search API and frontends can use it without a manifest
+
+and a mapping property is unused if:
+
+* it's a `dmfilter_` or `dmagg_` property of a question which isn't a search filter
+* it's a `sortonly_` property which isn't in the mapping's `dm_sort_clause`
+
+`dmtext_` properties are always used, since text searches query every one of them and they're returned in
+search results.
+
+`prune_properties` leaves unused properties out of a mapping (`drop`), or keeps them in it with nothing indexed
+(`disable`), so anything which reads a mapping's properties to decide which fields to send still sees them.
+"""
+from collections import OrderedDict
+
+from schema_generator.documents import API_FIELDS
+
+
+FILTER = 'filter'
+DISPLAY = 'display'
+DOWNLOAD = 'download'
+API = 'api'
+
+PRUNING_MODES = ('disable', 'drop')
+
+
+def _sort_fields(sort_clause):
+    return {sort if isinstance(sort, str) else next(iter(sort)) for sort in sort_clause}
+
+
+def _unused_reason(property_name, usages, sort_fields):
+    prefix, _, field = property_name.partition('_')
+    if prefix in ('dmfilter', 'dmagg') and not usages & {FILTER, API}:
+        return "{} isn't a search filter".format(field)
+    if prefix == 'sortonly' and property_name not in sort_fields:
+        return "not in dm_sort_clause"
+
+
+def get_mapping_usage(properties, field_usages, sort_clause=()):
+    """
+    Returns the usages of the field of each of `properties`, given the usages of each question by id in
+    `field_usages` (API fields and fields which aren't questions are `api` fields), and the reason if the property
+    is unused:
+
+        {"dmfilter_backupDatacentre": {"field": "backupDatacentre", "usages": ["display"], "unused": "..."}, ...}
+    """
+    sort_fields = _sort_fields(sort_clause)
+    mapping_usage = OrderedDict()
+    for property_name in properties:
+        field = property_name.partition('_')[2]
+        usages = set(field_usages.get(field, ()))
+        if field in API_FIELDS or field not in field_usages:
+            usages.add(API)
+        mapping_usage[property_name] = OrderedDict((
+            ('field', field),
+            ('usages', sorted(usages)),
+            ('unused', _unused_reason(property_name, usages, sort_fields)),
+        ))
+
+    return mapping_usage
+
+
+def _disabled_property(mapping_property):
+    if 'properties' in mapping_property or mapping_property.get('type') == 'object':
+        return OrderedDict((('type', 'object'), ('enabled', False)))
+
+    disabled = OrderedDict((('type', mapping_property['type']), ('index', False)))
+    if mapping_property['type'] != 'text':
+        disabled['doc_values'] = False
+
+    return disabled
+
+
+def prune_properties(properties, unused, mode):
+    """Returns `properties` with the `unused` ones dropped or disabled, depending on `mode`"""
+    if mode not in PRUNING_MODES:
+        raise ValueError("Unknown pruning mode {!r}".format(mode))
+
+    return OrderedDict(
+        (name, _disabled_property(mapping_property) if name in unused else mapping_property)
+        for name, mapping_property in properties.items()
+        if not (mode == 'drop' and name in unused)
+    )
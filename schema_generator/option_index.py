@@ -0,0 +1,102 @@
+"""
+An index of the options of every radios, checkboxes and checkbox tree question in a framework, so applications
+can check and display answers without loading the content and walking checkbox trees themselves.
+
+The index for a framework has the options (see `schema_generator.options.question_options`) of each question
+by schema type, lot and question id, since the same question can have different options in different lots:
+
+    {
+        "services": {
+            "cloud-software": {
+                "serviceCategories": {"labels": {...}, "parents": {...}, "type": "checkbox_tree", "values": [...]},
+                ...
+            },
+            ...
+        },
+        ...
+    }
+
+`load_option_index` reads an index file back with values as frozensets.
+"""
+import json
+import os
+from collections import OrderedDict
+
+from schema_generator.options import OPTION_QUESTION_TYPES, freeze_question_options, question_options
+from schema_generator.serialization import write_json
+from schema_generator.validation import drop_non_schema_questions, get_schemas, load_questions
+
+
+def _option_questions(questions):
+    for question in questions:
+        if question.type in OPTION_QUESTION_TYPES:
+            yield question
+        elif question.type == 'multiquestion':
+            yield from _option_questions(question.questions)
+
+
+def generate_lot_option_index(schema_type, framework_slug, lot_slug, content_path='./'):
+    """Returns the options of each option question in a schema's questions, by question id"""
+    questions = load_questions(schema_type, framework_slug, lot_slug, content_path=content_path)
+    drop_non_schema_questions(questions)
+
+    return OrderedDict(
+        (question.id, question_options(question))
+        for question in _option_questions(questions.values())
+    )
+
+
+def generate_option_index(framework_slug, schemas=None, content_path='./'):
+    if schemas is None:
+        schemas = get_schemas()
+
+    option_index = OrderedDict()
+    for schema_type, schema_list in schemas.items():
+        for _, schema_framework_slug, lot_slug in schema_list:
+            if schema_framework_slug == framework_slug:
+                option_index.setdefault(schema_type, OrderedDict())[lot_slug] = generate_lot_option_index(
+                    schema_type, framework_slug, lot_slug, content_path=content_path
+                )
+
+    return option_index
+
+
+def option_index_filename(framework_slug):
+    return 'options-{}.json'.format(framework_slug)
+
+
+def generate_option_indexes_todir(dir_path, schemas=None, output_format='pretty', gzipped=False):
+    """
+    Writes the option index of each framework with a schema in `schemas` (every schema, by default) to
+    `dir_path`. Returns the list of paths written.
+    """
+    if schemas is None:
+        schemas = get_schemas()
+
+    framework_slugs = sorted({
+        framework_slug for schema_list in schemas.values() for _, framework_slug, _ in schema_list
+    })
+
+    written = []
+    for framework_slug in framework_slugs:
+        file_path = os.path.join(dir_path, option_index_filename(framework_slug))
+        write_json(file_path, generate_option_index(framework_slug, schemas), output_format, gzipped=gzipped)
+        written.append(file_path)
+
+    return written
+
+
+def load_option_index(file_path):
+    """Reads an option index file, with the options of each question frozen by `freeze_question_options`"""
+    with open(file_path, encoding='utf-8') as f:
+        option_index = json.load(f)
+
+    return {
+        schema_type: {
+            lot_slug: {
+                question_id: freeze_question_options(options) for question_id, options in lot_index.items()
+            }
+            for lot_slug, lot_index in lot_indexes.items()
+        }
+        for schema_type, lot_indexes in option_index.items()
+    }
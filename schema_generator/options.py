@@ -0,0 +1,94 @@
+"""
+The options of radios, checkboxes and checkbox tree questions: their values, labels, the ancestors of the
+options in a checkbox tree and the options derived from other questions' answers.
+
+These are used to build validation schemas and search mapping transformations, and for the option index
+written by `scripts/generate-option-index.py` (see `schema_generator.option_index`).
+"""
+from collections import OrderedDict
+
+
+OPTION_QUESTION_TYPES = ('radios', 'checkboxes', 'checkbox_tree')
+
+
+def option_value(option):
+    return option.get('value', option['label'])
+
+
+def iter_leaf_options(options, ancestors=()):
+    """
+    Yields (option, ancestors) for each option in a (possibly nested) list of options which has no options of
+    its own, in order, where `ancestors` is a tuple of the options it's nested in, outermost first.
+    """
+    for option in options:
+        children = option.get('options', [])
+        if children:
+            yield from iter_leaf_options(children, ancestors + (option,))
+        else:
+            yield option, ancestors
+
+
+def _iter_options(options):
+    for option in options:
+        yield option
+        yield from _iter_options(option.get('options', []))
+
+
+def question_options(question):
+    """
+    Returns a dict of the options of a radios, checkboxes or checkbox tree question:
+
+    * `values` - the values which can be chosen (leaf options only, for checkbox trees), in content order
+    * `labels` - the label of every option, including the ones checkbox tree leaves are nested in, by value
+    * `parents` - for checkbox trees, a list of the chains of ancestor values (outermost first) of each leaf
+      value. A value can be in a tree more than once, so can have more than one chain
+    * `derived_from` - for options which are chosen by the answer to another question, the `question` and the
+      values it must have `any_of`, by value
+    """
+    options = question.get('options') or []
+
+    values, parents = OrderedDict(), OrderedDict()
+    for option, ancestors in iter_leaf_options(options):
+        value = option_value(option)
+        values[value] = None
+        if ancestors:
+            parents.setdefault(value, []).append([option_value(ancestor) for ancestor in ancestors])
+
+    question_index = OrderedDict((
+        ('type', question.get('type')),
+        ('values', list(values)),
+        ('labels', OrderedDict((option_value(option), option['label']) for option in _iter_options(options))),
+    ))
+    if parents:
+        question_index['parents'] = parents
+
+    derived_from = OrderedDict(
+        (option_value(option), option['derived_from'])
+        for option in options
+        if option.get('derived_from') is not None
+    )
+    if derived_from:
+        question_index['derived_from'] = derived_from
+
+    return question_index
+
+
+def freeze_question_options(question_index):
+    """
+    Returns a copy of the options from `question_options` (or loaded from an option index file) for fast
+    membership checks: `values` is a frozenset, each value's `parents` is a frozenset of tuples and each
+    `derived_from` has a frozenset of values for `any_of`.
+    """
+    frozen = dict(question_index, values=frozenset(question_index['values']))
+    if 'parents' in question_index:
+        frozen['parents'] = {
+            value: frozenset(tuple(chain) for chain in chains)
+            for value, chains in question_index['parents'].items()
+        }
+    if 'derived_from' in question_index:
+        frozen['derived_from'] = {
+            value: dict(derived_from, any_of=frozenset(derived_from['any_of']))
+            for value, derived_from in question_index['derived_from'].items()
+        }
+
+    return frozen
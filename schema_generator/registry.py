@@ -0,0 +1,47 @@
+"""
+Validation schemas for applications that import this package, built from the frameworks content on first use
+rather than read back from files written by `generate-validation-schemas.py`.
+
+The most recently used schemas are kept in memory. Returned schemas are shared between callers, so they
+must not be modified.
+"""
+from functools import lru_cache
+
+from schema_generator.content import BASE_DIR
+from schema_generator.validation import generate_schema, get_schemas
+
+
+SCHEMA_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=None)
+def _schema_names():
+    return {
+        (schema_type, framework_slug, lot_slug): schema_name
+        for schema_type, schema_list in get_schemas().items()
+        for schema_name, framework_slug, lot_slug in schema_list
+    }
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def get_schema(schema_type, framework_slug, lot_slug):
+    try:
+        schema_name = _schema_names()[(schema_type, framework_slug, lot_slug)]
+    except KeyError:
+        raise ValueError("No {} schema for framework {} lot {}".format(schema_type, framework_slug, lot_slug))
+
+    return generate_schema(schema_type, schema_name, framework_slug, lot_slug, content_path=BASE_DIR)
+
+
+def iter_schemas(schema_type=None, framework_slug=None):
+    """
+    Yields ((schema_type, framework_slug, lot_slug), schema) for every known schema, optionally only those of
+    one schema type and/or framework. Schemas are built as the iteration reaches them.
+    """
+    for key in _schema_names():
+        if schema_type and key[0] != schema_type:
+            continue
+        if framework_slug and key[1] != framework_slug:
+            continue
+
+        yield key, get_schema(*key)
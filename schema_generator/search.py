@@ -3,45 +3,52 @@ from __future__ import print_function
 import os.path
 import sys
 import json
-from collections import OrderedDict
+import urllib.request
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from itertools import chain
 
-from dmcontent import ContentLoader, utils
+import yaml
+from dmcontent import utils
+from dmcontent.errors import ContentNotFoundError
+
+from schema_generator.chunks import map_line_chunks
+from schema_generator.content import get_manifest
+from schema_generator.mapping_usage import DISPLAY, DOWNLOAD, FILTER, get_mapping_usage, prune_properties
+from schema_generator.options import iter_leaf_options
+from schema_generator.serialization import dump, dumps, write_gzipped_copy
+from schema_generator.transformations import compile_transformations, get_mapping_transformations, get_type_mapping
 
 
 _base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+FRAMEWORKS_PATH = os.path.join(_base_dir, 'frameworks')
+
+BULK_CHUNK_SIZE = 500
+
+
+class BulkIndexError(Exception):
+    pass
 
-def _get_questions_by_type(framework_slug, doc_type, question_types):
-    manifest_name = '{}_search_filters'.format(doc_type)
-    loader = ContentLoader(_base_dir)
-    loader.load_manifest(
-        framework_slug,
-        doc_type,
-        manifest_name,
-    )
 
-    manifest = loader.get_manifest(framework_slug, manifest_name)
+def get_search_filters_manifest(framework_slug, doc_type, content_path=_base_dir):
+    return get_manifest(framework_slug, doc_type, '{}_search_filters'.format(doc_type), content_path)
+
+
+def _get_questions_by_type(framework_slug, doc_type, question_types):
+    manifest = get_search_filters_manifest(framework_slug, doc_type)
     return (q for q in sum((s.questions for s in manifest.sections), []) if q.type in question_types)
 
 
 def _checkbox_tree_transformation_generator(checkbox_tree_question):
-    def update_ancestors_dict(options, leaf_values_dict, parents):
-        for option in options:
-            children = option.get('options', [])
-            if not children:
-                if parents:
-                    if parents not in leaf_values_dict:
-                        leaf_values_dict[parents] = list()
-                        # list of child-values preserves order from the source yaml, for the benefit of
-                        # git history in output file
-
-                    leaf_values_dict[parents].append(utils.get_option_value(option))
-            else:
-                update_ancestors_dict(children, leaf_values_dict, parents.union([utils.get_option_value(option)]))
-
-    leaf_values_by_ancestor_set = OrderedDict()  # again, preserve order from source yaml
-    update_ancestors_dict(checkbox_tree_question.options, leaf_values_by_ancestor_set, parents=frozenset())
+    leaf_values_by_ancestor_set = OrderedDict()  # preserve order from source yaml
+    for option, ancestors in iter_leaf_options(checkbox_tree_question.options):
+        if ancestors:
+            # list of child-values preserves order from the source yaml, for the benefit of
+            # git history in output file
+            ancestor_values = frozenset(utils.get_option_value(ancestor) for ancestor in ancestors)
+            leaf_values_by_ancestor_set.setdefault(ancestor_values, []).append(utils.get_option_value(option))
 
     return [
         {
@@ -54,16 +61,43 @@ def _checkbox_tree_transformation_generator(checkbox_tree_question):
     ]
 
 
-def _derived_options_transformation_generator(checkbox_question):
-    retval = [
+def _checkbox_tree_compact_transformation_generator(checkbox_tree_question):
+    ancestors_by_leaf_value = OrderedDict()  # preserve order from source yaml
+    for option, ancestors in iter_leaf_options(checkbox_tree_question.options):
+        if ancestors:
+            leaf_ancestors = ancestors_by_leaf_value.setdefault(utils.get_option_value(option), set())
+            leaf_ancestors.update(utils.get_option_value(ancestor) for ancestor in ancestors)
+
+    if not ancestors_by_leaf_value:
+        return []
+
+    return [
         {
-            'append_conditionally': OrderedDict((
-                ('field', option['derived_from']['question']),
-                ('target_field', checkbox_question.id),
-                ('any_of', option['derived_from']['any_of']),
-                ('append_value', [utils.get_option_value(option)]),
+            'append_from_lookup': OrderedDict((
+                ('field', checkbox_tree_question.id),
+                ('lookup', OrderedDict(
+                    (leaf_value, sorted(ancestor_values))
+                    for leaf_value, ancestor_values in ancestors_by_leaf_value.items()
+                )),
             ))
         }
+    ]
+
+
+def _derived_option_transformation(question, option):
+    return {
+        'append_conditionally': OrderedDict((
+            ('field', option['derived_from']['question']),
+            ('target_field', question.id),
+            ('any_of', option['derived_from']['any_of']),
+            ('append_value', [utils.get_option_value(option)]),
+        ))
+    }
+
+
+def _derived_options_transformation_generator(checkbox_question):
+    retval = [
+        _derived_option_transformation(checkbox_question, option)
         for option in checkbox_question.get('options')
         if option.get('derived_from', None) is not None
     ]
@@ -71,20 +105,168 @@ def _derived_options_transformation_generator(checkbox_question):
     return retval
 
 
+def _derived_options_compact_transformation_generator(question):
+    lookups = OrderedDict()  # derived from question -> answer -> derived values
+    transformations = []
+    for option in question.get('options'):
+        derived_from = option.get('derived_from', None)
+        if derived_from is None:
+            continue
+        if not all(isinstance(value, str) for value in derived_from['any_of']):
+            # lookup keys can only be strings in JSON
+            transformations.append(_derived_option_transformation(question, option))
+            continue
+
+        lookup = lookups.setdefault(derived_from['question'], OrderedDict())
+        for value in derived_from['any_of']:
+            lookup.setdefault(value, []).append(utils.get_option_value(option))
+
+    return [
+        {
+            'append_from_lookup': OrderedDict((
+                ('field', field),
+                ('target_field', question.id),
+                ('lookup', lookup),
+            ))
+        }
+        for field, lookup in lookups.items()
+    ] + transformations
+
+
 TRANSFORMATION_GENERATORS = {
     'checkbox_tree': _checkbox_tree_transformation_generator,
     'checkboxes': _derived_options_transformation_generator,
     'radios': _derived_options_transformation_generator
 }
 
+# Checkbox tree ancestors and derived options as a single `append_from_lookup` transformation per field, which
+# older versions of the Search API don't support
+COMPACT_TRANSFORMATION_GENERATORS = {
+    'checkbox_tree': _checkbox_tree_compact_transformation_generator,
+    'checkboxes': _derived_options_compact_transformation_generator,
+    'radios': _derived_options_compact_transformation_generator,
+}
+
+TRANSFORMATION_FORMATS = {
+    'legacy': TRANSFORMATION_GENERATORS,
+    'compact': COMPACT_TRANSFORMATION_GENERATORS,
+}
+
+
+def get_transformations(framework_slug, doc_type, transformation_format='legacy'):
+    try:
+        generators = TRANSFORMATION_FORMATS[transformation_format]
+    except KeyError:
+        raise ValueError("Unknown transformation format {!r}".format(transformation_format))
 
-def get_transformations(framework_slug, doc_type):
-    for question in _get_questions_by_type(framework_slug, doc_type, TRANSFORMATION_GENERATORS.keys()):
-        for transformer in TRANSFORMATION_GENERATORS[question.type](question):
+    for question in _get_questions_by_type(framework_slug, doc_type, generators.keys()):
+        for transformer in generators[question.type](question):
             yield transformer
 
 
-def generate_search_mapping(framework_slug, doc_type, file_handle, mapping_type, extra_meta={}):
+# Questions whose answers can be filtered on, which are indexed as normalised keywords
+FILTER_QUESTION_TYPES = ('boolean', 'checkbox_tree', 'checkboxes', 'radios')
+# Questions which are aggregated on for facet counts (as well as any with a `dmagg_` property in the template)
+AGGREGATED_QUESTION_TYPES = ('checkbox_tree',)
+
+FILTER_PROPERTY = OrderedDict((
+    ('type', 'keyword'),
+    ('normalizer', 'filter_normalizer'),
+    ('doc_values', True),
+))
+AGGREGATION_PROPERTY = OrderedDict((
+    ('type', 'keyword'),
+    ('doc_values', True),
+    # build the terms aggregation's global ordinals when the index refreshes, rather than on the first search
+    ('eager_global_ordinals', True),
+))
+
+
+def get_filter_properties(framework_slug, doc_type, template_properties=None):
+    """
+    Returns the `dmfilter_` property for each question in the search filters manifest, and a `dmagg_` property for
+    each one that's aggregated on: checkbox trees and questions with a `dmagg_` property in `template_properties`.
+    """
+    template_properties = template_properties or {}
+    properties = OrderedDict()
+    for question in _get_questions_by_type(framework_slug, doc_type, FILTER_QUESTION_TYPES):
+        properties['dmfilter_' + question.id] = OrderedDict(FILTER_PROPERTY)
+        if question.type in AGGREGATED_QUESTION_TYPES or 'dmagg_' + question.id in template_properties:
+            properties['dmagg_' + question.id] = OrderedDict(AGGREGATION_PROPERTY)
+
+    return properties
+
+
+def _merge_properties(template_properties, generated_properties):
+    # parameters written by hand in the template win, but are filled out by generated ones they don't set
+    properties = OrderedDict(template_properties)
+    for name, generated_property in generated_properties.items():
+        template_property = properties.setdefault(name, generated_property)
+        for parameter, value in generated_property.items():
+            template_property.setdefault(parameter, value)
+
+    return properties
+
+
+# Set to true in a template's `_meta` to generate `index.sort` settings from its `dm_sort_clause`. Changing an
+# index's sort needs a new index, so frameworks opt in to it. It isn't written to the generated `_meta`.
+INDEX_SORT_META_KEY = 'dm_index_sort'
+
+# Field types an index can be sorted by (dates and booleans are stored as numbers)
+SORTABLE_FIELD_TYPES = frozenset([
+    'boolean', 'byte', 'date', 'double', 'float', 'half_float', 'integer', 'keyword', 'long', 'scaled_float',
+    'short', 'unsigned_long',
+])
+
+
+def _sort_clause_fields(sort_clause):
+    for sort in sort_clause:
+        if isinstance(sort, str):
+            field, options = sort, {}
+        else:
+            [(field, options)] = sort.items()
+            if isinstance(options, str):
+                options = {'order': options}
+
+        if not field.startswith('_'):  # _score and _doc aren't stored fields
+            yield field, options
+
+
+def get_index_sort_settings(sort_clause, properties):
+    """
+    Returns `index.sort` settings which sort an index's segments by the fields of `sort_clause` (a mapping's
+    `dm_sort_clause`), in the same order, so searches sorted by them can stop collecting hits early. The
+    relevance score isn't known at index time, so `_score` is left out; searches which sort by it first can't
+    stop early, but their ties are still broken in index order.
+
+    Raises ValueError if a field isn't a sortable keyword, numeric or date property with doc values in
+    `properties`, or if there are no fields to sort by.
+    """
+    fields = list(_sort_clause_fields(sort_clause))
+    if not fields:
+        raise ValueError("Sort clause {!r} has no fields to sort an index by".format(sort_clause))
+
+    for field, options in fields:
+        field_property = properties.get(field, {})
+        if field_property.get('type') not in SORTABLE_FIELD_TYPES or field_property.get('doc_values') is False:
+            raise ValueError("Can't sort an index by {!r}, which isn't a sortable field in the mapping".format(field))
+
+    settings = OrderedDict((
+        ('field', [field for field, _ in fields]),
+        ('order', [options.get('order', 'asc') for _, options in fields]),
+    ))
+    # the query time defaults are the same as the index sort ones, so these are only needed if they're overridden
+    if any('missing' in options for _, options in fields):
+        settings['missing'] = [options.get('missing', '_last') for _, options in fields]
+    if any('mode' in options for _, options in fields):
+        settings['mode'] = [
+            options.get('mode', 'max' if options.get('order') == 'desc' else 'min') for _, options in fields
+        ]
+
+    return settings
+
+
+def load_search_mapping_template(framework_slug, doc_type):
     with open(os.path.join(
         _base_dir,
         "frameworks",
@@ -92,7 +274,79 @@ def generate_search_mapping(framework_slug, doc_type, file_handle, mapping_type,
         "search_mappings",
         "{}.json".format(doc_type),
     ), 'r') as h_template:
-        mapping_json = json.load(h_template, object_pairs_hook=OrderedDict)  # preserve template order for git history
+        return json.load(h_template, object_pairs_hook=OrderedDict)  # preserve template order for git history
+
+
+# The manifests each usage of a field comes from, other than the search filters one. Frameworks don't all have them.
+USAGE_MANIFESTS = (
+    (DISPLAY, 'display_{singular_doc_type}'),
+    (DOWNLOAD, 'download_results'),
+)
+
+
+def _manifest_question_ids(manifest):
+    for question in sum((s.questions for s in manifest.sections), []):
+        yield question.id
+        for nested_question in getattr(question, 'questions', None) or ():
+            yield nested_question.id
+
+
+def get_question_ids(framework_slug, doc_type):
+    """Returns the ids of the framework's `doc_type` questions, including any overridden in the question file"""
+    questions_path = os.path.join(FRAMEWORKS_PATH, framework_slug, 'questions', doc_type)
+    question_ids = set()
+    for filename in os.listdir(questions_path):
+        if filename.endswith('.yml'):
+            with open(os.path.join(questions_path, filename), encoding='utf-8') as f:
+                question = yaml.safe_load(f) or {}
+            question_ids.add(question.get('id') or os.path.splitext(filename)[0])
+
+    return question_ids
+
+
+def get_field_usages(framework_slug, doc_type):
+    """
+    Returns the usages of each of the framework's `doc_type` questions by id: whether it's in the search filters,
+    display and download results manifests. See `schema_generator.mapping_usage`.
+    """
+    field_usages = {question_id: set() for question_id in get_question_ids(framework_slug, doc_type)}
+    manifests = [(FILTER, get_search_filters_manifest(framework_slug, doc_type))]
+    for usage, manifest_name in USAGE_MANIFESTS:
+        try:
+            manifests.append((usage, get_manifest(
+                framework_slug, doc_type, manifest_name.format(singular_doc_type=doc_type.rstrip('s'))
+            )))
+        except ContentNotFoundError:
+            pass
+
+    for usage, manifest in manifests:
+        for question_id in _manifest_question_ids(manifest):
+            field_usages.setdefault(question_id, set()).add(usage)
+
+    return field_usages
+
+
+def get_search_mapping_usage(framework_slug, doc_type, mapping):
+    """Returns the usage of each property of a search mapping (see `mapping_usage.get_mapping_usage`)"""
+    type_mapping = get_type_mapping(mapping)
+    return get_mapping_usage(
+        type_mapping.get("properties", {}),
+        get_field_usages(framework_slug, doc_type),
+        type_mapping.get("_meta", {}).get("dm_sort_clause", ()),
+    )
+
+
+def build_search_mapping(
+    framework_slug, doc_type, mapping_type, extra_meta={}, transformation_format='legacy', field_pruning=None,
+    filter_properties=False,
+):
+    """
+    Returns the search mapping generated from the framework's template for `doc_type`. With `filter_properties`,
+    the template's properties are filled out with the filter and aggregation properties of the search filter
+    questions (see `get_filter_properties`). With `field_pruning`, properties no search uses are dropped or disabled
+    (see `mapping_usage.prune_properties`).
+    """
+    mapping_json = load_search_mapping_template(framework_slug, doc_type)
 
     mappings = mapping_json["mappings"]
 
@@ -109,26 +363,213 @@ def generate_search_mapping(framework_slug, doc_type, file_handle, mapping_type,
         *((k, v) for k, v in extra_meta.items()),
         # we want entries from original_meta to come *after* entries from extra_meta, but want to extra_meta entries
         # to override original_meta, so ignore original_meta entries which are already in extra_meta
-        *((k, v) for k, v in original_meta.items() if k not in extra_meta),
+        *((k, v) for k, v in original_meta.items() if k not in extra_meta and k != INDEX_SORT_META_KEY),
         ("transformations", list(chain(
             extra_meta.get("transformations", ()),
             original_meta.get("transformations", ()),
-            get_transformations(framework_slug, doc_type),
+            get_transformations(framework_slug, doc_type, transformation_format),
         ))),
     ))
 
-    if include_type_name:
-        mappings[mapping_type]["_meta"] = meta
-    else:
-        mappings["_meta"] = meta
+    type_mappings = mappings[mapping_type] if include_type_name else mappings
+    type_mappings["_meta"] = meta
+    if filter_properties:
+        template_properties = type_mappings.get("properties", OrderedDict())
+        type_mappings["properties"] = _merge_properties(
+            template_properties, get_filter_properties(framework_slug, doc_type, template_properties)
+        )
 
-    json.dump(mapping_json, file_handle, indent=2, separators=(',', ': '))
+    if field_pruning:
+        mapping_usage = get_search_mapping_usage(framework_slug, doc_type, mapping_json)
+        type_mappings["properties"] = prune_properties(
+            type_mappings["properties"],
+            {property_name for property_name, usage in mapping_usage.items() if usage["unused"]},
+            field_pruning,
+        )
+
+    if original_meta.get(INDEX_SORT_META_KEY):
+        index_settings = mapping_json.setdefault("settings", OrderedDict()).setdefault("index", OrderedDict())
+        # a sort written by hand in the template wins
+        if "sort" not in index_settings:
+            index_settings["sort"] = get_index_sort_settings(
+                meta.get("dm_sort_clause", ()), type_mappings["properties"]
+            )
+
+    return mapping_json
+
+
+def generate_search_mapping(
+    framework_slug, doc_type, file_handle, mapping_type, extra_meta={}, output_format='pretty',
+    transformation_format='legacy', field_pruning=None, filter_properties=False,
+):
+    dump(
+        build_search_mapping(
+            framework_slug, doc_type, mapping_type, extra_meta, transformation_format, field_pruning,
+            filter_properties,
+        ),
+        file_handle, output_format, sort_keys=False,
+    )
     print('', file=file_handle)
 
 
-def generate_config(framework_slug, doc_type, extra_meta, output_dir=None):
+def get_search_mappings(frameworks_path=FRAMEWORKS_PATH):
+    """Returns a sorted list of (framework_slug, doc_type) for every search mapping template in `frameworks_path`"""
+    return sorted(
+        (framework_slug, os.path.splitext(filename)[0])
+        for framework_slug in os.listdir(frameworks_path)
+        if os.path.isdir(os.path.join(frameworks_path, framework_slug, 'search_mappings'))
+        for filename in os.listdir(os.path.join(frameworks_path, framework_slug, 'search_mappings'))
+        if filename.endswith('.json')
+    )
+
+
+def generate_config(
+    framework_slug, doc_type, extra_meta, output_dir=None, output_format='pretty', gzipped=False,
+    transformation_format='legacy', field_pruning=None, filter_properties=False,
+):
     if output_dir:
-        with open(os.path.join(output_dir, '{}-{}.json'.format(doc_type, framework_slug)), 'w') as base_mapping:
-            generate_search_mapping(framework_slug, doc_type, base_mapping, doc_type, extra_meta)
+        mapping_path = os.path.join(output_dir, '{}-{}.json'.format(doc_type, framework_slug))
+        with open(mapping_path, 'w', encoding='utf-8') as base_mapping:
+            generate_search_mapping(
+                framework_slug, doc_type, base_mapping, doc_type, extra_meta, output_format, transformation_format,
+                field_pruning, filter_properties,
+            )
+        if gzipped:
+            write_gzipped_copy(mapping_path)
+        return mapping_path
     else:
-        generate_search_mapping(framework_slug, doc_type, sys.stdout, doc_type, extra_meta)
+        generate_search_mapping(
+            framework_slug, doc_type, sys.stdout, doc_type, extra_meta, output_format, transformation_format,
+            field_pruning, filter_properties,
+        )
+
+
+def generate_configs(
+    targets, output_dir, jobs=1, output_format='pretty', gzipped=False, transformation_format='legacy',
+    field_pruning=None, filter_properties=False,
+):
+    """
+    Writes the search mapping for each (framework_slug, doc_type, extra_meta) in `targets` to `output_dir`, and
+    returns the list of paths written.
+
+    With one job, mappings are generated one after another with a single content loader. With more, they're
+    shared between a pool of worker processes.
+    """
+    if jobs <= 1:
+        return [
+            generate_config(
+                framework_slug, doc_type, extra_meta, output_dir, output_format, gzipped, transformation_format,
+                field_pruning, filter_properties,
+            )
+            for framework_slug, doc_type, extra_meta in targets
+        ]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                generate_config,
+                framework_slug, doc_type, extra_meta, output_dir, output_format, gzipped, transformation_format,
+                field_pruning, filter_properties,
+            )
+            for framework_slug, doc_type, extra_meta in targets
+        ]
+        return [future.result() for future in futures]
+
+
+def get_mapping_fields(mapping):
+    """
+    Returns the properties of `mapping` for each document field. Like the Search API, a document's `field` is
+    indexed as every `<prefix>_<field>` property (`dmtext_`, `dmfilter_`, `dmagg_`, `sortonly_`...).
+    """
+    mapping_fields = defaultdict(list)
+    for property_name in get_type_mapping(mapping).get('properties', {}):
+        prefix, separator, field = property_name.partition('_')
+        if separator:
+            mapping_fields[field].append(property_name)
+
+    return dict(mapping_fields)
+
+
+@lru_cache(maxsize=None)
+def _bulk_converter(mapping_json):
+    # Cached by the mapping's JSON so each worker process only compiles the transformations once
+    mapping = json.loads(mapping_json)
+    return compile_transformations(get_mapping_transformations(mapping)), get_mapping_fields(mapping)
+
+
+def search_document(document, transformer, mapping_fields):
+    """Applies the mapping's transformations to `document`, and returns the values of the mapping's properties"""
+    transformer.transform(document)
+    return {
+        property_name: value
+        for field, value in document.items()
+        for property_name in mapping_fields.get(field, ())
+    }
+
+
+def build_bulk_chunk(mapping_json, index_name, lines):
+    """
+    Returns the `_bulk` NDJSON body indexing the documents in a list of (line_number, line) JSON lines to
+    `index_name`, with the mapping given as JSON. Raises BulkIndexError for a line which isn't a document with
+    an `id`.
+    """
+    transformer, mapping_fields = _bulk_converter(mapping_json)
+    body = []
+    for line_number, line in lines:
+        try:
+            document = json.loads(line)
+            document_id = str(document['id'])
+        except (ValueError, TypeError, KeyError) as e:
+            raise BulkIndexError("Line {} isn't a document with an id: {!r}".format(line_number, e))
+
+        body.append(dumps({'index': {'_index': index_name, '_id': document_id}}, 'minified', sort_keys=False))
+        body.append(dumps(search_document(document, transformer, mapping_fields), 'minified', sort_keys=False))
+
+    return '\n'.join(body) + '\n'
+
+
+def generate_bulk_chunks(mapping, index_name, lines, chunk_size=BULK_CHUNK_SIZE, jobs=1):
+    """
+    Yields `_bulk` NDJSON bodies indexing the documents in JSON `lines` to `index_name`, `chunk_size` documents
+    at a time and in input order, with `mapping`'s transformations applied and only the fields it has
+    properties for. With more than one job, chunks are built in worker processes (see `schema_generator.chunks`).
+    """
+    yield from map_line_chunks(build_bulk_chunk, lines, chunk_size, jobs, (json.dumps(mapping), index_name))
+
+
+def write_bulk_chunks(chunks, output_dir):
+    """Writes each `_bulk` body to a numbered bulk-<n>.ndjson file in `output_dir`, and returns the paths written"""
+    paths = []
+    for chunk_number, chunk in enumerate(chunks, 1):
+        path = os.path.join(output_dir, 'bulk-{:05d}.ndjson'.format(chunk_number))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(chunk)
+        paths.append(path)
+
+    return paths
+
+
+def post_bulk_chunks(chunks, elasticsearch_url, timeout=60):
+    """
+    Posts each `_bulk` body to the `_bulk` endpoint of `elasticsearch_url` in turn, and returns the number of
+    documents indexed. Raises BulkIndexError if Elasticsearch reports errors for any of a chunk's documents.
+    """
+    indexed = 0
+    for chunk in chunks:
+        request = urllib.request.Request(
+            elasticsearch_url.rstrip('/') + '/_bulk',
+            data=chunk.encode('utf-8'),
+            headers={'Content-Type': 'application/x-ndjson'},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            result = json.load(response)
+
+        if result.get('errors'):
+            failed = [item for item in result.get('items', ()) for action in item.values() if 'error' in action]
+            raise BulkIndexError("{} document(s) failed to index, for example {!r}".format(
+                len(failed), failed[:1]
+            ))
+        indexed += len(result.get('items', ()))
+
+    return indexed
@@ -0,0 +1,155 @@
+"""
+Elasticsearch search templates for each framework's search mapping, so the Search API can register a stored
+script once and send only parameters with each search, rather than building the query from the search filters
+manifest every time.
+
+A template is a mustache script with:
+
+* a `simple_query_string` query on the `dmtext_` fields for the `q` parameter, or `match_all` without one
+* a `terms` filter on `dmfilter_<field>` for each group of values in a `filter_<field>` parameter. A parameter
+  is a list of groups (`[{"values": ["a", "b"]}, {"values": ["c"]}]`), and documents must match at least one
+  value of every group, like repeated comma separated `filter_<field>` arguments to the Search API
+* a `terms` aggregation on each `dmagg_` field if the `aggregations` parameter is set, with a size big enough
+  for all of the question's options
+* the mapping's `dm_sort_clause`, and `from`/`size` parameters
+
+Checkbox tree answers are indexed with their ancestors by the mapping's transformations, so filtering by a
+category also finds the services in its subcategories without the template having to expand it.
+`search_template_params` builds the parameters for a search.
+
+The template for a framework and doc type is written as the body of a put stored script request:
+
+    PUT _scripts/<doc_type>-<framework_slug>
+    {"script": {"lang": "mustache", "source": "..."}}
+"""
+import json
+import os
+from collections import OrderedDict
+
+from dmcontent import utils
+
+from schema_generator.options import iter_leaf_options
+from schema_generator.search import FILTER_QUESTION_TYPES, _get_questions_by_type, build_search_mapping
+from schema_generator.serialization import write_json
+from schema_generator.transformations import get_type_mapping
+
+
+DEFAULT_PAGE_SIZE = 100
+# for `dmagg_` fields which aren't questions, such as `lot`
+DEFAULT_AGGREGATION_SIZE = 100
+
+
+def _section(name, content):
+    return '{{#%s}}%s{{/%s}}' % (name, content, name)
+
+
+def _inverted_section(name, content):
+    return '{{^%s}}%s{{/%s}}' % (name, content, name)
+
+
+def _to_json(name):
+    return _section('toJson', name)
+
+
+def _json(obj, **placeholders):
+    """Serializes `obj` with each string `__<NAME>__` in it replaced by the mustache in `placeholders`"""
+    source = json.dumps(obj, separators=(',', ':'))
+    for name, mustache in placeholders.items():
+        source = source.replace(json.dumps('__{}__'.format(name)), mustache)
+
+    return source
+
+
+def _prefixed_fields(properties, prefix):
+    return [name[len(prefix):] for name in properties if name.startswith(prefix)]
+
+
+def _question_option_counts(framework_slug, doc_type):
+    counts = {}
+    for question in _get_questions_by_type(framework_slug, doc_type, FILTER_QUESTION_TYPES):
+        if question.type == 'boolean':
+            values = {True, False}
+        else:
+            values = {
+                utils.get_option_value(option)
+                for leaf_option, ancestors in iter_leaf_options(question.options)
+                for option in (leaf_option,) + tuple(ancestors)
+            }
+        # questions can share an id, e.g. a framework's lot specific category questions
+        counts[question.id] = counts.get(question.id, 0) + len(values)
+
+    return counts
+
+
+def get_search_template(framework_slug, doc_type):
+    """Returns the put stored script body for the framework's search template for `doc_type`"""
+    type_mapping = get_type_mapping(build_search_mapping(framework_slug, doc_type, doc_type))
+    properties = type_mapping.get('properties', {})
+    option_counts = _question_option_counts(framework_slug, doc_type)
+
+    query = _section('q', _json(
+        {'simple_query_string': {
+            'query': '__QUERY__',
+            'fields': ['dmtext_' + field for field in _prefixed_fields(properties, 'dmtext_')],
+            'default_operator': 'and',
+        }},
+        QUERY=_to_json('q'),
+    )) + _inverted_section('q', _json({'match_all': {}}))
+
+    filters = ''.join(
+        _section(
+            'filter_' + field, ',' + _json({'terms': {'dmfilter_' + field: '__VALUES__'}}, VALUES=_to_json('values'))
+        )
+        for field in _prefixed_fields(properties, 'dmfilter_')
+    )
+
+    aggregations = OrderedDict(
+        (field, {'terms': {'field': 'dmagg_' + field, 'size': option_counts.get(field, DEFAULT_AGGREGATION_SIZE)}})
+        for field in _prefixed_fields(properties, 'dmagg_')
+    )
+
+    source = ''.join((
+        '{"query":{"bool":{"must":', query, ',"filter":[', _json({'match_all': {}}), filters, ']}}',
+        _section('aggregations', ',"aggregations":' + _json(aggregations)) if aggregations else '',
+        ',"sort":' + _json(type_mapping['_meta']['dm_sort_clause'])
+        if 'dm_sort_clause' in type_mapping.get('_meta', {}) else '',
+        ',"from":', _section('from', '{{from}}'), _inverted_section('from', '0'),
+        ',"size":', _section('size', '{{size}}'), _inverted_section('size', str(DEFAULT_PAGE_SIZE)),
+        '}',
+    ))
+
+    return OrderedDict((('script', OrderedDict((('lang', 'mustache'), ('source', source)))),))
+
+
+def search_template_params(query=None, filters={}, aggregations=False, page=1, size=DEFAULT_PAGE_SIZE):
+    """
+    Returns the parameters of a search template for a search. `filters` has a list of groups of values for each
+    field, of which a document must match at least one value in every group.
+    """
+    params = {
+        'filter_' + field: [{'values': list(values)} for values in groups]
+        for field, groups in filters.items()
+    }
+    if query:
+        params['q'] = query
+    if aggregations:
+        params['aggregations'] = True
+    params['from'] = (page - 1) * size
+    params['size'] = size
+
+    return params
+
+
+def search_template_filename(framework_slug, doc_type):
+    return 'search-template-{}-{}.json'.format(doc_type, framework_slug)
+
+
+def generate_search_templates_todir(dir_path, targets, output_format='pretty', gzipped=False):
+    """Writes the search template for each (framework_slug, doc_type) in `targets`, and returns the paths written"""
+    written = []
+    for framework_slug, doc_type in targets:
+        file_path = os.path.join(dir_path, search_template_filename(framework_slug, doc_type))
+        write_json(file_path, get_search_template(framework_slug, doc_type), output_format, gzipped=gzipped)
+        written.append(file_path)
+
+    return written
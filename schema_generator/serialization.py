@@ -0,0 +1,73 @@
+"""
+Serializes the generated JSON artifacts: validation schemas, search mappings and assessment schemas.
+
+* `pretty` is the canonical indented output that artifacts are committed and reviewed in. It's always written
+  with the standard library `json` module, so it stays byte-for-byte the same
+* `minified` has no whitespace and doesn't escape non-ASCII characters, and is written with `orjson` if that's
+  installed
+
+Written files can also get a gzipped `.json.gz` copy alongside them, for deploys and servers that can use it
+directly.
+"""
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+GZIP_SUFFIX = '.gz'
+
+
+def _dumps_pretty(obj, sort_keys):
+    return json.dumps(obj, sort_keys=sort_keys, indent=2, separators=(',', ': '))
+
+
+def _dumps_minified(obj, sort_keys):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode('utf-8')
+
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False)
+
+
+OUTPUT_FORMATS = {
+    'pretty': _dumps_pretty,
+    'minified': _dumps_minified,
+}
+
+
+def dumps(obj, output_format='pretty', sort_keys=True):
+    try:
+        serializer = OUTPUT_FORMATS[output_format]
+    except KeyError:
+        raise ValueError("Unknown output format {!r}".format(output_format))
+
+    return serializer(obj, sort_keys)
+
+
+def dump(obj, file_handle, output_format='pretty', sort_keys=True):
+    file_handle.write(dumps(obj, output_format, sort_keys))
+
+
+def write_gzipped_copy(file_path):
+    """
+    Writes a gzipped copy of `file_path` next to it. The copy has no timestamp, so it only changes when the
+    file's contents do.
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+
+    with open(file_path + GZIP_SUFFIX, 'wb') as f:
+        f.write(gzip.compress(content, mtime=0))
+
+
+def write_json(file_path, obj, output_format='pretty', sort_keys=True, gzipped=False, end='\n'):
+    """Writes `obj` to `file_path` (followed by `end`), and a gzipped copy of it if `gzipped` is set."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        dump(obj, f, output_format, sort_keys)
+        f.write(end)
+
+    if gzipped:
+        write_gzipped_copy(file_path)
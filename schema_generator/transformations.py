@@ -0,0 +1,202 @@
+"""
+Applies the `transformations` in a generated search mapping's `_meta` to documents, the way the Search API does
+before indexing them, so bulk index payloads can be prepared offline and new mappings tried out locally.
+
+The transformations are:
+
+* `append_conditionally` - if any value of `field` is one of `any_of`, append the `append_value` values which
+  aren't already there to `target_field` (or `field`)
+* `set_conditionally` - if any value of `field` is one of `any_of`, set `target_field` (or `field`) to
+  `set_value`
+* `append_from_lookup` - for each value of `field` which is a key of `lookup`, append the values it maps to
+  which aren't already there to `target_field` (or `field`). This is the compact form of a list of
+  `append_conditionally` transformations, which `generate_search_mapping` writes with
+  `transformation_format='compact'`
+* `hash_to` - set `target_field` (or `field`) to the SHA-256 hex digest of `field`'s value, if it has one
+
+A field's value is treated as a list of one value if it isn't a list. Transformations are applied in order, so
+later ones see the values earlier ones added.
+
+`compile_transformations` builds a `Transformer`, which doesn't check every transformation against every
+document: transformations are grouped into stages which can't affect each other, and each stage has a table of
+the transformations matching each value of each field it reads. A document is only looked up once in each
+table per value it has, however many transformations there are.
+"""
+import hashlib
+from collections import defaultdict
+
+
+def _values(value):
+    return value if isinstance(value, list) else [value]
+
+
+def append_conditionally(document, field, any_of, append_value, target_field=None):
+    if field in document and any(value in any_of for value in _values(document[field])):
+        _append(document, target_field or field, append_value)
+
+
+def _append(document, target_field, append_value):
+    values = list(_values(document[target_field])) if target_field in document else []
+    values.extend(value for value in append_value if value not in values)
+    document[target_field] = values
+
+
+def append_from_lookup(document, field, lookup, target_field=None):
+    if field in document:
+        for value in _values(document[field]):
+            if isinstance(value, str) and value in lookup:
+                _append(document, target_field or field, lookup[value])
+
+
+def set_conditionally(document, field, any_of, set_value, target_field=None):
+    if field in document and any(value in any_of for value in _values(document[field])):
+        document[target_field or field] = set_value
+
+
+def hash_to(document, field, target_field=None):
+    if field in document:
+        document[target_field or field] = hashlib.sha256(str(document[field]).encode('utf-8')).hexdigest()
+
+
+TRANSFORMATIONS = {
+    'append_conditionally': append_conditionally,
+    'append_from_lookup': append_from_lookup,
+    'set_conditionally': set_conditionally,
+    'hash_to': hash_to,
+}
+
+
+def _transformation(transformation):
+    """Returns the (kind, arguments) of a transformation from a mapping, raising ValueError if it's not valid"""
+    if not isinstance(transformation, dict) or len(transformation) != 1:
+        raise ValueError("Transformations must have exactly one kind: {!r}".format(transformation))
+
+    [(kind, arguments)] = transformation.items()
+    if kind not in TRANSFORMATIONS:
+        raise ValueError("Unknown transformation {!r}".format(kind))
+
+    return kind, arguments
+
+
+def apply_transformations(document, transformations):
+    """Applies each of a mapping's `transformations` to `document` in turn, without compiling them"""
+    for transformation in transformations:
+        kind, arguments = _transformation(transformation)
+        TRANSFORMATIONS[kind](document, **arguments)
+
+    return document
+
+
+def get_type_mapping(mapping):
+    """Returns the `mappings` of a generated mapping, without the mapping type if it has one"""
+    mappings = mapping['mappings']
+    if '_meta' not in mappings and 'properties' not in mappings and len(mappings) == 1:
+        mappings = next(iter(mappings.values()))
+
+    return mappings
+
+
+def get_mapping_transformations(mapping):
+    """Returns the `transformations` from the `_meta` of a generated mapping, with or without a mapping type"""
+    return get_type_mapping(mapping).get('_meta', {}).get('transformations', [])
+
+
+def _condition_values(kind, arguments):
+    """The values of its field that a (non `hash_to`) transformation applies to a document for"""
+    return arguments['lookup'].keys() if kind == 'append_from_lookup' else arguments['any_of']
+
+
+class _Stage(object):
+    """Transformations which can be matched against a document at once, since none can change another's match"""
+
+    def __init__(self):
+        self.transformations = []
+        # field -> value -> indexes of the transformations matching a document with that value
+        self.lookups = defaultdict(lambda: defaultdict(list))
+        # field -> indexes of the transformations applying to every document with that field
+        self.field_lookups = defaultdict(list)
+        self.written_values = defaultdict(set)
+        self.overwritten_fields = set()
+
+    def can_add(self, kind, arguments):
+        field = arguments['field']
+        if field in self.overwritten_fields:
+            return False
+        if kind == 'hash_to':
+            return field not in self.written_values
+
+        return not self.written_values.get(field, set()).intersection(_condition_values(kind, arguments))
+
+    def add(self, kind, arguments):
+        index = len(self.transformations)
+        self.transformations.append((TRANSFORMATIONS[kind], arguments))
+
+        field, target_field = arguments['field'], arguments.get('target_field') or arguments['field']
+        if kind == 'hash_to':
+            self.field_lookups[field].append(index)
+        else:
+            for value in _condition_values(kind, arguments):
+                self.lookups[field][value].append(index)
+
+        if kind == 'append_conditionally':
+            self.written_values[target_field].update(arguments['append_value'])
+        elif kind == 'append_from_lookup':
+            for values in arguments['lookup'].values():
+                self.written_values[target_field].update(values)
+        else:
+            self.overwritten_fields.add(target_field)
+
+    def apply(self, document):
+        matches = set()
+        for field, indexes in self.field_lookups.items():
+            if field in document:
+                matches.update(indexes)
+
+        for field, lookup in self.lookups.items():
+            if field in document:
+                for value in _values(document[field]):
+                    try:
+                        matches.update(lookup.get(value, ()))
+                    except TypeError:  # lists and objects can't match
+                        pass
+
+        for index in sorted(matches):
+            function, arguments = self.transformations[index]
+            if function is append_conditionally:
+                _append(document, arguments.get('target_field') or arguments['field'], arguments['append_value'])
+            else:
+                function(document, **arguments)
+
+
+class Transformer(object):
+    """Applies compiled transformations to documents. See `compile_transformations`."""
+
+    def __init__(self, stages):
+        self.stages = stages
+
+    def transform(self, document):
+        """Applies the transformations to `document` in place, and returns it"""
+        for stage in self.stages:
+            stage.apply(document)
+
+        return document
+
+    def transform_documents(self, documents):
+        """Yields each document of an iterable once it's been transformed"""
+        for document in documents:
+            yield self.transform(document)
+
+
+def compile_transformations(transformations):
+    """
+    Returns a `Transformer` giving the same results as `apply_transformations` for a mapping's `transformations`.
+    Raises ValueError if any transformation isn't valid.
+    """
+    stages = []
+    for transformation in transformations:
+        kind, arguments = _transformation(transformation)
+        if not stages or not stages[-1].can_add(kind, arguments):
+            stages.append(_Stage())
+        stages[-1].add(kind, arguments)
+
+    return Transformer(stages)
@@ -1,133 +1,233 @@
 import os
 import re
 import json
-from dmcontent import ContentLoader
+import hashlib
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import yaml
+from dmcontent import __version__ as content_loader_version
+from dmcontent.utils import TemplateField
+
+from schema_generator import content
+from schema_generator.content import get_manifest
+from schema_generator.options import iter_leaf_options, option_value
+from schema_generator.serialization import GZIP_SUFFIX, write_json
 
 MANIFESTS = {
     'services': {
         'question_set': 'services',
-        'manifest': 'edit_submission'
+        'manifest': 'edit_submission',
+        'title': "Service",
     },
     'briefs': {
         'question_set': 'briefs',
-        'manifest': 'edit_brief'
+        'manifest': 'edit_brief',
+        'title': "Brief",
     },
     'brief-responses': {
         'question_set': 'brief-responses',
-        'manifest': 'edit_brief_response'
+        'manifest': 'edit_brief_response',
+        'title': "Brief Response",
+        # responses and awards are for briefs, so a lot has them if it has briefs
+        'lots_from': 'briefs',
     },
     'brief-awards': {
         'question_set': 'briefs',
-        'manifest': 'award_brief'
+        'manifest': 'award_brief',
+        'title': "Brief Award",
+        # responses and awards are for briefs, so a lot has them if it has briefs
+        'lots_from': 'briefs',
     },
 }
 
-LEGACY_GCLOUD_LOTS = [
-    ('scs', 'SCS'), ('iaas', 'IaaS'), ('paas', 'PaaS'), ('saas', 'SaaS')
-]
-G_CLOUD_LOTS = [
-    ('cloud-hosting', 'Cloud Hosting'),
-    ('cloud-software', 'Cloud Software'),
-    ('cloud-support', 'Cloud Support')
-]
-DOS_LOTS = [
-    ('digital-outcomes', 'Digital outcomes'),
-    ('digital-specialists', 'Digital specialists'),
-    ('user-research-participants', 'User research participants'),
-    ('user-research-studios', 'User research studios')
-]
-
-FRAMEWORKS_AND_LOTS = {
-    "g-cloud": [
-        {'framework_slug': 'g-cloud-7', 'framework_name': "G-Cloud 7", 'lots': LEGACY_GCLOUD_LOTS},
-        {'framework_slug': 'g-cloud-8', 'framework_name': "G-Cloud 8", 'lots': LEGACY_GCLOUD_LOTS},
-        {'framework_slug': 'g-cloud-9', 'framework_name': "G-Cloud 9", 'lots': G_CLOUD_LOTS},
-        {'framework_slug': 'g-cloud-10', 'framework_name': "G-Cloud 10", 'lots': G_CLOUD_LOTS},
-        {'framework_slug': 'g-cloud-11', 'framework_name': "G-Cloud 11", 'lots': G_CLOUD_LOTS},
-        {'framework_slug': 'g-cloud-12', 'framework_name': "G-Cloud 12", 'lots': G_CLOUD_LOTS},
-        {'framework_slug': 'g-cloud-13', 'framework_name': "G-Cloud 13", 'lots': G_CLOUD_LOTS},
-    ],
-    "digital-outcomes-and-specialists": [
-        {
-            'framework_slug': 'digital-outcomes-and-specialists',
-            'framework_name': "Digital Outcomes and Specialists",
-            'lots': DOS_LOTS
-        },
-        {
-            'framework_slug': 'digital-outcomes-and-specialists-2',
-            'framework_name': "Digital Outcomes and Specialists 2",
-            'lots': DOS_LOTS
-        },
-        {
-            'framework_slug': 'digital-outcomes-and-specialists-3',
-            'framework_name': "Digital Outcomes and Specialists 3",
-            'lots': DOS_LOTS
-        },
-        {
-            'framework_slug': 'digital-outcomes-and-specialists-4',
-            'framework_name': "Digital Outcomes and Specialists 4",
-            'lots': DOS_LOTS
-        },
-        {
-            'framework_slug': 'digital-outcomes-and-specialists-5',
-            'framework_name': "Digital Outcomes and Specialists 5",
-            'lots': DOS_LOTS
-        },
-    ]
+FRAMEWORKS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frameworks')
+
+FRAMEWORK_FAMILY_NAMES = {
+    'g-cloud': "G-Cloud",
+    'digital-outcomes-and-specialists': "Digital Outcomes and Specialists",
+}
+
+# Short lot names used in schema titles. Lots that aren't listed are named by their option label in the
+# framework's `lot.yml` question
+LOT_NAMES = {
+    'scs': "SCS",
+    'iaas': "IaaS",
+    'paas': "PaaS",
+    'saas': "SaaS",
+    'cloud-hosting': "Cloud Hosting",
+    'cloud-software': "Cloud Software",
+    'cloud-support': "Cloud Support",
+    'digital-outcomes': "Digital outcomes",
+    'digital-specialists': "Digital specialists",
+    'user-research-participants': "User research participants",
+    'user-research-studios': "User research studios",
 }
 
+FRAMEWORK_STATUSES = ('live', 'archived')
+
+
+class SchemaGenerationError(Exception):
+    pass
+
+
+def _framework_family_and_iteration(framework_slug):
+    family, iteration = re.match(r'^(.*?)(?:-(\d+))?$', framework_slug).groups()
+    return family, int(iteration or 1)
+
+
+def _framework_name(family, iteration):
+    family_name = FRAMEWORK_FAMILY_NAMES.get(family, family.replace('-', ' ').capitalize())
+    return family_name if iteration == 1 else "{} {}".format(family_name, iteration)
+
+
+def _framework_lots(framework_path):
+    lot_question_path = os.path.join(framework_path, 'questions', 'services', 'lot.yml')
+    if not os.path.isfile(lot_question_path):
+        return []
+
+    with open(lot_question_path) as f:
+        lot_question = yaml.safe_load(f)
+
+    return [
+        (option['value'], LOT_NAMES.get(option['value'], option['label']))
+        for option in lot_question.get('options', [])
+    ]
+
+
+def _load_yaml(path):
+    with open(path) as f:
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader)) or {}
 
-def _get_schema_title_and_slugs(schema_type, framework_family=None, exclude_lot=None):
-    titles_and_slugs = []
-    for family, framework_list in FRAMEWORKS_AND_LOTS.items():
-        if framework_family:
-            # Some schemas are only required for DOS frameworks
-            if framework_family != family:
-                continue
-
-        for framework in framework_list:
-            for lot_slug, lot_name in framework['lots']:
-                if exclude_lot:
-                    # Some lots don't have briefs/brief response/brief award schemas
-                    if exclude_lot == lot_slug:
-                        continue
-
-                titles_and_slugs.append(
-                    (
-                        "{} {} {}".format(framework['framework_name'], lot_name, schema_type),
-                        framework['framework_slug'],
-                        lot_slug
-                    )
+
+def _question_lot_rules(questions_path, question_id):
+    """The lots named by the `depends` rules of a question file and the questions nested in it"""
+    question = _load_yaml(os.path.join(questions_path, '{}.yml'.format(question_id)))
+    lots = {
+        lot_slug
+        for rule in question.get('depends', [])
+        if rule.get('on') == 'lot'
+        for lot_slug in rule.get('being', [])
+    }
+    for nested_question in question.get('questions', []):
+        lots.update(_question_lot_rules(questions_path, nested_question))
+
+    return lots
+
+
+def _manifest_lots(manifest_path, questions_path, lot_slugs):
+    """
+    The lots in `lot_slugs` which any of the manifest's questions depend on, or all of them if none of its
+    questions depend on the lot
+    """
+    manifest_lots = set()
+    for section in _load_yaml(manifest_path):
+        for question_id in section.get('questions', []):
+            manifest_lots.update(_question_lot_rules(questions_path, question_id))
+
+    return [lot_slug for lot_slug in lot_slugs if lot_slug in manifest_lots or not manifest_lots]
+
+
+def _framework_schema_types(framework_path, lot_slugs):
+    schema_types = OrderedDict()
+    for schema_type, manifest in MANIFESTS.items():
+        manifest_path = os.path.join(framework_path, 'manifests', '{}.yml'.format(manifest['manifest']))
+        questions_path = os.path.join(framework_path, 'questions', manifest['question_set'])
+        if os.path.isfile(manifest_path) and os.path.isdir(questions_path):
+            schema_types[schema_type] = _manifest_lots(manifest_path, questions_path, lot_slugs)
+
+    for schema_type, manifest in MANIFESTS.items():
+        if schema_type in schema_types and 'lots_from' in manifest:
+            schema_types[schema_type] = schema_types.get(manifest['lots_from'], [])
+
+    return schema_types
+
+
+@lru_cache(maxsize=None)
+def get_framework_index(frameworks_path=FRAMEWORKS_PATH):
+    """
+    Scans the frameworks in `frameworks_path` (once per process) and returns an OrderedDict of framework slug
+    to a dict of the framework's `framework_slug`, `framework_name`, `family`, `lots` (a list of (slug, name)
+    pairs from its `lot.yml` question), `schema_types` (a dict of each schema type it has a manifest for to
+    the slugs of the lots that have that schema) and `status`. A lot has a schema if the `depends` rules of the
+    manifest's questions name it (see `_manifest_lots`), or if it has briefs for brief responses and awards.
+
+    The latest framework of each family is `live` and the others are `archived`. The content doesn't record
+    framework statuses, so this is only a guess: an older framework can still be live. Frameworks without a
+    lot question aren't included.
+    """
+    frameworks = []
+    for framework_slug in os.listdir(frameworks_path):
+        framework_path = os.path.join(frameworks_path, framework_slug)
+        lots = _framework_lots(framework_path)
+        if lots:
+            family, iteration = _framework_family_and_iteration(framework_slug)
+            frameworks.append((family, iteration, {
+                'framework_slug': framework_slug,
+                'framework_name': _framework_name(family, iteration),
+                'family': family,
+                'lots': lots,
+                'schema_types': _framework_schema_types(framework_path, [lot_slug for lot_slug, _ in lots]),
+            }))
+
+    latest_iterations = {}
+    for family, iteration, _ in frameworks:
+        latest_iterations[family] = max(iteration, latest_iterations.get(family, iteration))
+
+    index = OrderedDict()
+    for family, iteration, framework in sorted(frameworks, key=lambda framework: framework[:2]):
+        framework['status'] = 'live' if iteration == latest_iterations[family] else 'archived'
+        index[framework['framework_slug']] = framework
+
+    return index
+
+
+def get_schemas(status=None, frameworks_path=FRAMEWORKS_PATH):
+    """
+    Returns a dict of schema type to a list of (schema_name, framework_slug, lot_slug) for every schema of the
+    frameworks in `frameworks_path`, or only those of frameworks with the given `status` (see
+    `get_framework_index`).
+    """
+    schemas = OrderedDict((schema_type, []) for schema_type in MANIFESTS)
+    for framework in get_framework_index(frameworks_path).values():
+        if status and framework['status'] != status:
+            continue
+
+        for schema_type, lot_slugs in framework['schema_types'].items():
+            schemas[schema_type].extend(
+                (
+                    "{} {} {}".format(framework['framework_name'], lot_name, MANIFESTS[schema_type]['title']),
+                    framework['framework_slug'],
+                    lot_slug,
                 )
-    return titles_and_slugs
-
-
-SCHEMAS = {
-    'services': _get_schema_title_and_slugs("Service"),
-    'briefs': _get_schema_title_and_slugs(
-        "Brief", "digital-outcomes-and-specialists", exclude_lot="user-research-studios"
-    ),
-    'brief-responses': _get_schema_title_and_slugs(
-        "Brief Response", "digital-outcomes-and-specialists", exclude_lot="user-research-studios"
-    ),
-    'brief-awards': _get_schema_title_and_slugs(
-        "Brief Award", "digital-outcomes-and-specialists", exclude_lot="user-research-studios"
-    )
-}
+                for lot_slug, lot_name in framework['lots'] if lot_slug in lot_slugs
+            )
+
+    return schemas
 
 
-def load_questions(schema_type, framework_slug, lot_slug):
-    loader = ContentLoader('./')
-    loader.load_manifest(
+@lru_cache(maxsize=None)
+def get_lot_manifest(schema_type, framework_slug, lot_slug, content_path='./'):
+    return get_manifest(
         framework_slug,
         MANIFESTS[schema_type]['question_set'],
-        MANIFESTS[schema_type]['manifest']
-    )
-
-    manifest = loader.get_manifest(framework_slug, MANIFESTS[schema_type]['manifest']).filter(
+        MANIFESTS[schema_type]['manifest'],
+        content_path=content_path,
+    ).filter(
         {'lot': lot_slug},
         dynamic=False
     )
+
+
+def clear_content_cache():
+    """Forget all loaded content, so the next schema generation re-reads the framework files."""
+    get_lot_manifest.cache_clear()
+    content.clear_content_cache()
+
+
+def load_questions(schema_type, framework_slug, lot_slug, content_path='./'):
+    manifest = get_lot_manifest(schema_type, framework_slug, lot_slug, content_path=content_path)
     return {q['id']: q for q in sum((s.questions for s in manifest.sections), [])}
 
 
@@ -149,6 +249,30 @@ def merge_schemas(a, b):
     return result
 
 
+def merge_schemas_into(schema, addition):
+    """
+    Merges `addition` into `schema` in place, the same way as `merge_schemas`: nested dicts are merged,
+    lists are extended and anything else is replaced.
+
+    Values from `addition` become part of `schema` without being copied (so they can be extended by later
+    merges), so `addition` mustn't be used again afterwards.
+    """
+    if not (isinstance(schema, dict) and isinstance(addition, dict)):
+        raise TypeError("Error merging unsupported types '{}' and '{}'".format(
+            type(schema).__name__, type(addition).__name__
+        ))
+
+    for key, val in addition.items():
+        if isinstance(schema.get(key), dict):
+            merge_schemas_into(schema[key], val)
+        elif isinstance(schema.get(key), list):
+            schema[key].extend(val)
+        else:
+            schema[key] = val
+
+    return schema
+
+
 def empty_schema(schema_name):
     return {
         "title": "{} Schema".format(schema_name),
@@ -216,17 +340,8 @@ def checkbox_tree_property(question):
     Convert a checkbox tree question into JSON Schema by flattening the tree structure. Only leaf
     nodes can be selected.
     """
-    def flatten(options):
-        for option in options:
-            children = option.get('options', [])
-            if not children:
-                yield option
-            else:
-                for child in flatten(children):
-                    yield child
-
     # items may not be unique, so using a set not a list
-    all_items = {option.get('value', option['label']) for option in flatten(question['options'])}
+    all_items = {option_value(option) for option, _ in iter_leaf_options(question['options'])}
 
     schema_fragment = {question['id']: {
         "type": "array",
@@ -264,7 +379,7 @@ def list_property(question):
     items = {
         "type": "string",
         "maxLength": 100,
-        "pattern": "^(?:\\S+\\s+){0,9}\\S+$"
+        "pattern": WORD_LIMIT_PATTERN % 9
     }
 
     items.update(parse_question_limits(question, for_items=True))
@@ -288,13 +403,17 @@ def boolean_list_property(question):
     }}
 
 
+PRICE_PATTERN = r"^\d{1,15}(?:\.\d{1,5})?$"  # up to 5 decimal places allowed eg 0, 90, 90.1, 90.12345
+# restricted to positive numbers with 0dp or 2dp only eg 90 or 90.12
+RESTRICTED_PRICE_PATTERN = r"^[1-9](?:\d{1,14})?(?:\.\d{2})?$|^0\.(?!00)\d{2}$"
+WORD_LIMIT_PATTERN = r"^(?:\S+\s+){0,%s}\S+$"
+
+
 def price_string(optional, decimal_place_restriction=False):
-    pattern = r"^\d{1,15}(?:\.\d{1,5})?$"  # up to 5 decimal places allowed eg 0, 90, 90.1, 90.12345
-    # restricted to positive numbers with 0dp or 2dp only eg 90 or 90.12
-    restricted_pattern = r"^[1-9](?:\d{1,14})?(?:\.\d{2})?$|^0\.(?!00)\d{2}$"
+    pattern = PRICE_PATTERN
 
     if decimal_place_restriction:
-        pattern = restricted_pattern
+        pattern = RESTRICTED_PRICE_PATTERN
     if optional:
         pattern = r"^$|" + pattern
     return {
@@ -396,8 +515,7 @@ def multiquestion(question):
         property_schema, schema_addition = _flat_multiquestion(question)
         required_fields = _flat_multiquestion_required(question)
         if required_fields:
-            required_schema = {"required": _flat_multiquestion_required(question)}
-            schema_addition = merge_schemas(schema_addition, required_schema)
+            merge_schemas_into(schema_addition, {"required": required_fields})
 
         return property_schema, schema_addition
 
@@ -467,6 +585,40 @@ def _followup(question, root):
     return {'allOf': schemas}
 
 
+def _followup_to_conditional(followup_schema):
+    no_followup, followup = followup_schema['oneOf']
+    question_id = next(key for key in followup['properties'])
+
+    # The question's value can't match both branches, so both branches can only be valid when the question
+    # hasn't been answered. If the question is required by the followup branch that can't happen either, and
+    # oneOf is the same as "if the first branch isn't valid then the second one must be".
+    if question_id in followup.get('required', []):
+        return {'if': no_followup, 'else': followup}
+
+    return {'if': no_followup, 'then': {'not': followup}, 'else': followup}
+
+
+def followups_to_conditionals(schema):
+    """
+    Replaces the oneOf schemas generated for followup questions with equivalent draft-07 if/then/else
+    schemas, so validators only need to evaluate the followup branch when the question isn't answered in a
+    way that rules out the followup. Modifies the schema in place.
+    """
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            if key == 'allOf' and isinstance(value, list):
+                schema[key] = [
+                    _followup_to_conditional(subschema) if list(subschema) == ['oneOf'] else subschema
+                    for subschema in value
+                ]
+            followups_to_conditionals(schema[key])
+    elif isinstance(schema, list):
+        for value in schema:
+            followups_to_conditionals(value)
+
+    return schema
+
+
 def _flat_multiquestion(question):
     properties = {}
     for nested_question in question.questions:
@@ -475,10 +627,7 @@ def _flat_multiquestion(question):
     schema_addition = {}
     for nested_question in question.questions:
         if nested_question.get('followup'):
-            schema_addition = merge_schemas(
-                schema_addition,
-                _followup(nested_question, question)
-            )
+            merge_schemas_into(schema_addition, _followup(nested_question, question))
 
     return properties, schema_addition
 
@@ -486,7 +635,7 @@ def _flat_multiquestion(question):
 def _nested_multiquestion(question):
     properties, schema_addition = _flat_multiquestion(question)
 
-    object_schema = merge_schemas({
+    object_schema = merge_schemas_into({
         "type": "object",
         "additionalProperties": False,
         "properties": properties,
@@ -581,13 +730,61 @@ def parse_question_limits(question, for_items=False):
 
     if word_length:
         if not for_items and question.get('optional'):
-            limits['pattern'] = r"^$|(^(?:\S+\s+){0,%s}\S+$)" % (int(word_length) - 1)
+            limits['pattern'] = r"^$|(" + WORD_LIMIT_PATTERN % (int(word_length) - 1) + ")"
         else:
-            limits['pattern'] = r"^(?:\S+\s+){0,%s}\S+$" % (int(word_length) - 1)
+            limits['pattern'] = WORD_LIMIT_PATTERN % (int(word_length) - 1)
 
     return limits
 
 
+_WORD_LIMIT_PATTERN_RE = re.compile(re.escape(WORD_LIMIT_PATTERN).replace('%s', r'(\d+)'))
+
+
+def pattern_format(pattern):
+    """
+    Returns the name of the `schema_generator.formats` format that accepts exactly the same strings as one of
+    our generated word limit or price patterns, or None for any other pattern.
+    """
+    prefix = ''
+    if pattern.startswith('^$|'):
+        prefix = 'empty-or-'
+        pattern = pattern[len('^$|'):]
+        if pattern.startswith('(') and pattern.endswith(')'):
+            pattern = pattern[1:-1]
+
+    if pattern == PRICE_PATTERN:
+        return prefix + 'price'
+    if pattern == RESTRICTED_PRICE_PATTERN:
+        return prefix + 'price-2dp'
+
+    word_limit = _WORD_LIMIT_PATTERN_RE.fullmatch(pattern)
+    if word_limit:
+        return prefix + 'max-words:{}'.format(int(word_limit.group(1)) + 1)
+
+    return None
+
+
+def patterns_to_formats(schema):
+    """
+    Replaces generated word limit and price patterns in a schema with equivalent custom formats, which can be
+    checked in linear time by `schema_generator.formats.FormatChecker`. Modifies the schema in place.
+    """
+    if isinstance(schema, dict):
+        if isinstance(schema.get('pattern'), str) and 'format' not in schema:
+            format_name = pattern_format(schema['pattern'])
+            if format_name:
+                del schema['pattern']
+                schema['format'] = format_name
+
+        for value in schema.values():
+            patterns_to_formats(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            patterns_to_formats(value)
+
+    return schema
+
+
 def add_assurance(value_schema, assurance_approach):
     assurance_options = {
         '2answers-type1': [
@@ -640,7 +837,7 @@ def add_assurance(value_schema, assurance_approach):
     }
 
 
-def build_question_properties(question):
+def _build_question_properties(question):
     question_data = QUESTION_TYPES[question['type']](question)
     if question.get('assuranceApproach'):
         for key, value_schema in question_data.items():
@@ -648,6 +845,100 @@ def build_question_properties(question):
     return question_data
 
 
+# Question keys which are only used to display the question, so don't change its schema
+DISPLAY_ONLY_QUESTION_KEYS = frozenset([
+    'question', 'name', 'question_advice', 'hint', 'slug', 'depends', 'hidden', 'empty_message', 'list_item_name',
+    'filter_label', 'unit', 'unit_in_full', 'unit_position', 'smaller', 'before_summary_value', 'field_defaults',
+])
+
+FRAGMENT_CACHE_FILENAME = '.validation-schemas-fragment-cache.json'
+
+# question fragment key -> (whether the fragment has a schema addition, fragment JSON)
+_fragment_cache = {}
+fragment_cache_stats = Counter()
+
+
+def _question_key_data(question):
+    key_data = {key: value for key, value in question._data.items() if key not in DISPLAY_ONLY_QUESTION_KEYS}
+    if 'questions' in key_data:
+        # the nested questions that are left once the question's been filtered
+        key_data['questions'] = [_question_key_data(nested_question) for nested_question in question.questions]
+
+    return key_data
+
+
+def question_fragment_key(question):
+    """
+    A hash of the parts of a filtered question that its schema fragment is built from, so questions that are
+    the same in several frameworks or lots have the same key. Template fields are hashed by their source, along
+    with the filter context if any of them could render differently in a different context.
+    """
+    templates = []
+
+    def template_source(field):
+        if not isinstance(field, TemplateField):
+            raise TypeError("Can't hash {!r} in question {}".format(field, question['id']))
+        if '{' in field.source:
+            templates.append(field)
+        return field.source
+
+    key_json = json.dumps(_question_key_data(question), sort_keys=True, default=template_source)
+    if templates:
+        key_json += json.dumps(question._context, sort_keys=True, default=str)
+
+    return hashlib.sha1(key_json.encode('utf-8')).hexdigest()
+
+
+def build_question_properties(question):
+    """
+    Builds the schema fragment for a question: a dict of properties, or a (properties, schema addition) tuple.
+
+    Fragments are cached by `question_fragment_key`, so each distinct question is only built once however
+    many schemas it's in. Every call returns a new copy of the fragment, which can be changed freely. Cache
+    hits and misses are counted in `fragment_cache_stats`.
+    """
+    key = question_fragment_key(question)
+    try:
+        has_schema_addition, fragment_json = _fragment_cache[key]
+    except KeyError:
+        question_data = _build_question_properties(question)
+        _fragment_cache[key] = (isinstance(question_data, tuple), json.dumps(question_data))
+        fragment_cache_stats['misses'] += 1
+        return question_data
+
+    fragment_cache_stats['hits'] += 1
+    question_data = json.loads(fragment_json)
+    return tuple(question_data) if has_schema_addition else question_data
+
+
+def clear_fragment_cache():
+    _fragment_cache.clear()
+    fragment_cache_stats.clear()
+
+
+def load_fragment_cache(file_path):
+    """
+    Adds the fragments saved to `file_path` by `save_fragment_cache` to the cache, unless they were built by
+    a different version of the generator (see `generator_hash`) or the file doesn't exist.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            saved_cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return
+
+    if saved_cache.get('generator') == generator_hash():
+        _fragment_cache.update(
+            (key, tuple(fragment)) for key, fragment in saved_cache['fragments'].items()
+        )
+
+
+def save_fragment_cache(file_path):
+    with open(file_path, 'w') as f:
+        json.dump({'generator': generator_hash(), 'fragments': _fragment_cache}, f, sort_keys=True)
+        f.write(os.linesep)
+
+
 def build_any_of(any_of, fields):
     return {
         'required': [field for field in sorted(fields)],
@@ -661,7 +952,7 @@ def build_schema_properties(schema, questions):
         if isinstance(property_schema, tuple):
             property_schema, schema_addition = property_schema
             schema['properties'].update(property_schema)
-            schema = merge_schemas(schema, schema_addition)
+            merge_schemas_into(schema, schema_addition)
         else:
             schema['properties'].update(property_schema)
             schema['required'].extend(question.required_form_fields)
@@ -700,21 +991,275 @@ def _multiquestion_dependencies(questions):
     return {'dependencies': dependencies} if dependencies else {}
 
 
-def generate_schema(schema_type, schema_name, framework_slug, lot_slug):
-    questions = load_questions(schema_type, framework_slug, lot_slug)
+def generate_schema(
+    schema_type, schema_name, framework_slug, lot_slug, content_path='./', formats=False, conditionals=False
+):
+    questions = load_questions(schema_type, framework_slug, lot_slug, content_path=content_path)
     drop_non_schema_questions(questions)
     schema = empty_schema(schema_name)
 
-    schema = build_schema_properties(schema, questions)
-    schema = merge_schemas(schema, _multiquestion_anyof(questions))
-    schema = merge_schemas(schema, _multiquestion_dependencies(questions))
+    build_schema_properties(schema, questions)
+    merge_schemas_into(schema, _multiquestion_anyof(questions))
+    merge_schemas_into(schema, _multiquestion_dependencies(questions))
+
+    if formats:
+        patterns_to_formats(schema)
+    if conditionals:
+        followups_to_conditionals(schema)
 
     return schema
 
 
-def generate_schema_todir(dir_path, schema_type, schema_name, framework_slug, lot_slug):
-    schema = generate_schema(schema_type, schema_name, framework_slug, lot_slug)
+def _schema_id(schema_type, framework_slug, lot_slug):
+    return '{}-{}-{}'.format(schema_type, framework_slug, lot_slug)
+
+
+def _schema_filename(schema_type, framework_slug, lot_slug):
+    return '{}.json'.format(_schema_id(schema_type, framework_slug, lot_slug))
+
+
+def generate_schema_todir(
+    dir_path, schema_type, schema_name, framework_slug, lot_slug, output_format='pretty', gzipped=False,
+    **schema_options
+):
+    schema = generate_schema(schema_type, schema_name, framework_slug, lot_slug, **schema_options)
+
+    write_json(
+        os.path.join(dir_path, _schema_filename(schema_type, framework_slug, lot_slug)), schema,
+        output_format, gzipped=gzipped,
+    )
+
+
+def _schema_hash(schema):
+    return hashlib.sha1(json.dumps(schema, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+BUNDLE_FILENAME = 'validation-schemas-bundle.json'
+
+
+def generate_schema_bundle(schemas=None, **schema_options):
+    """
+    Builds a single draft-07 document containing every schema in `schemas` (every schema, by default), with
+    each distinct property schema stored once under `definitions` (keyed by `property-` and a hash of its
+    content) and referenced from every schema using it.
+
+    Each schema is under `definitions` too, keyed by the same name as its file would have (without `.json`),
+    so it can be referenced as `<bundle uri>#/definitions/<name>`.
+    """
+    if schemas is None:
+        schemas = get_schemas()
+
+    definitions = {}
+    entry_points = {}
+    for schema_type, schema_list in schemas.items():
+        for schema_name, framework_slug, lot_slug in schema_list:
+            schema = generate_schema(schema_type, schema_name, framework_slug, lot_slug, **schema_options)
+            schema_id = _schema_id(schema_type, framework_slug, lot_slug)
+
+            for key, property_schema in schema['properties'].items():
+                definition_key = 'property-{}'.format(_schema_hash(property_schema)[:16])
+                if definitions.setdefault(definition_key, property_schema) != property_schema:
+                    raise SchemaGenerationError("Hash collision between property schemas in {}".format(schema_id))
+                schema['properties'][key] = {'$ref': '#/definitions/{}'.format(definition_key)}
+
+            del schema['$schema']
+            entry_points[schema_id] = schema
+
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "title": "Digital Marketplace Validation Schemas",
+        "definitions": dict(definitions, **entry_points),
+    }
+
+
+def generate_schema_bundle_tofile(file_path, schemas=None, output_format='pretty', gzipped=False, **schema_options):
+    write_json(file_path, generate_schema_bundle(schemas, **schema_options), output_format, gzipped=gzipped)
+
+
+# where generate-validation-schemas.py keeps its build cache by default, outside the schemas directory
+BUILD_CACHE_FILENAME = '.validation-schemas-build-cache.json'
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# The modules of this package that generated schemas depend on
+GENERATOR_MODULES = ('content.py', 'options.py', 'serialization.py', 'validation.py')
+
+
+def generator_hash():
+    """
+    A hash of the `GENERATOR_MODULES` and the content loader version, so schemas generated by a different
+    version of either are regenerated.
+    """
+    generator = hashlib.sha1(content_loader_version.encode('utf-8'))
+    for filename in GENERATOR_MODULES:
+        generator.update(_file_hash(os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)).encode())
+
+    return generator.hexdigest()
 
-    with open(os.path.join(dir_path, '{}-{}-{}.json'.format(schema_type, framework_slug, lot_slug)), 'w') as f:
-        json.dump(schema, f, sort_keys=True, indent=2, separators=(',', ': '))
+
+def schema_input_files(schema_type, framework_slug):
+    """The manifest and question files a schema is generated from."""
+    framework_path = os.path.join('frameworks', framework_slug)
+    questions_path = os.path.join(framework_path, 'questions', MANIFESTS[schema_type]['question_set'])
+
+    return [
+        os.path.join(framework_path, 'manifests', '{}.yml'.format(MANIFESTS[schema_type]['manifest']))
+    ] + sorted(
+        os.path.join(questions_path, filename) for filename in os.listdir(questions_path)
+    )
+
+
+def _load_build_cache(file_path):
+    try:
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_build_cache(file_path, build_cache):
+    with open(file_path, 'w') as f:
+        json.dump(build_cache, f, sort_keys=True, indent=2, separators=(',', ': '))
         f.write(os.linesep)
+
+
+def _stale_schemas(dir_path, schemas, build_cache, schema_options, output_options):
+    """
+    Works out which schemas need regenerating, and the build cache entries to record for them once they
+    have been. A schema is up to date if its output files exist and its title, generation and output options
+    and input file hashes match the ones it was last generated from.
+    """
+    file_hashes = {}
+    stale_schemas = {}
+    new_outputs = {}
+    for schema_type, schema_list in schemas.items():
+        for schema_name, framework_slug, lot_slug in schema_list:
+            try:
+                input_hashes = {}
+                for path in schema_input_files(schema_type, framework_slug):
+                    if path not in file_hashes:
+                        file_hashes[path] = _file_hash(path)
+                    input_hashes[path] = file_hashes[path]
+            except OSError:
+                # missing content is reported properly when we try to generate the schema
+                input_hashes = None
+
+            filename = _schema_filename(schema_type, framework_slug, lot_slug)
+            output = {
+                'title': schema_name, 'inputs': input_hashes, 'options': schema_options, 'output': output_options,
+            }
+            output_files = [filename, filename + GZIP_SUFFIX] if output_options['gzipped'] else [filename]
+            if (
+                build_cache.get('outputs', {}).get(filename) != output
+                or not all(os.path.exists(os.path.join(dir_path, output_file)) for output_file in output_files)
+            ):
+                stale_schemas.setdefault(schema_type, []).append((schema_name, framework_slug, lot_slug))
+                new_outputs[filename] = output
+
+    return stale_schemas, new_outputs
+
+
+def generate_framework_schemas_todir(dir_path, framework_schemas, schema_options={}, output_options={}):
+    """Write a list of (schema_type, schema_name, framework_slug, lot_slug) schemas, naming the one that fails."""
+    for schema_type, schema_name, framework_slug, lot_slug in framework_schemas:
+        try:
+            generate_schema_todir(
+                dir_path, schema_type, schema_name, framework_slug, lot_slug, **output_options, **schema_options
+            )
+        except Exception as e:
+            raise SchemaGenerationError("Error generating {} schema for framework {} lot {}: {!r}".format(
+                schema_type, framework_slug, lot_slug, e
+            )) from e
+
+
+def _use_fragment_cache(fragments):
+    _fragment_cache.update(fragments)
+
+
+def _generate_framework_schemas_in_worker(*args):
+    # hand the fragments this worker built, and its cache stats, back to the main process
+    cached_keys = set(_fragment_cache)
+    fragment_cache_stats.clear()
+    generate_framework_schemas_todir(*args)
+
+    return (
+        {key: fragment for key, fragment in _fragment_cache.items() if key not in cached_keys},
+        fragment_cache_stats.copy(),
+    )
+
+
+def _group_schemas_by_framework(schemas):
+    framework_schemas = OrderedDict()
+    for schema_type, schema_list in schemas.items():
+        for schema_name, framework_slug, lot_slug in schema_list:
+            framework_schemas.setdefault(framework_slug, []).append(
+                (schema_type, schema_name, framework_slug, lot_slug)
+            )
+
+    return framework_schemas
+
+
+def generate_schemas_todir(
+    dir_path, schemas=None, jobs=1, force=False, formats=False, conditionals=False, output_format='pretty',
+    gzipped=False, build_cache_path=None,
+):
+    """
+    Write every schema in `schemas` (every schema, by default) to `dir_path`. With more than one job, each
+    framework's schemas are generated in a separate worker process, so every worker only loads its
+    framework's content once.
+
+    With a `build_cache_path`, the build cache file there records the content hashes of the files each schema
+    in `dir_path` was generated from, and only schemas whose inputs have changed since are regenerated (all
+    of them if `force` is set). Keep it out of `dir_path`, so it isn't shipped with the schemas. Returns the
+    filenames of the schemas that were written.
+
+    With `formats` set, word limit and price patterns are replaced with custom formats (see
+    `patterns_to_formats`), and with `conditionals` set followups use if/else rather than oneOf (see
+    `followups_to_conditionals`).
+
+    Schemas are written in `output_format` (see `schema_generator.serialization`), with a gzipped copy of
+    each if `gzipped` is set.
+
+    Workers start with the question fragments already in this process's cache (see
+    `build_question_properties`), and the fragments they build are added to it.
+    """
+    if schemas is None:
+        schemas = get_schemas()
+
+    schema_options = {'formats': formats, 'conditionals': conditionals}
+    output_options = {'output_format': output_format, 'gzipped': gzipped}
+    build_cache = _load_build_cache(build_cache_path) if build_cache_path else {}
+    generator, output_path = generator_hash(), os.path.abspath(dir_path)
+    if force or build_cache.get('generator') != generator or build_cache.get('output_path') != output_path:
+        build_cache = {'generator': generator, 'output_path': output_path, 'outputs': {}}
+
+    stale_schemas, new_outputs = _stale_schemas(dir_path, schemas, build_cache, schema_options, output_options)
+    framework_schemas = _group_schemas_by_framework(stale_schemas)
+
+    if jobs <= 1:
+        for schema_list in framework_schemas.values():
+            generate_framework_schemas_todir(dir_path, schema_list, schema_options, output_options)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_use_fragment_cache, initargs=(_fragment_cache,)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _generate_framework_schemas_in_worker, dir_path, schema_list, schema_options, output_options
+                )
+                for schema_list in framework_schemas.values()
+            ]
+            for future in futures:
+                fragments, stats = future.result()
+                _fragment_cache.update(fragments)
+                fragment_cache_stats.update(stats)
+
+    if build_cache_path and (new_outputs or not os.path.exists(build_cache_path)):
+        build_cache['outputs'].update(new_outputs)
+        _write_build_cache(build_cache_path, build_cache)
+
+    return sorted(new_outputs)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Compare a newly generated search mapping with the one an index was created with.
+
+The change is classified as `no-op`, `in-place` (the mapping can be put to the
+existing index), `transformation-only` (documents need to be re-fed to the
+existing index) or `reindex-required` (a new index is needed, and the aliases
+swapping over). See `schema_generator.mapping_compatibility`.
+
+The classification and the changes it's based on are written to stdout as
+JSON, and the exit status is 0 for `no-op`, 2 for `in-place`, 3 for
+`transformation-only` and 4 for `reindex-required` (1 means the comparison
+failed). Either mapping can be a gzipped .json.gz file.
+
+Usage:
+    check-search-mapping-compatibility.py <old_mapping> <new_mapping> [--minified]
+
+Example:
+    ./scripts/generate-search-config.py g-cloud-13 services --output-path=/tmp/mappings
+    ./scripts/check-search-mapping-compatibility.py \\
+        ../digitalmarketplace-search-api/mappings/services.json /tmp/mappings/services-g-cloud-13.json
+
+"""
+import sys
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.mapping_compatibility import (
+    IN_PLACE,
+    NO_OP,
+    REINDEX_REQUIRED,
+    TRANSFORMATION_ONLY,
+    compare_mappings,
+    load_mapping,
+)
+from schema_generator.serialization import dumps
+
+
+EXIT_STATUSES = {
+    NO_OP: 0,
+    IN_PLACE: 2,
+    TRANSFORMATION_ONLY: 3,
+    REINDEX_REQUIRED: 4,
+}
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+
+    result = compare_mappings(load_mapping(arguments['<old_mapping>']), load_mapping(arguments['<new_mapping>']))
+    print(dumps(result, 'minified' if arguments['--minified'] else 'pretty', sort_keys=False))
+
+    sys.exit(EXIT_STATUSES[result['classification']])
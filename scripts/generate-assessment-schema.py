@@ -1,20 +1,27 @@
 #!/usr/bin/env python
-"""Generate assessment JSON schema for a framework's declaration to stdout.
+"""Generate assessment JSON schema for a framework's declaration to stdout, or
+to a file.
+
+The schema is written as indented JSON unless the --minified flag is given.
+With --gzip, a gzipped .json.gz copy of the output file is written next to it.
 
 Usage:
-    generate-assessment-schema.py <framework_slug>
+    generate-assessment-schema.py <framework_slug> [--output=<output_file> [--gzip]] [--minified]
 
 """
 import sys
 sys.path.insert(0, '.')
 
-import json
-
 from docopt import docopt
 from schema_generator.assessment import generate_schema
+from schema_generator.serialization import dump, write_json
 
 
 if __name__ == '__main__':
     arguments = docopt(__doc__)
     schema = generate_schema(arguments["<framework_slug>"], "declaration", "declaration")
-    json.dump(schema, sys.stdout, sort_keys=True, indent=2, separators=(',', ': '))
+    output_format = 'minified' if arguments['--minified'] else 'pretty'
+    if arguments['--output']:
+        write_json(arguments['--output'], schema, output_format, gzipped=arguments['--gzip'], end='')
+    else:
+        dump(schema, sys.stdout, output_format)
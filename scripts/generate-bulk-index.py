@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Build Elasticsearch `_bulk` requests indexing exported documents with a generated search mapping.
+
+Each line of the documents file (or stdin, if it's "-") is a document, such as
+a service or brief from the API. The mapping's `_meta` transformations are
+applied to each one, and it's indexed to <index_name> with only the fields the
+mapping has properties for (see `schema_generator.search.generate_bulk_chunks`).
+
+The NDJSON `_bulk` bodies are written to numbered bulk-<n>.ndjson files in the
+output directory, or posted to the Elasticsearch at --url, --chunk-size
+documents at a time (500 by default). Documents are read as they're needed, so
+memory use doesn't grow with the input; with --jobs, chunks are built in that
+many worker processes.
+
+Usage:
+    generate-bulk-index.py <mapping_file> <documents_file> <index_name> (--output-path=<path> | --url=<url>) [options]
+
+Options:
+    --chunk-size=<size>  Documents per _bulk request
+    --jobs=<jobs>        Worker processes to build chunks in [default: 1]
+
+Example:
+    generate-bulk-index.py services-g-cloud-13.json services.jsonl g-cloud-13 --url=http://localhost:9200
+
+"""
+import os
+import sys
+import time
+from contextlib import nullcontext
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.mapping_compatibility import load_mapping
+from schema_generator.search import BULK_CHUNK_SIZE, generate_bulk_chunks, post_bulk_chunks, write_bulk_chunks
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    OUTPUT_DIR = arguments['--output-path']
+    if OUTPUT_DIR and not os.path.exists(OUTPUT_DIR):
+        print("Creating {} directory".format(OUTPUT_DIR))
+        os.makedirs(OUTPUT_DIR)
+
+    mapping = load_mapping(arguments['<mapping_file>'])
+    documents_file = arguments['<documents_file>']
+    start = time.perf_counter()
+    with nullcontext(sys.stdin) if documents_file == '-' else open(documents_file, encoding='utf-8') as documents:
+        chunks = generate_bulk_chunks(
+            mapping, arguments['<index_name>'], documents,
+            chunk_size=int(arguments['--chunk-size'] or BULK_CHUNK_SIZE),
+            jobs=int(arguments['--jobs']),
+        )
+        if OUTPUT_DIR:
+            print("Generated {} bulk file(s)".format(len(write_bulk_chunks(chunks, OUTPUT_DIR))))
+        else:
+            print("Indexed {} document(s)".format(post_bulk_chunks(chunks, arguments['--url'])))
+
+    print("{:.1f}s".format(time.perf_counter() - start), file=sys.stderr)
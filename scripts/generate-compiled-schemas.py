@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""Generate Python modules validating documents against each validation schema.
+
+Each module has `is_valid(instance, format_checker=None)` and
+`iter_errors(instance, format_checker=None)` functions, which give the same
+results as the `jsonschema` Draft7Validator methods of the same names for the
+schema it was compiled from, without interpreting the schema for every
+document.
+
+With --formats and --conditionals, modules are compiled from the same schemas
+as generate-validation-schemas.py generates with those flags.
+
+A module is compiled for every framework, or with --live only for the latest
+framework of each family, the same as generate-validation-schemas.py.
+
+Usage:
+    generate-compiled-schemas.py --output-path=<output_path> [--all | --live] [--formats] [--conditionals]
+
+"""
+import os
+import sys
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.compiler import generate_compiled_schemas_todir
+from schema_generator.validation import get_schemas
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    OUTPUT_DIR = arguments['--output-path']
+    if not os.path.exists(OUTPUT_DIR):
+        print("Creating {} directory".format(OUTPUT_DIR))
+        os.makedirs(OUTPUT_DIR)
+
+    written = generate_compiled_schemas_todir(
+        OUTPUT_DIR,
+        get_schemas(status='live' if arguments['--live'] else None),
+        formats=arguments['--formats'],
+        conditionals=arguments['--conditionals'],
+    )
+
+    print("Generated {} module(s)".format(len(written)))
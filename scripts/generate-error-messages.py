@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""Generate lookup tables from validation schema errors to question validation messages.
+
+An error-messages-<schema_type>-<framework_slug>-<lot_slug>.json table is
+written for each validation schema, mapping the path of a property and a
+failing schema keyword to the name and message of the matching validation in
+the questions content. See `schema_generator.error_messages`.
+
+Tables are generated for every framework, or with --live only for the latest
+framework of each family.
+
+Usage:
+    generate-error-messages.py --output-path=<path> [--all | --live] [--minified] [--gzip]
+
+"""
+import os
+import sys
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.error_messages import generate_error_messages_todir
+from schema_generator.validation import get_schemas
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    OUTPUT_DIR = arguments['--output-path']
+    if not os.path.exists(OUTPUT_DIR):
+        print("Creating {} directory".format(OUTPUT_DIR))
+        os.makedirs(OUTPUT_DIR)
+
+    written = generate_error_messages_todir(
+        OUTPUT_DIR,
+        get_schemas(status='live' if arguments['--live'] else None),
+        output_format='minified' if arguments['--minified'] else 'pretty',
+        gzipped=arguments['--gzip'],
+    )
+
+    print("Generated {} lookup table(s)".format(len(written)))
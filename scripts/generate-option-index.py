@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""Generate an index of the options of the radios, checkboxes and checkbox tree questions in each framework.
+
+An options-<framework_slug>.json file is written for each framework, with
+the values, labels, checkbox tree ancestors and derived options of each
+question, by schema type, lot and question id. See
+`schema_generator.option_index`.
+
+Every framework is indexed, or with --live only the latest framework of each
+family.
+
+Usage:
+    generate-option-index.py --output-path=<path> [--all | --live] [--minified] [--gzip]
+
+"""
+import os
+import sys
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.option_index import generate_option_indexes_todir
+from schema_generator.validation import get_schemas
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    OUTPUT_DIR = arguments['--output-path']
+    if not os.path.exists(OUTPUT_DIR):
+        print("Creating {} directory".format(OUTPUT_DIR))
+        os.makedirs(OUTPUT_DIR)
+
+    written = generate_option_indexes_todir(
+        OUTPUT_DIR,
+        get_schemas(status='live' if arguments['--live'] else None),
+        output_format='minified' if arguments['--minified'] else 'pretty',
+        gzipped=arguments['--gzip'],
+    )
+
+    print("Generated {} option index(es)".format(len(written)))
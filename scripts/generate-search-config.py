@@ -20,8 +20,41 @@ Backward-incompatible changes to the mapping should be applied by creating a new
 index, and swapping the index aliases over when ready (for example when deploying
 a frontend that references the new search manifest).
 
+The mapping is written as indented JSON unless the --minified flag is given.
+With --gzip, a gzipped .json.gz copy of the mapping file is written next to it.
+
+With --all, the mapping for every framework and doc type with a template in
+frameworks/*/search_mappings is written to the output directory in one go
+(or only those for live frameworks, with --live). Content is only loaded once
+for all of them; with --jobs, mappings are generated in that many worker
+processes.
+
+Checkbox tree ancestors and options derived from other questions are added to
+documents by a list of `append_conditionally` transformations in the mapping's
+`_meta`. With --compact-transformations, they're written as a single
+`append_from_lookup` transformation per field instead, which needs a version
+of the Search API that supports it.
+
+With --prune-unused-fields=drop, properties which no search uses (filter and
+aggregation properties of questions which aren't search filters, and sort
+properties which aren't in the sort clause) are left out of the mapping. They're
+kept but not indexed with --prune-unused-fields=disable. See
+report-search-mapping-usage.py.
+
+The filter and aggregation properties of the search filter questions are only
+generated with the --filter-properties flag, which fills out the template's
+properties with them. This changes existing mappings (adding doc values and
+eager global ordinals), so turn it on when a new index is being created.
+
 Usage:
-    generate-search-config.py [--help] <framework_slug> <doc_type> [--output-path=<output_path>]
+    generate-search-config.py [--help] <framework_slug> <doc_type> [--output-path=<output_path> [--gzip]] [options]
+    generate-search-config.py --all --output-path=<output_path> [--live] [--jobs=<jobs>] [--gzip] [options]
+
+Options:
+    --minified                    Write JSON without whitespace
+    --compact-transformations     Write append_from_lookup transformations
+    --filter-properties           Generate filter and aggregation properties
+    --prune-unused-fields=<mode>  Drop or disable unused properties: drop or disable
 
 """
 import os
@@ -33,7 +66,19 @@ from datetime import datetime
 from collections import OrderedDict
 
 from docopt import docopt
-from schema_generator.search import generate_config
+from schema_generator.search import generate_config, generate_configs, get_search_mappings
+from schema_generator.validation import get_framework_index
+
+
+def extra_meta(framework_slug, doc_type, version, generated_time):
+    return OrderedDict((
+        ('_', 'DO NOT UPDATE BY HAND'),
+        ('version', version),
+        ('generated_from_framework', framework_slug),
+        ('doc_type', doc_type),
+        ('generated_by', os.path.abspath(__file__)),
+        ('generated_time', generated_time),
+    ))
 
 
 if __name__ == '__main__':
@@ -42,17 +87,37 @@ if __name__ == '__main__':
     if output_dir and not os.path.exists(output_dir):
         sys.exit('Specified output directory does not exist.')
 
+    with open(os.path.join(base_dir, 'package.json')) as version_handle:
+        version = json.load(version_handle)['version']
+    generated_time = datetime.utcnow().isoformat()
+    output_format = 'minified' if arguments['--minified'] else 'pretty'
+    transformation_format = 'compact' if arguments['--compact-transformations'] else 'legacy'
+    field_pruning = arguments['--prune-unused-fields']
+    filter_properties = arguments['--filter-properties']
+
+    if arguments['--all']:
+        framework_index = get_framework_index()
+        targets = [
+            (framework_slug, doc_type, extra_meta(framework_slug, doc_type, version, generated_time))
+            for framework_slug, doc_type in get_search_mappings()
+            if not arguments['--live'] or framework_index.get(framework_slug, {}).get('status') == 'live'
+        ]
+        written = generate_configs(
+            targets, output_dir, jobs=int(arguments['--jobs'] or 1), output_format=output_format,
+            gzipped=arguments['--gzip'], transformation_format=transformation_format, field_pruning=field_pruning,
+            filter_properties=filter_properties,
+        )
+        print("Generated {} mapping(s)".format(len(written)))
+        sys.exit()
+
     framework_slug = arguments['<framework_slug>']
     doc_type = arguments['<doc_type>']
 
-    with open(os.path.join(base_dir, 'package.json')) as version_handle:
-        extra_meta = OrderedDict((
-            ('_', 'DO NOT UPDATE BY HAND'),
-            ('version', json.load(version_handle)['version']),
-            ('generated_from_framework', framework_slug),
-            ('doc_type', doc_type),
-            ('generated_by', os.path.abspath(__file__)),
-            ('generated_time', datetime.utcnow().isoformat()),
-        ))
-
-    generate_config(framework_slug, doc_type, extra_meta, output_dir)
+    generate_config(
+        framework_slug, doc_type, extra_meta(framework_slug, doc_type, version, generated_time), output_dir,
+        output_format=output_format,
+        gzipped=arguments['--gzip'],
+        transformation_format=transformation_format,
+        field_pruning=field_pruning,
+        filter_properties=filter_properties,
+    )
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""Generate Elasticsearch search templates from the search mappings and search filters manifests.
+
+A search-template-<doc_type>-<framework_slug>.json file is written for each
+framework and doc type with a search mapping template (or just the one given),
+with the body of a put stored script request for a mustache template. It has
+the query, a filter for each `dmfilter_` field, the facet aggregations and the
+sort clause. See `schema_generator.search_templates` for its parameters.
+
+Usage:
+    generate-search-templates.py --output-path=<path> [<framework_slug> <doc_type>] [--minified] [--gzip]
+
+"""
+import os
+import sys
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.search import get_search_mappings
+from schema_generator.search_templates import generate_search_templates_todir
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    OUTPUT_DIR = arguments['--output-path']
+    if not os.path.exists(OUTPUT_DIR):
+        print("Creating {} directory".format(OUTPUT_DIR))
+        os.makedirs(OUTPUT_DIR)
+
+    if arguments['<framework_slug>']:
+        targets = [(arguments['<framework_slug>'], arguments['<doc_type>'])]
+    else:
+        targets = get_search_mappings()
+
+    written = generate_search_templates_todir(
+        OUTPUT_DIR,
+        targets,
+        output_format='minified' if arguments['--minified'] else 'pretty',
+        gzipped=arguments['--gzip'],
+    )
+
+    print("Generated {} search template(s)".format(len(written)))
@@ -1,8 +1,53 @@
 #!/usr/bin/env python
 """Generate validation JSON schemas from the frameworks questions content.
 
+Frameworks are found by scanning the frameworks directory, and schemas are
+generated for all of them. With --live, only the latest framework of each
+family is included; the content doesn't record which frameworks are live, so
+check that none of the older ones are still in use.
+
+Schemas are generated in parallel, one framework per worker process. The
+number of worker processes defaults to the number of CPUs; with a single job
+all schemas are generated one after another in this process.
+
+Only schemas whose manifest or question files have changed since they were
+last generated into the output directory are rewritten, unless --force is
+given. Every schema is rewritten if the schema generator modules or the
+content loader version have changed. What was generated is recorded in a
+build cache file (see --build-cache), which is kept out of the output
+directory so it isn't shipped with the schemas.
+
+With --formats, word limit and price patterns are replaced with custom formats
+which must be checked with `schema_generator.formats.FormatChecker`. With
+the --conditionals flag, followup questions are validated with draft-07
+if/else schemas rather than oneOf.
+
+With --bundle, a single validation-schemas-bundle.json file is written
+instead, holding every schema with the property schemas they share stored
+only once. Each schema can be referenced in it as
+`#/definitions/<schema type>-<framework>-<lot>`.
+
+Files are written as indented JSON, the same as the schemas in the API's
+`json_schema` directory, unless --minified is given. With --gzip, a gzipped
+.json.gz copy of each file is written next to it as well.
+
+Schemas for questions which are the same in several frameworks or lots are
+only built once. With --fragment-cache, the built question schemas are kept in
+a file, so later runs can reuse them too.
+
 Usage:
-    generate-validation-schemas.py --output-path=<output_path>
+    generate-validation-schemas.py --output-path=<path> [--jobs=<jobs>] [--force] [options]
+    generate-validation-schemas.py --output-path=<path> --bundle [options]
+
+Options:
+    --all           Generate schemas for every framework (the default)
+    --live          Only generate schemas for the latest framework of each family
+    --formats       Use custom formats for word limits and prices
+    --conditionals  Validate followups with if/else rather than oneOf
+    --minified      Write JSON without whitespace
+    --gzip          Write a gzipped copy of each file as well
+    --fragment-cache=<file>  Keep built question schemas in <file> between runs
+    --build-cache=<file>     Record the generated schemas in <file> [default: .validation-schemas-build-cache.json]
 
 """
 import os
@@ -10,7 +55,24 @@ import sys
 sys.path.insert(0, '.')
 
 from docopt import docopt
-from schema_generator.validation import generate_schema_todir, SCHEMAS
+from schema_generator.validation import (
+    BUNDLE_FILENAME,
+    fragment_cache_stats,
+    generate_schema_bundle_tofile,
+    generate_schemas_todir,
+    get_schemas,
+    load_fragment_cache,
+    save_fragment_cache,
+    SchemaGenerationError,
+)
+
+
+def print_fragment_cache_stats():
+    lookups = fragment_cache_stats['hits'] + fragment_cache_stats['misses']
+    if lookups:
+        print("Question schema cache: {} hits, {} misses ({:.0%} hit rate)".format(
+            fragment_cache_stats['hits'], fragment_cache_stats['misses'], fragment_cache_stats['hits'] / lookups
+        ))
 
 
 if __name__ == '__main__':
@@ -19,6 +81,51 @@ if __name__ == '__main__':
     if not os.path.exists(OUTPUT_DIR):
         print("Creating {} directory".format(OUTPUT_DIR))
         os.makedirs(OUTPUT_DIR)
-    for schema_type in SCHEMAS:
-        for schema in SCHEMAS[schema_type]:
-            generate_schema_todir(OUTPUT_DIR, schema_type, *schema)
+
+    schemas = get_schemas(status='live' if arguments['--live'] else None)
+    output_options = {
+        'output_format': 'minified' if arguments['--minified'] else 'pretty',
+        'gzipped': arguments['--gzip'],
+    }
+    fragment_cache_path = arguments['--fragment-cache']
+    if fragment_cache_path:
+        load_fragment_cache(fragment_cache_path)
+
+    if arguments['--bundle']:
+        try:
+            generate_schema_bundle_tofile(
+                os.path.join(OUTPUT_DIR, BUNDLE_FILENAME),
+                schemas,
+                formats=arguments['--formats'],
+                conditionals=arguments['--conditionals'],
+                **output_options
+            )
+        except SchemaGenerationError as e:
+            sys.exit(str(e))
+
+        if fragment_cache_path:
+            save_fragment_cache(fragment_cache_path)
+        print("Generated {}".format(BUNDLE_FILENAME))
+        print_fragment_cache_stats()
+        sys.exit()
+
+    jobs = int(arguments['--jobs'] or os.cpu_count())
+
+    try:
+        written = generate_schemas_todir(
+            OUTPUT_DIR,
+            schemas,
+            jobs=jobs,
+            force=arguments['--force'],
+            build_cache_path=arguments['--build-cache'],
+            formats=arguments['--formats'],
+            conditionals=arguments['--conditionals'],
+            **output_options
+        )
+    except SchemaGenerationError as e:
+        sys.exit(str(e))
+
+    if fragment_cache_path:
+        save_fragment_cache(fragment_cache_path)
+    print("Generated {} schema(s)".format(len(written)))
+    print_fragment_cache_stats()
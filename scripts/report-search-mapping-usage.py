@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Report the properties of generated search mappings which no search uses.
+
+Each property of the mapping for a framework and doc type (or of every search
+mapping, if none is given) is listed with how its field is used: as a search
+filter, on the display page, in downloaded results or as a field the API adds.
+Properties no search uses are marked with the reason. See
+`schema_generator.mapping_usage`.
+
+To leave them out of a generated mapping, pass --prune-unused-fields to
+generate-search-config.py.
+
+Usage:
+    report-search-mapping-usage.py [<framework_slug> <doc_type>] [--unused-only] [--json]
+
+"""
+import json
+import sys
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.search import build_search_mapping, get_search_mapping_usage, get_search_mappings
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    if arguments['<framework_slug>']:
+        targets = [(arguments['<framework_slug>'], arguments['<doc_type>'])]
+    else:
+        targets = get_search_mappings()
+
+    report = {}
+    for framework_slug, doc_type in targets:
+        mapping_usage = get_search_mapping_usage(
+            framework_slug, doc_type, build_search_mapping(framework_slug, doc_type, doc_type)
+        )
+        report['{}-{}'.format(doc_type, framework_slug)] = {
+            property_name: usage for property_name, usage in mapping_usage.items()
+            if usage['unused'] or not arguments['--unused-only']
+        }
+
+    if arguments['--json']:
+        print(json.dumps(report, indent=2))
+        sys.exit()
+
+    for mapping_name, mapping_usage in report.items():
+        unused = sum(1 for usage in mapping_usage.values() if usage['unused'])
+        print("{}: {} unused propert{}".format(mapping_name, unused, 'y' if unused == 1 else 'ies'))
+        for property_name, usage in mapping_usage.items():
+            print("    {:<50} {:<30} {}".format(
+                property_name,
+                ', '.join(usage['usages']) or '-',
+                'UNUSED: ' + usage['unused'] if usage['unused'] else '',
+            ).rstrip())
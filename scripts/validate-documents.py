@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Validate JSON lines documents against the validation schemas for their framework and lot.
+
+Each line of the input file (or stdin, if it's "-") is a document, such as a
+service or brief response from the API, with its framework in a "frameworkSlug"
+or "framework" field and its lot in a "lot" or "lotSlug" field.
+
+A JSON line is written to the output file (or stdout) for each document with
+errors, giving its line number, id and errors, followed by a summary on
+stderr. Exits with status 1 if any document had errors.
+
+Usage:
+    validate-documents.py <schema_type> <documents_file> [--output=<output_file>] [--jobs=<jobs>] [--chunk-size=<size>]
+
+Example:
+    validate-documents.py services services.jsonl --output=errors.jsonl --jobs=4
+
+"""
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+sys.path.insert(0, '.')
+
+from docopt import docopt
+from schema_generator.document_validation import CHUNK_SIZE, validate_lines
+
+
+def _open(path, mode, default):
+    return nullcontext(default) if path in (None, '-') else open(path, mode)
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    jobs = int(arguments['--jobs'] or os.cpu_count())
+    chunk_size = int(arguments['--chunk-size'] or CHUNK_SIZE)
+
+    counts = {'valid': 0, 'invalid': 0, 'not validated': 0}
+    start = time.perf_counter()
+    with _open(arguments['<documents_file>'], 'r', sys.stdin) as documents, \
+            _open(arguments['--output'], 'w', sys.stdout) as output:
+        for result in validate_lines(arguments['<schema_type>'], documents, jobs=jobs, chunk_size=chunk_size):
+            if not result['errors']:
+                counts['valid'] += 1
+                continue
+
+            counts['invalid' if result['validated'] else 'not validated'] += 1
+            output.write(json.dumps(result) + '\n')
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(
+        "Checked {} document(s): {valid} valid, {invalid} invalid, {not validated} not validated".format(
+            total, **counts
+        ),
+        file=sys.stderr,
+    )
+    print("{:.1f}s, {:.0f} documents/second".format(elapsed, total / elapsed if elapsed else 0), file=sys.stderr)
+
+    sys.exit(1 if counts['invalid'] or counts['not validated'] else 0)
@@ -0,0 +1,53 @@
+import pytest
+
+from benchmarks.suite import compare
+
+
+BASELINE = {
+    'phases': {
+        'load_questions': {'items': 16, 'wall_seconds': 2.0, 'cpu_seconds': 1.5, 'peak_memory_bytes': 1000000},
+        'merge_schemas': {'items': 16, 'wall_seconds': 0.5, 'cpu_seconds': 0.5, 'peak_memory_bytes': 200000},
+    },
+}
+
+
+def _results(**changes):
+    phases = {phase: dict(phase_results) for phase, phase_results in BASELINE['phases'].items()}
+    for metric, value in changes.items():
+        phases['load_questions'][metric] = value
+    return {'phases': phases}
+
+
+@pytest.mark.parametrize("changes", [
+    {},
+    {'wall_seconds': 2.3, 'cpu_seconds': 1.2},
+    {'peak_memory_bytes': 1150000},
+    {'wall_seconds': 2.39, 'cpu_seconds': 1.79, 'peak_memory_bytes': 1199999},
+])
+def test_compare_within_threshold(changes):
+    assert compare(_results(**changes), BASELINE, 20) == []
+
+
+@pytest.mark.parametrize("metric,value", [
+    ('wall_seconds', 2.5),
+    ('cpu_seconds', 1.9),
+    ('peak_memory_bytes', 1300000),
+])
+def test_compare_over_threshold(metric, value):
+    assert compare(_results(**{metric: value}), BASELINE, 20) == [
+        ('load_questions', metric, BASELINE['phases']['load_questions'][metric], value),
+    ]
+
+
+def test_compare_reports_time_and_memory_regressions_together():
+    assert compare(_results(wall_seconds=3.0, peak_memory_bytes=2000000), BASELINE, 20) == [
+        ('load_questions', 'wall_seconds', 2.0, 3.0),
+        ('load_questions', 'peak_memory_bytes', 1000000, 2000000),
+    ]
+
+
+def test_compare_skips_phases_missing_from_baseline():
+    results = _results(wall_seconds=10.0)
+    baseline = {'phases': {'merge_schemas': BASELINE['phases']['merge_schemas']}}
+
+    assert compare(results, baseline, 20) == []
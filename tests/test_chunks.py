@@ -0,0 +1,44 @@
+import pytest
+
+from schema_generator.chunks import line_chunks, map_line_chunks
+
+
+def _line_numbers(chunk):
+    return [line_number for line_number, line in chunk]
+
+
+def _prefixed(prefix, chunk):
+    return [prefix + line for line_number, line in chunk]
+
+
+def test_line_chunks_skip_blank_lines():
+    assert list(line_chunks(['a\n', '\n', 'b\n', 'c\n', '  '], 2)) == [[(1, 'a\n'), (3, 'b\n')], [(4, 'c\n')]]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_map_line_chunks_in_order(jobs):
+    lines = ['{}\n'.format(n) for n in range(1, 24)]
+
+    assert list(map_line_chunks(_line_numbers, lines, 5, jobs)) == [
+        list(range(start, min(start + 5, 24))) for start in range(1, 24, 5)
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_map_line_chunks_reads_lines_as_they_are_needed(jobs):
+    read = []
+
+    def lines():
+        for n in range(1, 101):
+            read.append(n)
+            yield '{}\n'.format(n)
+
+    results = map_line_chunks(_line_numbers, lines(), 3, jobs)
+    assert next(results) == [1, 2, 3]
+    # at most two chunks per worker are queued or in progress
+    assert len(read) <= max(jobs * 2, 1) * 3 + 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_map_line_chunks_passes_args(jobs):
+    assert list(map_line_chunks(_prefixed, ['a', 'b', 'c'], 2, jobs, args=('-',))) == [['-a', '-b'], ['-c']]
@@ -0,0 +1,141 @@
+import pytest
+from hypothesis import given, settings, HealthCheck, strategies as st
+from jsonschema import Draft7Validator, FormatChecker
+
+from schema_generator import formats
+from schema_generator.compiler import CompilationError, compile_schema, load_compiled_schema
+from schema_generator.validation import generate_schema, get_schemas
+
+
+SCHEMAS = get_schemas()
+
+
+GENERIC_VALUES = [
+    None, True, False, 0, 1, 2.0, 2.5, -1, "", "a", " a", "a\n", "10", "10.123456", "0.00", "no-at-sign",
+    "someone@example.com", "http://example.com", "2020-02-30", "word " * 60, [], ["a"], ["a", "a"], [1, True],
+    [[]], {}, {"a": 1},
+]
+
+
+def _plausible_value(schema):
+    """A value of the right shape for `schema`, which should pass most (but not necessarily all) of it"""
+    if 'enum' in schema:
+        return schema['enum'][0]
+    for keyword in ('oneOf', 'anyOf'):
+        if keyword in schema:
+            return _plausible_value(schema[keyword][-1])
+    schema_type = schema.get('type', 'string')
+    schema_type = schema_type[0] if isinstance(schema_type, list) else schema_type
+    if schema_type == 'array':
+        return [_plausible_value(schema.get('items', {}))]
+    if schema_type == 'object':
+        return {key: _plausible_value(subschema) for key, subschema in schema.get('properties', {}).items()}
+    if schema_type in ('integer', 'number'):
+        return schema.get('minimum', 1)
+    if schema_type == 'boolean':
+        return True
+    if schema_type == 'null':
+        return None
+    if 'price' in schema.get('format', '') or '\\d' in schema.get('pattern', ''):
+        return "10.00"
+    return "An answer"
+
+
+def _documents(schema, count):
+    """Mostly plausible documents, with a different few properties given odd values in each"""
+    document = {key: _plausible_value(subschema) for key, subschema in schema['properties'].items()}
+    yield {}
+    yield document
+    keys = sorted(document)
+    for k in range(count):
+        odd_document = dict(document)
+        for j, key in enumerate(keys):
+            if j % 5 == k % 5:
+                odd_document[key] = GENERIC_VALUES[(j + k) % len(GENERIC_VALUES)]
+            elif j % 7 == k % 7:
+                del odd_document[key]
+        yield odd_document
+
+
+def _error_details(errors):
+    return [
+        (
+            list(error.path), list(error.schema_path), error.validator, error.validator_value, error.message,
+            error.instance, error.schema, [(list(e.path), e.message) for e in error.context],
+        )
+        for error in errors
+    ]
+
+
+def _assert_same_errors(schema, documents, format_checker=None):
+    compiled = load_compiled_schema(compile_schema(schema))
+    validator = Draft7Validator(schema, format_checker=format_checker)
+
+    for document in documents:
+        assert _error_details(compiled.iter_errors(document, format_checker)) == \
+            _error_details(validator.iter_errors(document)), document
+        assert compiled.is_valid(document, format_checker) == validator.is_valid(document), document
+
+
+@pytest.mark.parametrize(("schema_type", "schema"), [
+    (schema_type, schema) for schema_type, schemas in SCHEMAS.items() for schema in schemas
+])
+def test_compiled_schema_gives_same_errors_as_jsonschema(schema_type, schema):
+    generated_schema = generate_schema(schema_type, *schema)
+
+    _assert_same_errors(generated_schema, _documents(generated_schema, 12))
+
+
+@pytest.mark.parametrize("schema_options", [{}, {'formats': True, 'conditionals': True}])
+@pytest.mark.parametrize("schema", [
+    ('services', 'g-cloud-12', 'cloud-software'),
+    ('briefs', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+    ('brief-responses', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+    ('services', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+])
+def test_compiled_schema_gives_same_errors_as_jsonschema_with_formats(schema, schema_options):
+    schema_name = next(x[0] for x in SCHEMAS[schema[0]] if x[1:] == schema[1:])
+    generated_schema = generate_schema(schema[0], schema_name, *schema[1:], **schema_options)
+    format_checker = formats.FormatChecker() if schema_options else FormatChecker()
+
+    _assert_same_errors(generated_schema, _documents(generated_schema, 12), format_checker)
+
+
+FALLBACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "const": {"const": 1},
+        "mixedEnum": {"enum": [1, "1", None, [1]]},
+        "tuple": {"type": "array", "items": [{"type": "integer"}], "additionalItems": False},
+        "number": {"type": ["number", "string"], "multipleOf": 2, "exclusiveMinimum": 0, "maximum": 10},
+        "mapping": {"patternProperties": {"^a": {"type": "string"}}, "additionalProperties": {"type": "integer"}},
+        "unique": {"uniqueItems": True, "contains": {"const": 1}},
+        "falseSchema": False,
+        "trueSchema": True,
+        "conditional": {"if": {"type": "string"}, "then": {"minLength": 2}},
+        "falseConditional": {"if": {"type": "string"}, "then": {"minLength": 2}, "else": False},
+        "items": {"items": {"type": "integer"}, "allOf": [{"maxItems": 2}, True]},
+        "not": {"not": {"anyOf": [{"type": "integer"}, {"maxItems": 1}]}},
+    },
+    "dependencies": {"const": {"required": ["number"]}, "tuple": ["unique"]},
+    "propertyNames": {"maxLength": 12},
+    "additionalProperties": False,
+}
+
+
+@settings(suppress_health_check=[HealthCheck.too_slow])
+@given(st.dictionaries(
+    st.sampled_from(sorted(FALLBACK_SCHEMA["properties"]) + ["extra", "a-much-longer-name"]),
+    st.sampled_from(GENERIC_VALUES) | st.recursive(
+        st.none() | st.booleans() | st.integers(-3, 12) | st.floats(allow_nan=False) | st.sampled_from(["a", "1"]),
+        lambda children: st.lists(children, max_size=3) | st.dictionaries(st.sampled_from(["a", "b"]), children),
+        max_leaves=6,
+    ),
+))
+def test_compiled_schema_gives_same_errors_as_jsonschema_for_uncompiled_keywords(document):
+    _assert_same_errors(FALLBACK_SCHEMA, [document])
+
+
+def test_compile_schema_with_ref_raises_an_error():
+    with pytest.raises(CompilationError):
+        compile_schema({"definitions": {"a": {"type": "string"}}, "properties": {"a": {"$ref": "#/definitions/a"}}})
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from schema_generator.document_validation import validate_document, validate_lines
+
+
+def _brief_award(**kwargs):
+    return dict({
+        "id": 1234,
+        "frameworkSlug": "digital-outcomes-and-specialists-5",
+        "lot": "digital-specialists",
+        "awardedContractStartDate": "2022-01-31",
+        "awardedContractValue": "1000.00",
+    }, **kwargs)
+
+
+def test_validate_document_ignores_api_fields():
+    assert validate_document('brief-awards', _brief_award(status="awarded", links={})) == []
+
+
+def test_validate_document_returns_errors():
+    document = _brief_award(awardedContractValue="1,000", awardedContractStartDate=None)
+    errors = validate_document('brief-awards', document)
+
+    assert [(error['path'], error['validator']) for error in errors] == [
+        (['awardedContractStartDate'], 'type'),
+        (['awardedContractValue'], 'pattern'),
+    ]
+    assert errors[0]['message'] == "None is not of type 'string'"
+
+
+def test_validate_document_checks_formats():
+    assert [error['validator'] for error in validate_document(
+        'brief-awards', _brief_award(awardedContractStartDate="31/01/2022")
+    )] == ['format']
+
+
+def test_validate_document_uses_framework_and_lot_of_brief_for_brief_responses():
+    errors = validate_document('brief-responses', {
+        "brief": {"frameworkSlug": "digital-outcomes-and-specialists-5", "lotSlug": "digital-specialists"},
+        "dayRate": "100",
+    })
+
+    assert {'path': [], 'validator': 'required', 'message': "'essentialRequirementsMet' is a required property"} \
+        in errors
+    assert not any(error['path'] == ['dayRate'] for error in errors)
+
+
+@pytest.mark.parametrize(("document", "message"), [
+    (_brief_award(frameworkSlug="g-cloud-1"), "No brief-awards schema for framework g-cloud-1 lot digital-specialists"),
+    ({"awardedContractValue": "1000"}, "No brief-awards schema for framework None lot None"),
+    ([], "Document is not an object"),
+])
+def test_validate_document_without_a_schema(document, message):
+    assert validate_document('brief-awards', document) == [{'path': [], 'validator': None, 'message': message}]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_validate_lines_yields_results_in_order(jobs):
+    lines = [json.dumps(_brief_award(id=i, awardedContractValue="1,000" if i % 3 else "1000")) for i in range(50)]
+    lines[10:10] = ["", "not json"]
+
+    results = list(validate_lines('brief-awards', lines, jobs=jobs, chunk_size=7))
+
+    assert [result['line'] for result in results] == [i for i in range(1, 53) if i != 11]
+    assert [result['id'] for result in results] == list(range(10)) + [None] + list(range(10, 50))
+    assert results[10]['validated'] is False
+    assert results[10]['errors'][0]['message'].startswith("Invalid JSON")
+    assert [bool(result['errors']) for result in results if result['validated']] == [bool(i % 3) for i in range(50)]
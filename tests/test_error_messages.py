@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+from jsonschema import Draft7Validator
+
+from schema_generator.error_messages import (
+    error_message,
+    error_path_key,
+    generate_error_messages,
+    generate_error_messages_todir,
+    keyword_validations,
+)
+from schema_generator.validation import WORD_LIMIT_PATTERN, generate_schema, price_string
+
+
+def _error_names(schema_type, schema_name, framework_slug, lot_slug, document):
+    schema = generate_schema(schema_type, schema_name, framework_slug, lot_slug)
+    error_messages = generate_error_messages(schema_type, framework_slug, lot_slug)
+
+    names = {}
+    for error in Draft7Validator(schema).iter_errors(document):
+        validation = error_message(error_messages, error)
+        names[(error_path_key(error), error.validator)] = validation and validation['name']
+
+    return names
+
+
+@pytest.mark.parametrize(("keyword", "value", "names"), [
+    ('minLength', 1, ('answer_required',)),
+    ('maxLength', 100, ('under_character_limit',)),
+    ('pattern', WORD_LIMIT_PATTERN % 49, ('under_50_words', 'under_word_limit')),
+    ('pattern', r"^$|(" + WORD_LIMIT_PATTERN % 9 + ")", ('under_10_words', 'under_word_limit')),
+    ('format', 'max-words:200', ('under_200_words', 'under_word_limit')),
+    ('pattern', price_string(True)['pattern'], ('not_money_format',)),
+    ('format', 'price-2dp', ('not_money_format',)),
+    ('format', 'date', ('invalid_format',)),
+    ('uniqueItems', True, ()),
+])
+def test_keyword_validations(keyword, value, names):
+    assert keyword_validations(keyword, value) == names
+
+
+def test_error_messages_for_a_service():
+    names = _error_names('services', 'G-Cloud 13 Cloud Hosting Service', 'g-cloud-13', 'cloud-hosting', {
+        "serviceName": "x" * 101,
+        "serviceDescription": "word " * 60,
+        "serviceFeatures": ["one two three four five six seven eight nine ten eleven"],
+        "priceMin": "1,000",
+        "priceMax": "a lot",
+    })
+
+    assert names[('serviceName', 'maxLength')] == 'under_character_limit'
+    assert names[('serviceDescription', 'pattern')] == 'under_50_words'
+    assert names[('serviceFeatures/*', 'pattern')] == 'under_10_words'
+    assert names[('priceMin', 'pattern')] == names[('priceMax', 'pattern')] == 'not_money_format'
+    assert names[('serviceBenefits', 'required')] == 'answer_required'
+
+
+def test_error_messages_are_rendered_and_match_the_field():
+    error_messages = generate_error_messages('services', 'g-cloud-13', 'cloud-hosting')
+
+    assert error_messages['priceMin']['pattern']['message'].startswith("Minimum price")
+    assert error_messages['priceMax']['pattern']['message'].startswith("Maximum price")
+    # priceMax is optional, and its only answer_required validation is for priceMin
+    assert 'required' not in error_messages['priceMax']
+    assert all(
+        '{{' not in validation['message'] and '{%' not in validation['message']
+        for keywords in error_messages.values()
+        for validation in keywords.values()
+    )
+
+
+def test_error_messages_for_nested_and_assurance_questions():
+    names = _error_names('brief-responses', 'DOS5 Brief Response', 'digital-outcomes-and-specialists-5',
+                         'digital-specialists', {"essentialRequirements": [{}]})
+    assert names[('essentialRequirements/*/evidence', 'required')] == 'answer_required'
+
+    error_messages = generate_error_messages('services', 'g-cloud-8', 'IaaS')
+    assert error_messages['dataProtectionWithinService/assurance']['enum']['name'] == 'assurance_required'
+    assert error_messages['dataProtectionWithinService/value']['type']['name'] == 'answer_required'
+
+
+def test_generate_error_messages_todir(tmpdir):
+    schemas = {'brief-awards': [
+        ('DOS5 Brief Award', 'digital-outcomes-and-specialists-5', 'digital-specialists'),
+    ]}
+    written = generate_error_messages_todir(str(tmpdir), schemas, output_format='minified')
+
+    assert [os.path.basename(path) for path in written] == [
+        'error-messages-brief-awards-digital-outcomes-and-specialists-5-digital-specialists.json'
+    ]
+    with open(written[0]) as f:
+        assert json.load(f) == generate_error_messages(
+            'brief-awards', 'digital-outcomes-and-specialists-5', 'digital-specialists'
+        )
@@ -0,0 +1,109 @@
+import json
+import re
+
+import pytest
+from hypothesis import given, strategies as st
+from jsonschema import Draft7Validator
+
+from schema_generator.formats import FormatChecker, get_format_check
+from schema_generator.validation import (
+    generate_schema,
+    get_schemas,
+    list_property,
+    parse_question_limits,
+    pattern_format,
+    patterns_to_formats,
+    price_string,
+)
+
+
+SCHEMAS = get_schemas()
+
+
+# characters that the word limit and price patterns treat specially, including non-ascii whitespace and digits
+word_characters = st.sampled_from(['a', 'b', '1', '.', ' ', '\t', '\n', '\r', '\x1c', '\xa0', ' ', '١'])
+price_characters = st.sampled_from(['0', '1', '5', '9', '.', '\n', ' ', '-', 'a', '٠', '١'])
+
+
+def word_limit_pattern(max_words, optional):
+    return parse_question_limits(
+        {"validations": [{"name": "under_{}_words".format(max_words)}], "optional": optional}
+    )['pattern']
+
+
+@given(st.text(word_characters, max_size=30) | st.text(max_size=30), st.integers(min_value=1, max_value=8),
+       st.booleans())
+def test_word_limit_format_accepts_the_same_strings_as_the_pattern(value, max_words, optional):
+    pattern = word_limit_pattern(max_words, optional)
+    check = get_format_check(pattern_format(pattern))
+
+    assert check(value) == bool(re.search(pattern, value))
+
+
+@given(st.text(price_characters, max_size=25) | st.text(max_size=25), st.booleans(), st.booleans())
+def test_price_format_accepts_the_same_strings_as_the_pattern(value, optional, decimal_place_restriction):
+    pattern = price_string(optional, decimal_place_restriction)['pattern']
+    check = get_format_check(pattern_format(pattern))
+
+    assert check(value) == bool(re.search(pattern, value))
+
+
+@pytest.mark.parametrize(("pattern", "format_name"), [
+    (word_limit_pattern(100, False), "max-words:100"),
+    (word_limit_pattern(50, True), "empty-or-max-words:50"),
+    (list_property({"id": "q"})["q"]["items"]["pattern"], "max-words:10"),
+    (price_string(False)['pattern'], "price"),
+    (price_string(True)['pattern'], "empty-or-price"),
+    (price_string(False, True)['pattern'], "price-2dp"),
+    (price_string(True, True)['pattern'], "empty-or-price-2dp"),
+    ("^[a-z]+$", None),
+])
+def test_pattern_format(pattern, format_name):
+    assert pattern_format(pattern) == format_name
+
+
+def test_get_format_check_ignores_other_formats():
+    assert get_format_check("email") is None
+    assert get_format_check("max-words:lots") is None
+
+
+def test_patterns_to_formats_leaves_other_patterns_and_formats_alone():
+    schema = {"properties": {
+        "q1": {"type": "string", "pattern": "^[a-z]+$"},
+        "q2": {"type": "string", "format": "email", "pattern": price_string(False)['pattern']},
+        "q3": {"type": "array", "items": {"type": "string", "pattern": price_string(False)['pattern']}},
+    }}
+
+    assert patterns_to_formats(schema) == {"properties": {
+        "q1": {"type": "string", "pattern": "^[a-z]+$"},
+        "q2": {"type": "string", "format": "email", "pattern": price_string(False)['pattern']},
+        "q3": {"type": "array", "items": {"type": "string", "format": "price"}},
+    }}
+
+
+@pytest.mark.parametrize(("value", "valid"), [
+    (["An accreditation"], True),
+    ([" An accreditation"], False),
+    ([" ".join(["word"] * 11)], False),
+    ([1234], False),
+])
+def test_format_checker_validates_generated_schema_like_patterns(value, valid):
+    schema_args = [x for x in SCHEMAS['services'] if x[1:] == ("g-cloud-12", "cloud-software")][0]
+    pattern_schema = generate_schema('services', *schema_args)['properties']['accreditationsOtherList']
+    format_schema = generate_schema('services', *schema_args, formats=True)['properties']['accreditationsOtherList']
+    assert format_schema['items']['format'] == "max-words:10"
+
+    pattern_errors = sorted(e.validator for e in Draft7Validator(pattern_schema).iter_errors(value))
+    format_errors = sorted(
+        e.validator for e in Draft7Validator(format_schema, format_checker=FormatChecker()).iter_errors(value)
+    )
+
+    assert format_errors == [{"pattern": "format"}.get(validator, validator) for validator in pattern_errors]
+    assert (format_errors == []) == valid
+
+
+def test_generate_schema_with_formats_has_no_patterns_left():
+    schema_args = [x for x in SCHEMAS['services'] if x[1:] == ("g-cloud-12", "cloud-software")][0]
+
+    assert '"pattern"' in json.dumps(generate_schema('services', *schema_args))
+    assert '"pattern"' not in json.dumps(generate_schema('services', *schema_args, formats=True))
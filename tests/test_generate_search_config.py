@@ -1,7 +1,33 @@
+import hashlib
+import io
+import json
+import os
+import threading
 from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
+import mock
+import pytest
+from dmcontent import ContentLoader
 from dmcontent.questions import Hierarchy, List
-from schema_generator.search import _checkbox_tree_transformation_generator, _derived_options_transformation_generator
+from schema_generator import content, search, validation
+from schema_generator.search import (
+    _checkbox_tree_compact_transformation_generator,
+    _checkbox_tree_transformation_generator,
+    _derived_options_compact_transformation_generator,
+    _derived_options_transformation_generator,
+    _merge_properties,
+    BulkIndexError,
+    generate_bulk_chunks,
+    generate_configs,
+    generate_search_mapping,
+    get_filter_properties,
+    get_index_sort_settings,
+    get_mapping_fields,
+    get_search_mappings,
+    post_bulk_chunks,
+    write_bulk_chunks,
+)
 
 
 def test_checkbox_tree_transformation_generator():
@@ -80,3 +106,372 @@ def test_derived_options_transformation_generator():
             ('append_value', ['cat 2'])
         ))
     } in result
+
+
+def test_checkbox_tree_compact_transformation_generator():
+    question = {
+        "id": 'someQuestion',
+        "options": [
+            {
+                'label': 'cat 1',
+                'options': [
+                    {'label': 'sub cat 1.1', 'options': [{'label': 'sub sub cat 1.1.1', 'value': 'ssc'}]},
+                    {'label': 'sub cat 1.2', 'value': 'sc1-2'},
+                ]
+            },
+            {
+                'label': 'cat 2',
+                'options': [
+                    {'label': 'sub cat 1.2', 'value': 'sc1-2'},
+                ]
+            },
+            {'label': 'cat 3'},
+        ]
+    }
+
+    assert _checkbox_tree_compact_transformation_generator(Hierarchy(question)) == [{
+        'append_from_lookup': {
+            'field': 'someQuestion',
+            'lookup': {
+                'ssc': ['cat 1', 'sub cat 1.1'],
+                'sc1-2': ['cat 1', 'cat 2'],
+            },
+        }
+    }]
+
+
+def test_derived_options_compact_transformation_generator():
+    question = {
+        "id": 'someQuestion',
+        "options": [
+            {'label': 'cat 1', 'derived_from': {"question": "otherQuestion1", "any_of": ["a", "b"]}},
+            {'label': 'cat 2', 'derived_from': {"question": "otherQuestion1", "any_of": ["b"]}},
+            {'label': 'cat 3', 'derived_from': {"question": "otherQuestion2", "any_of": [True]}},
+            {'label': 'cat 4'},
+        ]
+    }
+
+    assert _derived_options_compact_transformation_generator(List(question)) == [
+        {
+            'append_from_lookup': {
+                'field': 'otherQuestion1',
+                'target_field': 'someQuestion',
+                'lookup': {'a': ['cat 1'], 'b': ['cat 1', 'cat 2']},
+            }
+        },
+        # JSON object keys can't be booleans
+        {
+            'append_conditionally': {
+                'field': 'otherQuestion2',
+                'target_field': 'someQuestion',
+                'any_of': [True],
+                'append_value': ['cat 3'],
+            }
+        },
+    ]
+
+
+def test_generate_search_mapping_with_compact_transformations():
+    legacy, compact = io.StringIO(), io.StringIO()
+    generate_search_mapping('g-cloud-13', 'services', legacy, 'services')
+    generate_search_mapping('g-cloud-13', 'services', compact, 'services', transformation_format='compact')
+
+    assert 'append_from_lookup' not in legacy.getvalue()
+    assert 'append_from_lookup' in compact.getvalue()
+    with pytest.raises(ValueError):
+        generate_search_mapping('g-cloud-13', 'services', io.StringIO(), 'services', transformation_format='rules')
+
+
+def test_get_filter_properties():
+    properties = get_filter_properties('g-cloud-13', 'services')
+
+    assert properties['dmfilter_webChatSupport'] == {
+        'type': 'keyword', 'normalizer': 'filter_normalizer', 'doc_values': True,
+    }
+    # the id the serviceCategories<Lot> questions are indexed as
+    assert 'dmfilter_serviceCategoriesSoftware' not in properties
+    assert properties['dmagg_serviceCategories']['eager_global_ordinals'] is True
+    assert 'dmagg_webChatSupport' not in properties
+    assert 'dmagg_webChatSupport' in get_filter_properties(
+        'g-cloud-13', 'services', {'dmagg_webChatSupport': {'type': 'keyword'}}
+    )
+
+
+def test_merge_properties_keeps_template_parameters():
+    template = OrderedDict((
+        ('dmtext_id', {'type': 'keyword'}),
+        ('dmfilter_a', OrderedDict((('type', 'keyword'), ('normalizer', 'other_normalizer')))),
+    ))
+    generated = OrderedDict((
+        ('dmfilter_a', {'type': 'keyword', 'normalizer': 'filter_normalizer', 'doc_values': True}),
+        ('dmfilter_b', {'type': 'keyword', 'normalizer': 'filter_normalizer', 'doc_values': True}),
+    ))
+
+    properties = _merge_properties(template, generated)
+
+    assert list(properties) == ['dmtext_id', 'dmfilter_a', 'dmfilter_b']
+    assert properties['dmfilter_a'] == {'type': 'keyword', 'normalizer': 'other_normalizer', 'doc_values': True}
+    assert properties['dmfilter_b'] == generated['dmfilter_b']
+
+
+@pytest.mark.parametrize(("framework_slug", "doc_type"), [
+    ('g-cloud-13', 'services'),
+    ('digital-outcomes-and-specialists-5', 'briefs'),
+])
+def test_generated_mapping_has_a_filter_property_for_each_search_filter(framework_slug, doc_type):
+    mapping = io.StringIO()
+    generate_search_mapping(framework_slug, doc_type, mapping, doc_type, filter_properties=True)
+    properties = json.loads(mapping.getvalue())['mappings']['properties']
+
+    for question in search._get_questions_by_type(framework_slug, doc_type, search.FILTER_QUESTION_TYPES):
+        assert properties['dmfilter_' + question.id]['normalizer'] == 'filter_normalizer'
+        assert properties['dmfilter_' + question.id]['doc_values'] is True
+
+
+@pytest.mark.parametrize(("framework_slug", "doc_type"), [
+    ('g-cloud-13', 'services'),
+    ('digital-outcomes-and-specialists-5', 'briefs'),
+])
+def test_generated_mapping_keeps_template_properties_by_default(framework_slug, doc_type):
+    mapping = io.StringIO()
+    generate_search_mapping(framework_slug, doc_type, mapping, doc_type)
+
+    assert json.loads(mapping.getvalue())['mappings']['properties'] == (
+        search.load_search_mapping_template(framework_slug, doc_type)['mappings']['properties']
+    )
+
+
+SORT_PROPERTIES = {
+    'sortonly_statusOrder': {'type': 'byte'},
+    'sortonly_publishedAt': {'type': 'date'},
+    'sortonly_idHash': {'type': 'keyword'},
+    'dmtext_title': {'type': 'text'},
+    'dmfilter_lot': {'type': 'keyword', 'doc_values': False},
+}
+
+
+@pytest.mark.parametrize(("sort_clause", "expected"), [
+    (['_score', {'sortonly_idHash': 'desc'}], {'field': ['sortonly_idHash'], 'order': ['desc']}),
+    (
+        ['sortonly_statusOrder', {'sortonly_publishedAt': 'desc'}, 'sortonly_idHash'],
+        {
+            'field': ['sortonly_statusOrder', 'sortonly_publishedAt', 'sortonly_idHash'],
+            'order': ['asc', 'desc', 'asc'],
+        },
+    ),
+    (
+        [{'sortonly_publishedAt': {'order': 'desc', 'missing': '_first'}}, 'sortonly_idHash'],
+        {
+            'field': ['sortonly_publishedAt', 'sortonly_idHash'],
+            'order': ['desc', 'asc'],
+            'missing': ['_first', '_last'],
+        },
+    ),
+])
+def test_get_index_sort_settings(sort_clause, expected):
+    assert get_index_sort_settings(sort_clause, SORT_PROPERTIES) == expected
+
+
+@pytest.mark.parametrize("sort_clause", [
+    ['_score'],
+    ['sortonly_missing'],
+    ['dmtext_title'],
+    [{'dmfilter_lot': 'asc'}],
+])
+def test_get_index_sort_settings_rejects_unsortable_fields(sort_clause):
+    with pytest.raises(ValueError):
+        get_index_sort_settings(sort_clause, SORT_PROPERTIES)
+
+
+@pytest.mark.parametrize(("template_sort", "expected_sort"), [
+    (None, {'field': ['sortonly_statusOrder', 'sortonly_publishedAt', 'sortonly_idHash'],
+            'order': ['asc', 'desc', 'asc']}),
+    ({'field': 'sortonly_idHash'}, {'field': 'sortonly_idHash'}),
+])
+def test_generate_search_mapping_with_index_sort(template_sort, expected_sort):
+    template = search.load_search_mapping_template('digital-outcomes-and-specialists-5', 'briefs')
+    template['mappings']['_meta']['dm_index_sort'] = True
+    if template_sort:
+        template['settings']['index']['sort'] = template_sort
+
+    mapping = io.StringIO()
+    with mock.patch.object(search, 'load_search_mapping_template', return_value=template):
+        generate_search_mapping('digital-outcomes-and-specialists-5', 'briefs', mapping, 'briefs')
+    mapping = json.loads(mapping.getvalue())
+
+    assert mapping['settings']['index']['sort'] == expected_sort
+    assert 'dm_index_sort' not in mapping['mappings']['_meta']
+
+
+def test_generate_search_mapping_without_index_sort():
+    mapping = io.StringIO()
+    generate_search_mapping('digital-outcomes-and-specialists-5', 'briefs', mapping, 'briefs')
+
+    assert 'sort' not in json.loads(mapping.getvalue())['settings']['index']
+
+
+def test_get_search_mappings(tmpdir):
+    assert ('g-cloud-13', 'services') in get_search_mappings()
+    assert ('digital-outcomes-and-specialists-5', 'briefs') in get_search_mappings()
+
+    tmpdir.mkdir('framework-2').mkdir('search_mappings').join('services.json').write('{}')
+    tmpdir.mkdir('framework-1').mkdir('search_mappings').join('briefs.json').write('{}')
+    tmpdir.mkdir('framework-3').mkdir('questions')
+    assert get_search_mappings(str(tmpdir)) == [('framework-1', 'briefs'), ('framework-2', 'services')]
+
+
+def test_search_mappings_share_a_content_loader():
+    content.clear_content_cache()
+
+    with mock.patch.object(content, 'ContentLoader', wraps=ContentLoader) as content_loader:
+        for _ in range(2):
+            for framework_slug in ('g-cloud-12', 'g-cloud-13'):
+                generate_search_mapping(framework_slug, 'services', io.StringIO(), 'services')
+
+    assert content_loader.call_count == 1
+
+
+def test_search_mappings_and_validation_schemas_share_a_content_loader():
+    content.clear_content_cache()
+
+    with mock.patch.object(content, 'ContentLoader', wraps=ContentLoader) as content_loader:
+        generate_search_mapping('g-cloud-13', 'services', io.StringIO(), 'services')
+        validation.load_questions('services', 'g-cloud-13', 'cloud-hosting')
+
+    assert content_loader.call_count == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generate_configs(tmpdir, jobs):
+    targets = [
+        ('g-cloud-13', 'services', {'doc_type': 'services'}),
+        ('digital-outcomes-and-specialists-5', 'briefs', {'doc_type': 'briefs'}),
+    ]
+    written = generate_configs(targets, str(tmpdir), jobs=jobs)
+
+    assert [os.path.basename(path) for path in written] == [
+        'services-g-cloud-13.json', 'briefs-digital-outcomes-and-specialists-5.json',
+    ]
+    for path, (framework_slug, doc_type, extra_meta) in zip(written, targets):
+        mapping = io.StringIO()
+        generate_search_mapping(framework_slug, doc_type, mapping, doc_type, extra_meta)
+        with open(path) as f:
+            assert f.read() == mapping.getvalue()
+
+
+BULK_MAPPING = {
+    'mappings': {
+        '_meta': {'transformations': [
+            {'append_conditionally': {'field': 'categories', 'any_of': ['Payroll'], 'append_value': ['Finance']}},
+            {'hash_to': {'field': 'id', 'target_field': 'idHash'}},
+        ]},
+        'properties': {
+            'dmtext_id': {'type': 'keyword'},
+            'dmtext_categories': {'type': 'text'},
+            'dmfilter_categories': {'type': 'keyword'},
+            'sortonly_idHash': {'type': 'keyword'},
+        },
+    },
+}
+
+
+def _bulk_lines(count):
+    return [
+        json.dumps({'id': i, 'categories': ['Payroll'] if i % 2 else [], 'undeclared': i}) + '\n'
+        for i in range(count)
+    ]
+
+
+def _bulk_documents(chunks):
+    lines = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    return list(zip(lines[::2], lines[1::2]))
+
+
+def test_get_mapping_fields():
+    assert get_mapping_fields(BULK_MAPPING) == {
+        'id': ['dmtext_id'],
+        'categories': ['dmtext_categories', 'dmfilter_categories'],
+        'idHash': ['sortonly_idHash'],
+    }
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_generate_bulk_chunks(jobs):
+    chunks = list(generate_bulk_chunks(BULK_MAPPING, 'services-test', _bulk_lines(7) + ['\n'], chunk_size=3, jobs=jobs))
+
+    assert len(chunks) == 3
+    assert all(chunk.endswith('\n') for chunk in chunks)
+    documents = _bulk_documents(chunks)
+    assert [action for action, _ in documents] == [
+        {'index': {'_index': 'services-test', '_id': str(i)}} for i in range(7)
+    ]
+    assert documents[1][1] == {
+        'dmtext_id': 1,
+        'dmtext_categories': ['Payroll', 'Finance'],
+        'dmfilter_categories': ['Payroll', 'Finance'],
+        'sortonly_idHash': hashlib.sha256(b'1').hexdigest(),
+    }
+    assert documents[0][1]['dmtext_categories'] == []
+
+
+def test_generate_bulk_chunks_reads_lines_as_they_are_needed():
+    lines = iter(_bulk_lines(10))
+    chunks = generate_bulk_chunks(BULK_MAPPING, 'services-test', lines, chunk_size=4)
+
+    next(chunks)
+    assert len(list(lines)) == 6
+
+
+def test_generate_bulk_chunks_rejects_documents_without_ids():
+    with pytest.raises(BulkIndexError, match='Line 2'):
+        list(generate_bulk_chunks(BULK_MAPPING, 'services-test', ['{"id": 1}', '{"name": "x"}']))
+
+
+def test_write_bulk_chunks(tmpdir):
+    paths = write_bulk_chunks(generate_bulk_chunks(BULK_MAPPING, 'services-test', _bulk_lines(5), 2), str(tmpdir))
+
+    assert [os.path.basename(path) for path in paths] == ['bulk-00001.ndjson', 'bulk-00002.ndjson', 'bulk-00003.ndjson']
+    assert len(tmpdir.join('bulk-00003.ndjson').read().splitlines()) == 2
+
+
+@pytest.fixture
+def bulk_server():
+    requests = []
+
+    class BulkHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+            requests.append((self.path, self.headers['Content-Type'], body))
+            actions = [json.loads(line) for line in body.splitlines()[::2]]
+            errors = any(action['index']['_id'] == 'fail' for action in actions)
+            response = json.dumps({'errors': errors, 'items': [
+                {'index': dict(action['index'], status=400, error={'type': 'mapper_parsing_exception'})
+                 if errors else dict(action['index'], status=201)}
+                for action in actions
+            ]}).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), BulkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}/'.format(server.server_port), requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_post_bulk_chunks(bulk_server):
+    url, requests = bulk_server
+
+    assert post_bulk_chunks(generate_bulk_chunks(BULK_MAPPING, 'services-test', _bulk_lines(5), 2), url) == 5
+    assert [(path, content_type) for path, content_type, _ in requests] == [('/_bulk', 'application/x-ndjson')] * 3
+
+    with pytest.raises(BulkIndexError, match='1 document'):
+        post_bulk_chunks(generate_bulk_chunks(BULK_MAPPING, 'services-test', ['{"id": "fail"}']), url)
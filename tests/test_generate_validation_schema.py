@@ -1,4 +1,10 @@
+import copy
+import gzip
+import itertools
+import json
 import re
+import subprocess
+import sys
 from math import isnan
 import os
 
@@ -12,36 +18,60 @@ import pytest
 from dmcontent import ContentQuestion
 from dmcontent.utils import TemplateField
 from hypothesis import settings, given, assume, HealthCheck, strategies as st
+from jsonschema import Draft7Validator
 from schema_generator.validation import (
-    SCHEMAS,
+    SchemaGenerationError,
+    schema_input_files,
     boolean_list_property,
     boolean_property,
     checkbox_property,
+    build_question_properties,
+    clear_content_cache,
+    clear_fragment_cache,
     checkbox_tree_property,
     drop_non_schema_questions,
     empty_schema,
+    followups_to_conditionals,
+    fragment_cache_stats,
+    generate_schema,
+    generate_schema_bundle,
     generate_schema_todir,
+    generate_schemas_todir,
+    get_framework_index,
+    get_schemas,
     list_property,
+    load_fragment_cache,
     load_questions,
+    merge_schemas,
+    merge_schemas_into,
     multiquestion,
     number_property,
     parse_question_limits,
     price_string,
     pricing_property,
+    question_fragment_key,
     radios_property,
+    save_fragment_cache,
     text_property,
     uri_property,
 )
 
 
+SCHEMAS = get_schemas()
+
+
 @pytest.fixture()
 def opened_files(request):
     opened_files = []
     original_open = builtins.open
 
-    def patched_open(*args):
-        fh = original_open(*args)
-        opened_files.append(fh.name)
+    # make sure content loaded by earlier tests doesn't hide the files we're looking for
+    clear_content_cache()
+
+    def patched_open(*args, **kwargs):
+        fh = original_open(*args, **kwargs)
+        # content is loaded by its absolute path, so record paths relative to the repo like the expected ones
+        opened_files.append(os.path.join('.', os.path.relpath(fh.name)) if isinstance(fh.name, str) else fh.name)
         return fh
 
     open_patch = mock.patch.object(builtins, 'open', patched_open)
@@ -474,6 +504,95 @@ def test_number_property_limits(max_value, min_value, integer_only):
     assert actual == expected
 
 
+@pytest.mark.parametrize(("schema", "addition"), [
+    ({}, {"allOf": [{"oneOf": []}]}),
+    ({"required": ["a"], "allOf": [1]}, {"required": ["b"], "allOf": [2], "anyOf": [3]}),
+    ({"properties": {"a": {"type": "string"}}}, {"properties": {"a": {"maxLength": 1}, "b": {}}, "type": "object"}),
+])
+def test_merge_schemas_into_merges_like_merge_schemas(schema, addition):
+    merged = merge_schemas(copy.deepcopy(schema), copy.deepcopy(addition))
+
+    assert merge_schemas_into(schema, addition) is schema
+    assert json.dumps(schema) == json.dumps(merged)
+
+
+def test_merge_schemas_into_rejects_unsupported_types():
+    with pytest.raises(TypeError):
+        merge_schemas_into({"properties": {}}, {"properties": []})
+
+
+def _text_question(**kwargs):
+    return ContentQuestion(dict({
+        "id": "serviceName",
+        "question": "What is your service called?",
+        "type": "text",
+        "validations": [{"name": "under_10_words", "message": "Your service name must be under 10 words"}],
+    }, **kwargs)).filter({'lot': 'cloud-hosting'})
+
+
+def test_build_question_properties_reuses_fragments_of_questions_with_the_same_schema():
+    clear_fragment_cache()
+    fragment = build_question_properties(_text_question())
+    fragment['serviceName']['maxLength'] = 1
+
+    assert build_question_properties(_text_question(question="What's it called?")) == text_property(_text_question())
+    assert fragment_cache_stats == {'misses': 1, 'hits': 1}
+
+    build_question_properties(_text_question(optional=True))
+    build_question_properties(_text_question(validations=[]))
+    assert fragment_cache_stats == {'misses': 3, 'hits': 1}
+
+
+def test_question_fragment_key_includes_the_context_for_templated_fields():
+    templated_validations = [
+        {"name": "under_10_words", "message": TemplateField("{{ lot }} names must be under 10 words")}
+    ]
+    question = ContentQuestion({"id": "serviceName", "type": "text", "validations": templated_validations})
+
+    assert question_fragment_key(question.filter({'lot': 'cloud-hosting'})) != \
+        question_fragment_key(question.filter({'lot': 'cloud-software'}))
+    assert question_fragment_key(_text_question().filter({'lot': 'cloud-software'})) == \
+        question_fragment_key(_text_question())
+
+
+def _multiquestion():
+    return ContentQuestion({
+        "id": "contact",
+        "type": "multiquestion",
+        "questions": [{"id": "contactName", "type": "text"}, {"id": "contactEmail", "type": "text", "optional": True}],
+    }).filter({'lot': 'cloud-hosting'})
+
+
+def test_save_and_load_fragment_cache(tmpdir):
+    fragment_cache_path = str(tmpdir.join("fragments.json"))
+    clear_fragment_cache()
+    multiquestion_fragment = build_question_properties(_multiquestion())
+    text_fragment = build_question_properties(_text_question())
+    save_fragment_cache(fragment_cache_path)
+
+    clear_fragment_cache()
+    load_fragment_cache(fragment_cache_path)
+    load_fragment_cache(str(tmpdir.join("missing.json")))
+
+    assert build_question_properties(_multiquestion()) == multiquestion_fragment
+    assert build_question_properties(_text_question()) == text_fragment
+    assert fragment_cache_stats == {'hits': 2}
+
+
+def test_load_fragment_cache_from_a_different_generator(tmpdir):
+    fragment_cache_path = str(tmpdir.join("fragments.json"))
+    clear_fragment_cache()
+    build_question_properties(_text_question())
+    save_fragment_cache(fragment_cache_path)
+
+    clear_fragment_cache()
+    with mock.patch("schema_generator.validation.content_loader_version", "0.0.0"):
+        load_fragment_cache(fragment_cache_path)
+    build_question_properties(_text_question())
+
+    assert fragment_cache_stats == {'misses': 1}
+
+
 def test_multiquestion():
     question = ContentQuestion({
         "type": "multiquestion",
@@ -566,8 +685,8 @@ def test_dynamic_list_with_dynamic_content():
     ), "a template field is being used in the generated schema"
 
 
-def test_followup():
-    question = ContentQuestion({
+def _boolean_followup_question():
+    return ContentQuestion({
         "id": "multiq",
         "type": "multiquestion",
         "questions": [
@@ -589,35 +708,16 @@ def test_followup():
         ]
     })
 
-    result, schema_addition = multiquestion(question)
-    assert 'subquestion1' in result.keys()
-    assert 'subquestion2' in result.keys()
 
-    assert schema_addition == {
-        'allOf': [
-            {'oneOf': [
-                {'properties': {
-                    'subquestion1': {'enum': [False]},
-                    'subquestion2': {'type': 'null'}
-                }},
-                {
-                    'properties': {'subquestion1': {'enum': [True]}},
-                    'required': ['subquestion1', 'subquestion2']
-                }
-            ]}
-        ],
-        'required': ['subquestion1']
-    }
-
-
-def test_checkboxes_followup():
-    question = ContentQuestion({
+def _checkboxes_followup_question(optional=False):
+    return ContentQuestion({
         "id": "multiq",
         "type": "multiquestion",
         "questions": [
             {
                 'id': 'subquestion1',
                 'name': 'Subquestion 1',
+                'optional': optional,
                 'question': 'This is subquestion 1',
                 'type': 'checkboxes',
                 'options': [{'label': 'AA', 'value': 'a'}, {'label': 'BB', 'value': 'b'}],
@@ -635,7 +735,31 @@ def test_checkboxes_followup():
         ]
     })
 
-    result, schema_addition = multiquestion(question)
+
+def test_followup():
+    result, schema_addition = multiquestion(_boolean_followup_question())
+    assert 'subquestion1' in result.keys()
+    assert 'subquestion2' in result.keys()
+
+    assert schema_addition == {
+        'allOf': [
+            {'oneOf': [
+                {'properties': {
+                    'subquestion1': {'enum': [False]},
+                    'subquestion2': {'type': 'null'}
+                }},
+                {
+                    'properties': {'subquestion1': {'enum': [True]}},
+                    'required': ['subquestion1', 'subquestion2']
+                }
+            ]}
+        ],
+        'required': ['subquestion1']
+    }
+
+
+def test_checkboxes_followup():
+    result, schema_addition = multiquestion(_checkboxes_followup_question())
     assert 'subquestion1' in result.keys()
     assert 'subquestion2' in result.keys()
 
@@ -723,3 +847,425 @@ def test_generate_dos_brief_opens_files(opened_files, tmpdir):
     ])
 
     assert dos_expected_files == dos_opened_files
+
+
+def test_generate_schema_loads_each_framework_manifest_once(opened_files):
+    lots = [x for x in SCHEMAS['services'] if x[1] == "g-cloud-7"]
+
+    generate_schema('services', *lots[0])
+    manifest_opens = opened_files.count("./frameworks/g-cloud-7/manifests/edit_submission.yml")
+    files_opened_by_first_lot = len(opened_files)
+
+    for schema in lots[1:]:
+        generate_schema('services', *schema)
+
+    assert manifest_opens == 1
+    assert len(opened_files) == files_opened_by_first_lot
+
+
+def test_cached_content_generates_same_schema_as_fresh_content():
+    schema_args = [x for x in SCHEMAS['briefs'] if x[1] == "digital-outcomes-and-specialists-5"][0]
+
+    clear_content_cache()
+    fresh_schema = generate_schema('briefs', *schema_args)
+    generate_schema('brief-awards', *schema_args)
+
+    assert generate_schema('briefs', *schema_args) == fresh_schema
+
+
+def test_generate_schemas_todir_in_parallel_matches_serial_output(tmpdir):
+    schemas = {
+        schema_type: [x for x in schema_list if x[1] in ("g-cloud-12", "digital-outcomes-and-specialists-5")]
+        for schema_type, schema_list in SCHEMAS.items()
+    }
+    serial_directory = str(tmpdir.mkdir("serial"))
+    parallel_directory = str(tmpdir.mkdir("parallel"))
+
+    generate_schemas_todir(serial_directory, schemas, jobs=1)
+    generate_schemas_todir(parallel_directory, schemas, jobs=2)
+
+    filenames = sorted(os.listdir(serial_directory))
+    assert len(filenames) == 3 + 4 + 3 * 3
+    assert sorted(os.listdir(parallel_directory)) == filenames
+    for filename in filenames:
+        with open(os.path.join(serial_directory, filename), 'rb') as serial_file, \
+                open(os.path.join(parallel_directory, filename), 'rb') as parallel_file:
+            assert serial_file.read() == parallel_file.read()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generate_schemas_todir_names_framework_and_lot_that_failed(tmpdir, jobs):
+    schemas = {'services': [("Not A Framework Service", "not-a-framework", "not-a-lot")]}
+
+    with pytest.raises(SchemaGenerationError) as e:
+        generate_schemas_todir(str(tmpdir), schemas, jobs=jobs)
+
+    assert "services schema for framework not-a-framework lot not-a-lot" in str(e.value)
+
+
+def _g_cloud_12_service_schemas():
+    return {'services': [x for x in SCHEMAS['services'] if x[1] == "g-cloud-12"]}
+
+
+def _generate_g_cloud_12_schemas(test_directory, build_cache_path, **kwargs):
+    return generate_schemas_todir(
+        test_directory, _g_cloud_12_service_schemas(), build_cache_path=build_cache_path, **kwargs
+    )
+
+
+def test_framework_index():
+    index = get_framework_index()
+
+    assert [slug for slug, framework in index.items() if framework['status'] == 'live'] == [
+        "digital-outcomes-and-specialists-5", "g-cloud-13"
+    ]
+    assert index["g-cloud-12"]['framework_name'] == "G-Cloud 12"
+    assert index["g-cloud-12"]['lots'] == [
+        ('cloud-hosting', "Cloud Hosting"), ('cloud-software', "Cloud Software"), ('cloud-support', "Cloud Support")
+    ]
+    assert index["digital-outcomes-and-specialists-5"]['schema_types'] == {
+        'services': ['digital-outcomes', 'digital-specialists', 'user-research-studios', 'user-research-participants'],
+        'briefs': ['digital-outcomes', 'digital-specialists', 'user-research-participants'],
+        'brief-responses': ['digital-outcomes', 'digital-specialists', 'user-research-participants'],
+        'brief-awards': ['digital-outcomes', 'digital-specialists', 'user-research-participants'],
+    }
+    # G-Cloud 6 services were never edited as submissions, so there's no schema for them
+    assert index["g-cloud-6"]['schema_types'] == {}
+
+
+def test_importing_does_not_scan_the_frameworks():
+    scanned = subprocess.check_output([
+        sys.executable, '-c',
+        'import schema_generator.compiler, schema_generator.document_validation, schema_generator.error_messages, '
+        'schema_generator.option_index, schema_generator.registry, schema_generator.validation as v; '
+        'print(v.get_framework_index.cache_info().currsize)',
+    ], universal_newlines=True)
+
+    assert scanned.strip() == '0'
+
+
+def test_get_schemas_for_live_frameworks():
+    live_schemas = get_schemas('live')
+
+    assert {framework_slug for schema_list in live_schemas.values() for _, framework_slug, _ in schema_list} == {
+        "digital-outcomes-and-specialists-5", "g-cloud-13"
+    }
+    assert all(set(schema_list) <= set(SCHEMAS[schema_type]) for schema_type, schema_list in live_schemas.items())
+
+
+def test_get_schemas_finds_new_frameworks(tmpdir):
+    for framework_slug in ("g-cloud-13", "g-cloud-14"):
+        tmpdir.mkdir(framework_slug).mkdir("manifests").join("edit_submission.yml").write("[]")
+        tmpdir.join(framework_slug).mkdir("questions").mkdir("services").join("lot.yml").write(
+            "question: Service type\ntype: radios\noptions:\n"
+            "  - {label: Cloud hosting, value: cloud-hosting}\n"
+            "  - {label: Cloud things, value: cloud-things}\n"
+        )
+    tmpdir.mkdir("not-a-framework").mkdir("questions")
+
+    assert get_schemas('live', frameworks_path=str(tmpdir)) == {
+        'services': [
+            ("G-Cloud 14 Cloud Hosting Service", "g-cloud-14", "cloud-hosting"),
+            ("G-Cloud 14 Cloud things Service", "g-cloud-14", "cloud-things"),
+        ],
+        'briefs': [], 'brief-responses': [], 'brief-awards': [],
+    }
+    assert get_framework_index(str(tmpdir))["g-cloud-13"]['status'] == 'archived'
+
+
+def test_get_schemas_finds_lots_from_depends_rules(tmpdir):
+    framework = tmpdir.mkdir("digital-outcomes-and-specialists-6")
+    framework.mkdir("manifests").join("edit_brief.yml").write("- {name: Brief, questions: [title, multiq]}")
+    framework.join("manifests", "award_brief.yml").write("- {name: Award, questions: [awardedContractValue]}")
+    questions = framework.mkdir("questions")
+    questions.mkdir("services").join("lot.yml").write(
+        "question: Lot\ntype: radios\noptions:\n"
+        "  - {label: Digital outcomes, value: digital-outcomes}\n"
+        "  - {label: Digital specialists, value: digital-specialists}\n"
+        "  - {label: User research studios, value: user-research-studios}\n"
+    )
+    briefs = questions.mkdir("briefs")
+    briefs.join("title.yml").write("question: Title\ntype: text\nhint: Not for user-research-studios\n")
+    briefs.join("multiq.yml").write("question: Multi\ntype: multiquestion\nquestions: [nested]\n")
+    briefs.join("nested.yml").write(
+        "question: Nested\ntype: text\ndepends:\n  - {\"on\": lot, being: [digital-specialists]}\n"
+    )
+    briefs.join("awardedContractValue.yml").write("question: Value\ntype: text\n")
+    briefs.join("unused.yml").write(
+        "question: Unused\ntype: text\ndepends:\n  - {\"on\": lot, being: [digital-outcomes]}\n"
+    )
+
+    assert get_framework_index(str(tmpdir))["digital-outcomes-and-specialists-6"]['schema_types'] == {
+        'briefs': ['digital-specialists'],
+        'brief-awards': ['digital-specialists'],
+    }
+
+
+def test_schema_input_files():
+    input_files = schema_input_files('brief-awards', 'digital-outcomes-and-specialists-5')
+
+    assert input_files[0] == "frameworks/digital-outcomes-and-specialists-5/manifests/award_brief.yml"
+    assert "frameworks/digital-outcomes-and-specialists-5/questions/briefs/awardedContractValue.yml" in input_files
+    assert all(os.path.isfile(path) for path in input_files)
+
+
+def test_generate_schemas_todir_skips_schemas_with_unchanged_inputs(tmpdir):
+    test_directory, build_cache_path = str(tmpdir.mkdir("schemas")), str(tmpdir.join("build-cache.json"))
+
+    written = _generate_g_cloud_12_schemas(test_directory, build_cache_path)
+    assert written == [
+        "services-g-cloud-12-cloud-hosting.json",
+        "services-g-cloud-12-cloud-software.json",
+        "services-g-cloud-12-cloud-support.json",
+    ]
+    mtimes = {filename: os.stat(os.path.join(test_directory, filename)).st_mtime_ns for filename in written}
+
+    assert _generate_g_cloud_12_schemas(test_directory, build_cache_path) == []
+    assert mtimes == {
+        filename: os.stat(os.path.join(test_directory, filename)).st_mtime_ns for filename in written
+    }
+
+
+def test_generate_schemas_todir_regenerates_schemas_with_changed_inputs(tmpdir):
+    test_directory, build_cache_path = str(tmpdir.mkdir("schemas")), str(tmpdir.join("build-cache.json"))
+    _generate_g_cloud_12_schemas(test_directory, build_cache_path)
+
+    with open(build_cache_path) as f:
+        build_cache = json.load(f)
+    inputs = build_cache['outputs']['services-g-cloud-12-cloud-software.json']['inputs']
+    assert "frameworks/g-cloud-12/manifests/edit_submission.yml" in inputs
+    inputs["frameworks/g-cloud-12/questions/services/serviceName.yml"] = "an out of date hash"
+    with open(build_cache_path, 'w') as f:
+        json.dump(build_cache, f)
+    os.remove(os.path.join(test_directory, "services-g-cloud-12-cloud-support.json"))
+
+    assert _generate_g_cloud_12_schemas(test_directory, build_cache_path) == [
+        "services-g-cloud-12-cloud-software.json",
+        "services-g-cloud-12-cloud-support.json",
+    ]
+    assert _generate_g_cloud_12_schemas(test_directory, build_cache_path) == []
+
+
+@pytest.mark.parametrize("changed_generator", [
+    "schema_generator.validation.content_loader_version",
+    "schema_generator.validation.GENERATOR_MODULES",
+])
+def test_generate_schemas_todir_regenerates_everything_with_a_changed_generator(tmpdir, changed_generator):
+    test_directory, build_cache_path = str(tmpdir.mkdir("schemas")), str(tmpdir.join("build-cache.json"))
+    _generate_g_cloud_12_schemas(test_directory, build_cache_path)
+
+    new_value = "0.0.0" if changed_generator.endswith("version") else ('options.py', 'validation.py')
+    with mock.patch(changed_generator, new_value):
+        assert len(_generate_g_cloud_12_schemas(test_directory, build_cache_path)) == 3
+        assert _generate_g_cloud_12_schemas(test_directory, build_cache_path) == []
+
+
+def test_generate_schemas_todir_force_regenerates_everything(tmpdir):
+    test_directory, build_cache_path = str(tmpdir.mkdir("schemas")), str(tmpdir.join("build-cache.json"))
+    _generate_g_cloud_12_schemas(test_directory, build_cache_path)
+
+    assert len(_generate_g_cloud_12_schemas(test_directory, build_cache_path, force=True)) == 3
+
+
+def test_generate_schemas_todir_regenerates_schemas_in_a_different_output_format(tmpdir):
+    test_directory, build_cache_path = str(tmpdir.mkdir("schemas")), str(tmpdir.join("build-cache.json"))
+    _generate_g_cloud_12_schemas(test_directory, build_cache_path)
+    schema_path = os.path.join(test_directory, "services-g-cloud-12-cloud-software.json")
+    with open(schema_path) as f:
+        pretty_schema = f.read()
+
+    assert len(_generate_g_cloud_12_schemas(
+        test_directory, build_cache_path, output_format='minified', gzipped=True
+    )) == 3
+    with open(schema_path) as f:
+        minified_schema = f.read()
+    with gzip.open(schema_path + ".gz", 'rt') as f:
+        assert f.read() == minified_schema
+    assert len(minified_schema) < len(pretty_schema)
+    assert json.loads(minified_schema) == json.loads(pretty_schema)
+
+    os.remove(schema_path + ".gz")
+    assert _generate_g_cloud_12_schemas(
+        test_directory, build_cache_path, output_format='minified', gzipped=True
+    ) == ["services-g-cloud-12-cloud-software.json"]
+
+
+def test_generate_schemas_todir_keeps_the_build_cache_out_of_the_output_directory(tmpdir):
+    build_cache_path = str(tmpdir.join("build-cache.json"))
+    first_directory, second_directory = str(tmpdir.mkdir("first")), str(tmpdir.mkdir("second"))
+    _generate_g_cloud_12_schemas(first_directory, build_cache_path)
+
+    assert len(os.listdir(first_directory)) == 3
+    # the build cache is for one output directory
+    assert len(_generate_g_cloud_12_schemas(second_directory, build_cache_path)) == 3
+
+
+def test_generate_schemas_todir_without_a_build_cache_writes_everything(tmpdir):
+    test_directory = str(tmpdir)
+    generate_schemas_todir(test_directory, _g_cloud_12_service_schemas())
+
+    assert len(generate_schemas_todir(test_directory, _g_cloud_12_service_schemas())) == 3
+    assert sorted(os.listdir(test_directory)) == [
+        "services-g-cloud-12-cloud-hosting.json",
+        "services-g-cloud-12-cloud-software.json",
+        "services-g-cloud-12-cloud-support.json",
+    ]
+
+
+def _followup_schemas(schema):
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            if key == 'allOf':
+                for subschema in value:
+                    if list(subschema) == ['oneOf']:
+                        yield subschema
+            for followup_schema in _followup_schemas(value):
+                yield followup_schema
+    elif isinstance(schema, list):
+        for value in schema:
+            for followup_schema in _followup_schemas(value):
+                yield followup_schema
+
+
+def _followup_documents(followup_schema):
+    """Every combination of interesting answers to a followup's question, the followup and other required fields"""
+    no_followup, followup = followup_schema['oneOf']
+    question_id = next(key for key in followup['properties'])
+    followup_ids = [key for key in no_followup['properties'] if key != question_id]
+    other_required = sorted(set(followup.get('required', [])) - {question_id} - set(followup_ids))
+
+    if 'enum' in followup['properties'][question_id]:
+        values = no_followup['properties'][question_id]['enum'] + followup['properties'][question_id]['enum']
+        question_answers = [[value] for value in values] + [["not an option"]]
+    else:
+        values = no_followup['properties'][question_id]['items']['enum'] + \
+            followup['properties'][question_id]['not']['items']['enum']
+        question_answers = [[[]], [values[:1]], [values[-1:]], [values], ["not an array"]]
+
+    for question_answer, followup_answer, include_other_required in itertools.product(
+        question_answers + [[]], [[], [None], ["an answer"]], [True, False]
+    ):
+        document = {}
+        if question_answer:
+            document[question_id] = question_answer[0]
+        for followup_id in followup_ids:
+            if followup_answer:
+                document[followup_id] = followup_answer[0]
+        if include_other_required:
+            document.update((field, "an answer") for field in other_required)
+        yield document
+
+
+def _assert_same_verdicts(schema, followup_schema):
+    conditional_schema = followups_to_conditionals(copy.deepcopy(schema))
+    assert "oneOf" not in json.dumps(conditional_schema)
+
+    for document in _followup_documents(followup_schema):
+        assert Draft7Validator(schema).is_valid(document) == Draft7Validator(conditional_schema).is_valid(document), \
+            document
+
+
+@pytest.mark.parametrize("question", [_boolean_followup_question(), _checkboxes_followup_question()])
+def test_followups_to_conditionals_gives_same_verdicts_for_followup_fixtures(question):
+    properties, schema_addition = multiquestion(question)
+    schema = dict(schema_addition, type="object", properties=properties)
+
+    _assert_same_verdicts(schema, next(_followup_schemas(schema)))
+
+
+@pytest.mark.parametrize(("schema_type", "schema"), [
+    (schema_type, schema) for schema_type, schemas in SCHEMAS.items() for schema in schemas
+])
+def test_followups_to_conditionals_gives_same_verdicts_for_frameworks(schema_type, schema):
+    generated_schema = generate_schema(schema_type, *schema)
+
+    for followup_schema in _followup_schemas(generated_schema):
+        _assert_same_verdicts({'allOf': [followup_schema]}, followup_schema)
+
+    assert generate_schema(schema_type, *schema, conditionals=True) == followups_to_conditionals(generated_schema)
+
+
+def test_followups_to_conditionals():
+    properties, schema_addition = multiquestion(_boolean_followup_question())
+
+    assert followups_to_conditionals(schema_addition) == {
+        'allOf': [
+            {
+                'if': {'properties': {
+                    'subquestion1': {'enum': [False]},
+                    'subquestion2': {'type': 'null'}
+                }},
+                'else': {
+                    'properties': {'subquestion1': {'enum': [True]}},
+                    'required': ['subquestion1', 'subquestion2']
+                }
+            }
+        ],
+        'required': ['subquestion1']
+    }
+
+
+def test_followups_to_conditionals_for_optional_question():
+    properties, schema_addition = multiquestion(_checkboxes_followup_question(optional=True))
+    no_followup, followup = schema_addition['allOf'][0]['oneOf']
+
+    assert followups_to_conditionals(schema_addition)['allOf'] == [
+        {'if': no_followup, 'then': {'not': followup}, 'else': followup}
+    ]
+
+
+def _inline_refs(schema, definitions):
+    if isinstance(schema, dict):
+        if list(schema) == ['$ref']:
+            return definitions[schema['$ref'][len('#/definitions/'):]]
+        return {key: _inline_refs(value, definitions) for key, value in schema.items()}
+    return schema
+
+
+def test_generate_schema_bundle_shares_property_schemas():
+    schemas = {
+        'services': [x for x in SCHEMAS['services'] if x[1] in ("g-cloud-12", "g-cloud-13")],
+        'briefs': [x for x in SCHEMAS['briefs'] if x[1] == "digital-outcomes-and-specialists-5"],
+    }
+    bundle = generate_schema_bundle(schemas)
+
+    property_keys = sorted(key for key in bundle['definitions'] if key.startswith('property-'))
+    entry_points = {key: value for key, value in bundle['definitions'].items() if key not in property_keys}
+
+    assert sorted(entry_points) == [
+        "briefs-digital-outcomes-and-specialists-5-digital-outcomes",
+        "briefs-digital-outcomes-and-specialists-5-digital-specialists",
+        "briefs-digital-outcomes-and-specialists-5-user-research-participants",
+        "services-g-cloud-12-cloud-hosting",
+        "services-g-cloud-12-cloud-software",
+        "services-g-cloud-12-cloud-support",
+        "services-g-cloud-13-cloud-hosting",
+        "services-g-cloud-13-cloud-software",
+        "services-g-cloud-13-cloud-support",
+    ]
+    assert len(property_keys) < sum(len(schema['properties']) for schema in entry_points.values())
+
+    for schema_type, schema_list in schemas.items():
+        for schema_name, framework_slug, lot_slug in schema_list:
+            schema_id = "{}-{}-{}".format(schema_type, framework_slug, lot_slug)
+            assert dict(_inline_refs(entry_points[schema_id], bundle['definitions']), **{
+                "$schema": "http://json-schema.org/draft-07/schema#"
+            }) == generate_schema(schema_type, schema_name, framework_slug, lot_slug)
+
+
+@pytest.mark.parametrize("document", [
+    {},
+    {"serviceName": "A service", "accreditationsOtherList": [" An accreditation"]},
+    {"serviceName": 1234, "securityGovernanceAccreditation": True},
+])
+def test_generate_schema_bundle_entry_points_validate_like_schemas(document):
+    schemas = {'services': [x for x in SCHEMAS['services'] if x[1] == "g-cloud-12"]}
+    bundle = generate_schema_bundle(schemas)
+    schema = generate_schema('services', *[x for x in schemas['services'] if x[2] == "cloud-software"][0])
+
+    bundle_errors = sorted(e.message for e in Draft7Validator(
+        dict(bundle, **{"$ref": "#/definitions/services-g-cloud-12-cloud-software"})
+    ).iter_errors(document))
+
+    assert bundle_errors == sorted(e.message for e in Draft7Validator(schema).iter_errors(document))
+    assert bundle_errors
@@ -0,0 +1,141 @@
+import copy
+import gzip
+import io
+import json
+
+import pytest
+
+from schema_generator.mapping_compatibility import (
+    IN_PLACE,
+    NO_OP,
+    REINDEX_REQUIRED,
+    TRANSFORMATION_ONLY,
+    compare_mappings,
+    load_mapping,
+)
+from schema_generator.search import generate_search_mapping
+
+
+MAPPING = {
+    'settings': {
+        'index': {'max_result_window': 50000},
+        'analysis': {
+            'analyzer': {'stemming_analyzer': {'tokenizer': 'standard', 'filter': ['lowercase']}},
+            'normalizer': {'filter_normalizer': {'type': 'custom', 'filter': ['lowercase']}},
+        },
+    },
+    'mappings': {
+        '_meta': {
+            'version': '1.0.0',
+            'generated_time': '2022-01-01T00:00:00',
+            'dm_sort_clause': ['_score'],
+            'transformations': [{'hash_to': {'field': 'id', 'target_field': 'serviceIdHash'}}],
+        },
+        'dynamic': 'strict',
+        'properties': {
+            'dmtext_serviceName': {'type': 'text'},
+            'dmtext_serviceDescription': {'type': 'text', 'analyzer': 'stemming_analyzer'},
+            'dmfilter_lot': {'type': 'keyword', 'normalizer': 'filter_normalizer'},
+            'supplier': {'properties': {'name': {'type': 'text'}}},
+        },
+    },
+}
+
+
+def _changed(change):
+    mapping = copy.deepcopy(MAPPING)
+    change(mapping)
+    return mapping
+
+
+def _properties(mapping):
+    return mapping['mappings']['properties']
+
+
+@pytest.mark.parametrize(("change", "classification", "path"), [
+    (lambda m: m['mappings']['_meta'].update(generated_time='2023-01-01T00:00:00', version='2.0.0'), NO_OP, None),
+    (lambda m: _properties(m)['dmfilter_lot'].update(doc_values=True), NO_OP, None),
+    (lambda m: _properties(m).update(dmfilter_new={'type': 'keyword'}), IN_PLACE, 'mappings.properties.dmfilter_new'),
+    (lambda m: _properties(m).pop('dmtext_serviceName'), IN_PLACE, 'mappings.properties.dmtext_serviceName'),
+    (
+        lambda m: _properties(m)['dmtext_serviceName'].update(search_analyzer='stemming_analyzer'),
+        IN_PLACE, 'mappings.properties.dmtext_serviceName',
+    ),
+    (
+        lambda m: _properties(m)['dmtext_serviceName'].update(fields={'raw': {'type': 'keyword'}}),
+        IN_PLACE, 'mappings.properties.dmtext_serviceName.fields.raw',
+    ),
+    (
+        lambda m: _properties(m)['supplier']['properties'].update(id={'type': 'keyword'}),
+        IN_PLACE, 'mappings.properties.supplier.id',
+    ),
+    (lambda m: m['mappings']['_meta'].update(dm_sort_clause=['id']), IN_PLACE, 'mappings._meta.dm_sort_clause'),
+    (lambda m: m['mappings'].update(dynamic=True), IN_PLACE, 'mappings.dynamic'),
+    (lambda m: m['settings']['index'].update(max_result_window=10000), IN_PLACE, 'settings.index.max_result_window'),
+    (
+        lambda m: m['settings']['analysis']['analyzer'].update(other={'tokenizer': 'standard'}),
+        IN_PLACE, 'settings.analysis.analyzer.other',
+    ),
+    (
+        lambda m: m['mappings']['_meta']['transformations'].append({'hash_to': {'field': 'id'}}),
+        TRANSFORMATION_ONLY, 'mappings._meta.transformations',
+    ),
+    (
+        lambda m: _properties(m)['dmtext_serviceName'].update(type='keyword'),
+        REINDEX_REQUIRED, 'mappings.properties.dmtext_serviceName',
+    ),
+    (
+        lambda m: _properties(m)['dmtext_serviceDescription'].pop('analyzer'),
+        REINDEX_REQUIRED, 'mappings.properties.dmtext_serviceDescription',
+    ),
+    (
+        lambda m: _properties(m)['dmfilter_lot'].update(normalizer='other_normalizer'),
+        REINDEX_REQUIRED, 'mappings.properties.dmfilter_lot',
+    ),
+    (
+        lambda m: m['settings']['analysis']['normalizer']['filter_normalizer'].update(filter=['asciifolding']),
+        REINDEX_REQUIRED, 'settings.analysis.normalizer.filter_normalizer',
+    ),
+    (lambda m: m['settings']['index'].update(number_of_shards=2), REINDEX_REQUIRED, 'settings.index.number_of_shards'),
+])
+def test_compare_mappings(change, classification, path):
+    result = compare_mappings(MAPPING, _changed(change))
+
+    assert result['classification'] == classification
+    assert [change['path'] for change in result['changes']] == ([path] if path else [])
+    assert all(change['classification'] == classification for change in result['changes'])
+
+
+def test_compare_mappings_is_classified_by_its_most_disruptive_change():
+    def change(mapping):
+        _properties(mapping).update(dmfilter_new={'type': 'keyword'})
+        mapping['mappings']['_meta']['transformations'] = []
+
+    result = compare_mappings(MAPPING, _changed(change))
+
+    assert result['classification'] == TRANSFORMATION_ONLY
+    assert sorted(change['classification'] for change in result['changes']) == [IN_PLACE, TRANSFORMATION_ONLY]
+
+
+def test_compare_mappings_with_and_without_a_mapping_type():
+    typed = dict(MAPPING, mappings={'services': MAPPING['mappings']})
+
+    assert compare_mappings(typed, MAPPING) == {'classification': NO_OP, 'changes': []}
+
+
+def test_compare_generated_mappings():
+    legacy, compact = io.StringIO(), io.StringIO()
+    generate_search_mapping('g-cloud-13', 'services', legacy, 'services')
+    generate_search_mapping('g-cloud-13', 'services', compact, 'services', transformation_format='compact')
+    legacy, compact = json.loads(legacy.getvalue()), json.loads(compact.getvalue())
+
+    assert compare_mappings(legacy, copy.deepcopy(legacy))['classification'] == NO_OP
+    assert compare_mappings(legacy, compact)['classification'] == TRANSFORMATION_ONLY
+
+
+@pytest.mark.parametrize("file_name", ['services.json', 'services.json.gz'])
+def test_load_mapping(tmpdir, file_name):
+    content = json.dumps(MAPPING).encode('utf-8')
+    tmpdir.join(file_name).write_binary(gzip.compress(content) if file_name.endswith('.gz') else content)
+
+    assert load_mapping(str(tmpdir.join(file_name))) == MAPPING
@@ -0,0 +1,113 @@
+import io
+import json
+import subprocess
+import sys
+
+import pytest
+
+from schema_generator.mapping_usage import get_mapping_usage, prune_properties
+from schema_generator.search import build_search_mapping, generate_search_mapping, get_field_usages
+from schema_generator.transformations import get_type_mapping
+
+
+PROPERTIES = {
+    'dmtext_serviceName': {'type': 'text'},
+    'dmtext_notAFilter': {'type': 'text'},
+    'dmfilter_phoneSupport': {'type': 'keyword'},
+    'dmfilter_notAFilter': {'type': 'keyword'},
+    'dmagg_notAFilter': {'type': 'keyword'},
+    'dmfilter_lot': {'type': 'keyword'},
+    'dmfilter_supplierId': {'type': 'keyword'},
+    'sortonly_serviceIdHash': {'type': 'keyword'},
+    'sortonly_unsorted': {'type': 'keyword'},
+    'dmtext_supplier': {'properties': {'name': {'type': 'text'}}},
+}
+
+FIELD_USAGES = {
+    'serviceName': {'display'},
+    'notAFilter': {'display', 'download'},
+    'phoneSupport': {'filter'},
+    # `lot` is a question in some frameworks as well as a field the API adds
+    'lot': set(),
+}
+
+
+def test_get_mapping_usage():
+    mapping_usage = get_mapping_usage(PROPERTIES, FIELD_USAGES, ['_score', {'sortonly_serviceIdHash': 'desc'}])
+
+    assert list(mapping_usage) == list(PROPERTIES)
+    assert {name: usage['unused'] for name, usage in mapping_usage.items() if usage['unused']} == {
+        'dmfilter_notAFilter': "notAFilter isn't a search filter",
+        'dmagg_notAFilter': "notAFilter isn't a search filter",
+        'sortonly_unsorted': "not in dm_sort_clause",
+    }
+    assert mapping_usage['dmtext_notAFilter']['usages'] == ['display', 'download']
+    assert mapping_usage['dmfilter_phoneSupport']['usages'] == ['filter']
+    assert mapping_usage['dmfilter_lot']['usages'] == ['api']
+    assert mapping_usage['dmfilter_supplierId'] == {'field': 'supplierId', 'usages': ['api'], 'unused': None}
+
+
+def test_prune_properties_drop():
+    pruned = prune_properties(PROPERTIES, {'dmfilter_notAFilter', 'sortonly_unsorted'}, 'drop')
+
+    assert list(pruned) == [
+        name for name in PROPERTIES if name not in ('dmfilter_notAFilter', 'sortonly_unsorted')
+    ]
+    assert pruned['dmfilter_phoneSupport'] == PROPERTIES['dmfilter_phoneSupport']
+
+
+def test_prune_properties_disable():
+    pruned = prune_properties(PROPERTIES, {'dmfilter_notAFilter', 'dmtext_notAFilter', 'dmtext_supplier'}, 'disable')
+
+    assert list(pruned) == list(PROPERTIES)
+    assert pruned['dmfilter_notAFilter'] == {'type': 'keyword', 'index': False, 'doc_values': False}
+    assert pruned['dmtext_notAFilter'] == {'type': 'text', 'index': False}
+    assert pruned['dmtext_supplier'] == {'type': 'object', 'enabled': False}
+    assert pruned['dmfilter_phoneSupport'] == PROPERTIES['dmfilter_phoneSupport']
+
+
+def test_prune_properties_unknown_mode():
+    with pytest.raises(ValueError):
+        prune_properties(PROPERTIES, set(), 'delete')
+
+
+def test_get_field_usages():
+    field_usages = get_field_usages('g-cloud-13', 'services')
+
+    assert 'filter' in field_usages['serviceCategories']
+    assert 'filter' not in field_usages['backupDatacentre']
+    assert 'display' in field_usages['backupDatacentre']
+
+
+@pytest.mark.parametrize(("field_pruning", "expected"), [
+    ('drop', None),
+    ('disable', {'type': 'keyword', 'index': False, 'doc_values': False}),
+])
+def test_build_search_mapping_with_field_pruning(field_pruning, expected):
+    properties = get_type_mapping(
+        build_search_mapping('g-cloud-13', 'services', 'services', field_pruning=field_pruning)
+    )['properties']
+
+    assert properties.get('dmfilter_backupDatacentre') == expected
+    assert 'dmtext_backupDatacentre' not in properties or properties['dmtext_backupDatacentre'].get('index', True)
+    assert properties['dmfilter_serviceCategories'].get('index', True)
+
+
+def test_search_mapping_is_not_pruned_by_default():
+    unpruned, pruned = io.StringIO(), io.StringIO()
+    generate_search_mapping('g-cloud-13', 'services', unpruned, 'services')
+    generate_search_mapping('g-cloud-13', 'services', pruned, 'services', field_pruning='drop')
+
+    assert 'dmfilter_backupDatacentre' in get_type_mapping(json.loads(unpruned.getvalue()))['properties']
+    assert unpruned.getvalue() != pruned.getvalue()
+
+
+def test_search_mapping_generation_does_not_load_validation():
+    modules = subprocess.check_output([
+        sys.executable, '-c',
+        'import sys, schema_generator.search; print(" ".join(sys.modules))',
+    ], universal_newlines=True).split()
+
+    assert 'schema_generator.document_validation' not in modules
+    assert 'schema_generator.validation' not in modules
+    assert 'jsonschema' not in modules
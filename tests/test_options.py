@@ -0,0 +1,83 @@
+import pytest
+
+from schema_generator.option_index import (
+    generate_lot_option_index,
+    generate_option_indexes_todir,
+    load_option_index,
+)
+from schema_generator.options import freeze_question_options, iter_leaf_options, question_options
+from schema_generator.validation import checkbox_tree_property
+
+
+TREE_QUESTION = {
+    'id': 'categories',
+    'type': 'checkbox_tree',
+    'options': [
+        {'label': 'Fruit', 'options': [
+            {'label': 'Apple'},
+            {'label': 'Citrus', 'value': 'citrus', 'options': [{'label': 'Lemon', 'value': 'lemon'}]},
+        ]},
+        {'label': 'Green', 'options': [{'label': 'Apple'}]},
+        {'label': 'Bread'},
+    ],
+}
+
+
+def test_iter_leaf_options():
+    assert [
+        (option['label'], [ancestor['label'] for ancestor in ancestors])
+        for option, ancestors in iter_leaf_options(TREE_QUESTION['options'])
+    ] == [
+        ('Apple', ['Fruit']),
+        ('Lemon', ['Fruit', 'Citrus']),
+        ('Apple', ['Green']),
+        ('Bread', []),
+    ]
+
+
+def test_question_options_for_a_checkbox_tree():
+    options = question_options(TREE_QUESTION)
+
+    assert options['values'] == ['Apple', 'lemon', 'Bread']
+    assert options['labels']['citrus'] == 'Citrus'
+    assert options['parents'] == {'Apple': [['Fruit'], ['Green']], 'lemon': [['Fruit', 'citrus']]}
+    assert 'derived_from' not in options
+    assert set(options['values']) == set(checkbox_tree_property(TREE_QUESTION)['categories']['items']['enum'])
+
+
+def test_question_options_derived_from_another_question():
+    derived_from = {'question': 'support', 'any_of': ['yes', 'yes_extra_cost']}
+    options = question_options({'type': 'radios', 'options': [
+        {'label': 'Yes', 'value': 'yes', 'derived_from': derived_from},
+        {'label': 'No', 'value': 'no'},
+    ]})
+
+    assert options == {
+        'type': 'radios',
+        'values': ['yes', 'no'],
+        'labels': {'yes': 'Yes', 'no': 'No'},
+        'derived_from': {'yes': derived_from},
+    }
+    assert freeze_question_options(options)['derived_from']['yes']['any_of'] == frozenset(['yes', 'yes_extra_cost'])
+
+
+def test_lot_option_index_has_the_options_for_the_lot():
+    software = generate_lot_option_index('services', 'g-cloud-13', 'cloud-software')
+    hosting = generate_lot_option_index('services', 'g-cloud-13', 'cloud-hosting')
+
+    assert software['serviceCategories']['type'] == 'checkbox_tree'
+    assert 'Accounts payable' in software['serviceCategories']['values']
+    assert 'Accounts payable' not in hosting['serviceCategories']['values']
+    # nested in a multiquestion
+    assert software['emailOrTicketingSupport']['values']
+
+
+@pytest.mark.parametrize('output_format', ['pretty', 'minified'])
+def test_generate_and_load_option_index(tmpdir, output_format):
+    schemas = {'services': [('G-Cloud 13 Cloud Software Service', 'g-cloud-13', 'cloud-software')]}
+    [path] = generate_option_indexes_todir(str(tmpdir), schemas, output_format)
+
+    assert path.endswith('options-g-cloud-13.json')
+    options = load_option_index(path)['services']['cloud-software']['serviceCategories']
+    assert isinstance(options['values'], frozenset)
+    assert options['parents']['Accounts payable'] == frozenset([('Accounting and finance',)])
@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from schema_generator.registry import SCHEMA_CACHE_SIZE, get_schema, iter_schemas
+from schema_generator.validation import generate_schema_todir, get_schemas
+
+
+SCHEMAS = get_schemas()
+
+
+def test_get_schema_matches_generated_schema_file(tmpdir):
+    schema = [x for x in SCHEMAS['services'] if x[1:] == ("g-cloud-12", "cloud-software")][0]
+    generate_schema_todir(str(tmpdir), 'services', *schema)
+
+    with open(os.path.join(str(tmpdir), "services-g-cloud-12-cloud-software.json")) as f:
+        assert get_schema('services', 'g-cloud-12', 'cloud-software') == json.load(f)
+
+
+def test_get_schema_works_outside_the_repo_root(tmpdir):
+    old_cwd = os.getcwd()
+    os.chdir(str(tmpdir))
+    try:
+        schema = get_schema('brief-awards', 'digital-outcomes-and-specialists-4', 'digital-specialists')
+    finally:
+        os.chdir(old_cwd)
+
+    assert schema['title'] == "Digital Outcomes and Specialists 4 Digital specialists Brief Award Schema"
+
+
+def test_get_schema_is_cached():
+    get_schema.cache_clear()
+
+    schema = get_schema('briefs', 'digital-outcomes-and-specialists-5', 'digital-outcomes')
+
+    assert get_schema('briefs', 'digital-outcomes-and-specialists-5', 'digital-outcomes') is schema
+    assert get_schema.cache_info().hits == 1
+    assert get_schema.cache_info().maxsize == SCHEMA_CACHE_SIZE
+
+
+def test_get_schema_raises_for_unknown_schema():
+    with pytest.raises(ValueError) as e:
+        get_schema('briefs', 'g-cloud-12', 'cloud-software')
+
+    assert str(e.value) == "No briefs schema for framework g-cloud-12 lot cloud-software"
+
+
+def test_iter_schemas_filters_by_schema_type_and_framework():
+    schemas = list(iter_schemas('brief-responses', 'digital-outcomes-and-specialists-3'))
+
+    assert [key for key, schema in schemas] == [
+        ('brief-responses', 'digital-outcomes-and-specialists-3', 'digital-outcomes'),
+        ('brief-responses', 'digital-outcomes-and-specialists-3', 'digital-specialists'),
+        ('brief-responses', 'digital-outcomes-and-specialists-3', 'user-research-participants'),
+    ]
+    assert all(schema['title'].endswith("Brief Response Schema") for key, schema in schemas)
@@ -0,0 +1,112 @@
+import json
+import re
+
+import pytest
+
+from schema_generator.search_templates import (
+    generate_search_templates_todir,
+    get_search_template,
+    search_template_params,
+)
+
+
+TAG = re.compile(r'{{([#^/]?)([^}]+)}}')
+
+
+def _lookup(stack, name):
+    for context in reversed(stack):
+        if isinstance(context, dict) and name in context:
+            return context[name]
+
+
+def _render(source, stack):
+    """Renders the subset of Elasticsearch's mustache that search templates use"""
+    output, position = [], 0
+    while True:
+        match = TAG.search(source, position)
+        if not match:
+            return ''.join(output) + source[position:]
+        output.append(source[position:match.start()])
+        kind, name = match.groups()
+        if not kind:
+            output.append(str(_lookup(stack, name)))
+            position = match.end()
+            continue
+
+        end = source.index('{{/%s}}' % name, match.end())
+        content, position = source[match.end():end], end + len('{{/%s}}' % name)
+        if name == 'toJson':
+            output.append(json.dumps(_lookup(stack, content)))
+            continue
+
+        value = _lookup(stack, name)
+        if kind == '^':
+            output.append('' if value else _render(content, stack))
+        elif isinstance(value, list):
+            output.extend(_render(content, stack + [item]) for item in value)
+        elif value:
+            output.append(_render(content, stack + [value]))
+
+
+def render(template, params):
+    return json.loads(_render(template['script']['source'], [params]))
+
+
+def test_search_template_without_params():
+    query = render(get_search_template('g-cloud-13', 'services'), {})
+
+    assert query == {
+        'query': {'bool': {'must': {'match_all': {}}, 'filter': [{'match_all': {}}]}},
+        'sort': ['_score', {'sortonly_serviceIdHash': 'desc'}],
+        'from': 0,
+        'size': 100,
+    }
+
+
+def test_search_template_with_params():
+    params = search_template_params(
+        query='payroll "quoted"',
+        filters={'serviceCategories': [['Accounting and finance']], 'phoneSupport': [['yes'], ['no', 'yes']]},
+        aggregations=True,
+        page=3,
+        size=20,
+    )
+    query = render(get_search_template('g-cloud-13', 'services'), params)
+
+    assert query['query']['bool']['must']['simple_query_string']['query'] == 'payroll "quoted"'
+    assert 'dmtext_serviceName' in query['query']['bool']['must']['simple_query_string']['fields']
+    assert query['query']['bool']['filter'][1:] == [
+        {'terms': {'dmfilter_serviceCategories': ['Accounting and finance']}},
+        {'terms': {'dmfilter_phoneSupport': ['yes']}},
+        {'terms': {'dmfilter_phoneSupport': ['no', 'yes']}},
+    ]
+    assert query['aggregations']['serviceCategories']['terms']['field'] == 'dmagg_serviceCategories'
+    # big enough for every category and subcategory
+    assert query['aggregations']['serviceCategories']['terms']['size'] > 100
+    assert (query['from'], query['size']) == (40, 20)
+
+
+def test_search_template_for_briefs():
+    query = render(
+        get_search_template('digital-outcomes-and-specialists-5', 'briefs'),
+        search_template_params(filters={'status': [['live', 'closed']]}),
+    )
+
+    assert query['query']['bool']['filter'][1] == {'terms': {'dmfilter_status': ['live', 'closed']}}
+    assert query['sort'] == ['sortonly_statusOrder', {'sortonly_publishedAt': 'desc'}, 'sortonly_idHash']
+
+
+def test_generate_search_templates_todir(tmpdir):
+    [path] = generate_search_templates_todir(str(tmpdir), [('g-cloud-13', 'services')], 'minified')
+
+    assert path.endswith('search-template-services-g-cloud-13.json')
+    with open(path) as f:
+        assert json.load(f) == get_search_template('g-cloud-13', 'services')
+
+
+@pytest.mark.parametrize(("framework_slug", "doc_type"), [
+    ('g-cloud-9', 'services'),
+    ('digital-outcomes-and-specialists-2', 'briefs'),
+])
+def test_search_template_for_mappings_with_a_mapping_type(framework_slug, doc_type):
+    assert render(get_search_template(framework_slug, doc_type), search_template_params(aggregations=True))['query']
@@ -0,0 +1,54 @@
+import gzip
+import json
+from collections import OrderedDict
+
+import mock
+import pytest
+
+from schema_generator import serialization
+from schema_generator.serialization import dumps, write_json
+
+
+ARTIFACT = OrderedDict((
+    ("title", "G-Cloud 12 Cloud Software Service – £"),
+    ("properties", {"b": {"type": "string"}, "a": {"enum": [1, 2.5, True, None]}}),
+    ("required", []),
+))
+
+
+def test_pretty_output_is_unchanged():
+    assert dumps(ARTIFACT) == json.dumps(ARTIFACT, sort_keys=True, indent=2, separators=(',', ': '))
+    assert dumps(ARTIFACT, sort_keys=False) == json.dumps(ARTIFACT, indent=2, separators=(',', ': '))
+
+
+@pytest.mark.parametrize("sort_keys", [True, False])
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_minified_output(use_orjson, sort_keys):
+    orjson = pytest.importorskip("orjson") if use_orjson else None
+    with mock.patch.object(serialization, 'orjson', orjson):
+        minified = dumps(ARTIFACT, 'minified', sort_keys=sort_keys)
+
+    assert minified == json.dumps(ARTIFACT, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False)
+
+
+def test_unknown_output_format():
+    with pytest.raises(ValueError):
+        dumps(ARTIFACT, 'yaml')
+
+
+@pytest.mark.parametrize("output_format", ["pretty", "minified"])
+def test_write_json_with_gzipped_copy(tmpdir, output_format):
+    file_path = str(tmpdir.join("artifact.json"))
+    write_json(file_path, ARTIFACT, output_format, gzipped=True)
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    with open(file_path + ".gz", 'rb') as f:
+        gzipped_content = f.read()
+
+    assert content.decode('utf-8') == dumps(ARTIFACT, output_format) + "\n"
+    assert gzip.decompress(gzipped_content) == content
+
+    # the gzipped copy doesn't record when it was written, so unchanged output gives an unchanged file
+    write_json(file_path, ARTIFACT, output_format, gzipped=True)
+    with open(file_path + ".gz", 'rb') as f:
+        assert f.read() == gzipped_content
@@ -0,0 +1,153 @@
+import copy
+import hashlib
+import io
+import json
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from schema_generator.search import generate_search_mapping
+from schema_generator.transformations import (
+    apply_transformations,
+    compile_transformations,
+    get_mapping_transformations,
+)
+
+
+FIELDS = ['a', 'b', 'c']
+VALUES = ['x', 'y', 'z', True, False]
+
+field_values = st.one_of(st.sampled_from(VALUES), st.lists(st.sampled_from(VALUES), max_size=4))
+documents = st.dictionaries(st.sampled_from(FIELDS), field_values)
+
+conditions = st.fixed_dictionaries({
+    'field': st.sampled_from(FIELDS),
+    'any_of': st.lists(st.sampled_from(VALUES), min_size=1, max_size=3, unique=True),
+}, optional={'target_field': st.sampled_from(FIELDS)})
+transformation_lists = st.lists(st.one_of(
+    st.builds(
+        lambda arguments, append_value: {'append_conditionally': dict(arguments, append_value=append_value)},
+        conditions, st.lists(st.sampled_from(VALUES), min_size=1, max_size=2),
+    ),
+    st.builds(
+        lambda arguments, set_value: {'set_conditionally': dict(arguments, set_value=set_value)},
+        conditions, st.sampled_from(VALUES),
+    ),
+    st.builds(
+        lambda field, lookup: {'append_from_lookup': {'field': field, 'lookup': lookup}},
+        st.sampled_from(FIELDS),
+        st.dictionaries(st.sampled_from(['x', 'y', 'z']), st.lists(st.sampled_from(VALUES), min_size=1, max_size=2)),
+    ),
+    st.builds(
+        lambda field, target_field: {'hash_to': {'field': field, 'target_field': target_field}},
+        st.sampled_from(FIELDS), st.sampled_from(FIELDS),
+    ),
+), max_size=8)
+
+
+@pytest.mark.parametrize(("transformation", "document", "expected"), [
+    (
+        {'append_conditionally': {'field': 'a', 'any_of': ['x', 'y'], 'append_value': ['X']}},
+        {'a': ['y', 'z']},
+        {'a': ['y', 'z', 'X']},
+    ),
+    (
+        {'append_conditionally': {'field': 'a', 'any_of': ['x'], 'append_value': ['X'], 'target_field': 'b'}},
+        {'a': 'x', 'b': 'X'},
+        {'a': 'x', 'b': ['X']},
+    ),
+    (
+        {'append_conditionally': {'field': 'a', 'any_of': ['x'], 'append_value': ['X']}},
+        {'a': ['z'], 'b': ['x']},
+        {'a': ['z'], 'b': ['x']},
+    ),
+    (
+        {'append_from_lookup': {'field': 'a', 'lookup': {'x': ['X', 'Y'], 'y': ['Y', 'Z']}, 'target_field': 'b'}},
+        {'a': ['x', 'y', True]},
+        {'a': ['x', 'y', True], 'b': ['X', 'Y', 'Z']},
+    ),
+    (
+        {'set_conditionally': {'field': 'status', 'any_of': ['live'], 'set_value': 'open', 'target_field': 'b'}},
+        {'status': 'live'},
+        {'status': 'live', 'b': 'open'},
+    ),
+    (
+        {'hash_to': {'field': 'id', 'target_field': 'idHash'}},
+        {'id': 123},
+        {'id': 123, 'idHash': hashlib.sha256(b'123').hexdigest()},
+    ),
+])
+def test_transformations(transformation, document, expected):
+    assert apply_transformations(copy.deepcopy(document), [transformation]) == expected
+    assert compile_transformations([transformation]).transform(copy.deepcopy(document)) == expected
+
+
+@pytest.mark.parametrize("transformation", [
+    {'copy_to': {'field': 'a', 'target_field': 'b'}},
+    {'hash_to': {'field': 'a'}, 'set_conditionally': {'field': 'a', 'any_of': [], 'set_value': 'x'}},
+])
+def test_compile_transformations_rejects_unknown_transformations(transformation):
+    with pytest.raises(ValueError):
+        compile_transformations([transformation])
+
+
+@settings(max_examples=300)
+@given(transformation_lists, st.lists(documents, max_size=5))
+def test_compiled_transformations_match_applying_them_in_turn(transformations, documents):
+    transformer = compile_transformations(transformations)
+
+    for document in documents:
+        assert transformer.transform(copy.deepcopy(document)) == apply_transformations(document, transformations)
+
+
+def test_compiled_transformations_of_a_generated_mapping():
+    mapping = io.StringIO()
+    generate_search_mapping('g-cloud-13', 'services', mapping, 'services')
+    transformations = get_mapping_transformations(json.loads(mapping.getvalue()))
+    transformer = compile_transformations(transformations)
+
+    document = {'id': '1', 'serviceCategories': ['Accounts payable', 'Payroll'], 'webChatSupport': 'yes_extra_cost'}
+    expected = apply_transformations(copy.deepcopy(document), transformations)
+
+    assert transformer.transform(document) == expected
+    assert 'Accounting and finance' in expected['serviceCategories']
+    assert len(transformer.stages) < len(transformations)
+
+
+@pytest.mark.parametrize("mappings", [
+    {'_meta': {'transformations': [{'hash_to': {'field': 'id'}}]}},
+    {'services': {'_meta': {'transformations': [{'hash_to': {'field': 'id'}}]}}},
+])
+def test_get_mapping_transformations_with_and_without_mapping_type(mappings):
+    assert get_mapping_transformations({'mappings': mappings}) == [{'hash_to': {'field': 'id'}}]
+
+
+@pytest.mark.parametrize(("framework_slug", "doc_type"), [
+    ('g-cloud-13', 'services'),
+    ('digital-outcomes-and-specialists-5', 'briefs'),
+])
+def test_compact_transformations_give_the_same_values_as_legacy_ones(framework_slug, doc_type):
+    transformers = {}
+    for transformation_format in ('legacy', 'compact'):
+        mapping = io.StringIO()
+        generate_search_mapping(
+            framework_slug, doc_type, mapping, doc_type, transformation_format=transformation_format
+        )
+        transformers[transformation_format] = compile_transformations(
+            get_mapping_transformations(json.loads(mapping.getvalue()))
+        )
+
+    document = {
+        'id': '1',
+        'serviceCategories': ['Accounts payable', 'Contract management', 'Payroll'],
+        'webChatSupport': 'yes_extra_cost',
+        'status': 'live',
+    }
+    legacy, compact = (transformers[fmt].transform(copy.deepcopy(document)) for fmt in ('legacy', 'compact'))
+
+    assert legacy.keys() == compact.keys()
+    for field, value in legacy.items():
+        if isinstance(value, list):
+            assert sorted(value) == sorted(compact[field])
+        else:
+            assert value == compact[field]